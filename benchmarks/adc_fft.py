@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Range-Doppler throughput of RangeDopplerEngine per batch size and precision
+
+    python benchmarks/adc_fft.py [config_file] [num_frames]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rad.adc import RangeDopplerEngine, _fft_module, frame_size, parse_adc_config
+
+
+def main(config_file='chirp_config.cfg', num_frames=32):
+    config = parse_adc_config(config_file)
+    raw = np.random.default_rng(0).integers(-2000, 2000, size=num_frames * frame_size(config)).astype('<i2')
+    print('{}: {} chirps x {} rx x {} samples per frame, fft: {}'.format(config_file, config['num_chirps'],
+        config['num_rx'], config['num_adc_samples'], _fft_module()[0].__name__))
+    print('  {:8s} {:>6s} {:>10s}'.format('dtype', 'batch', 'frames/s'))
+    for dtype in (np.float32, np.float64):
+        for batch_frames in (1, 8, 32):
+            engine = RangeDopplerEngine(config, dtype=dtype)
+            for _ in engine.heatmaps(raw[:batch_frames * frame_size(config)], batch_frames):
+                pass  # -- buffers and plans
+            best = np.inf
+            for _ in range(3):
+                t0 = time.perf_counter()
+                for _ in engine.heatmaps(raw, batch_frames):
+                    pass
+                best = min(best, time.perf_counter() - t0)
+            print('  {:8s} {:6d} {:10.1f}'.format(np.dtype(dtype).name, batch_frames, num_frames / best))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2], *[int(arg) for arg in sys.argv[2:3]])
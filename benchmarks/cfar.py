@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+CFAR throughput on batches of range-Doppler maps, per method
+
+    python benchmarks/cfar.py [num_frames] [doppler_bins] [range_bins]
+"""
+
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rad.cfar import CFAR, CFAR2D, METHODS, PeakGrouping, detect
+
+
+def main(num_frames=32, doppler_bins=128, range_bins=128):
+    power = np.random.default_rng(0).exponential(1.0, (num_frames, doppler_bins, range_bins)).astype(np.float32)
+    grouping = PeakGrouping()
+    print('{} maps of {} x {}:'.format(num_frames, doppler_bins, range_bins))
+    print('  {:28s} {:>10s}'.format('detector', 'frames/s'))
+    for method in METHODS:
+        detectors = {
+            '1-D range': CFAR(method),
+            '1-D range + Doppler': [CFAR(method), CFAR(method, guard=1, train=4, wrap=True, axis=-2)],
+            '2-D': CFAR2D(method),
+        }
+        for name, cfar in detectors.items():
+            t = min(timeit.repeat(lambda: detect(power, cfar, grouping), number=1, repeat=3))
+            print('  {:28s} {:10.1f}'.format('{} {}'.format(method, name), num_frames / t))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:4]])
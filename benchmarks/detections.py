@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Memory per detection and conversion time for a frame of detections
+
+    python benchmarks/detections.py [num_points]
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rad.detections import RadarDetection3D_XYZ, DetectionBatch, convert_detections, cartesian_to_spherical
+
+
+class LegacyDetection():
+    """Detection as before __slots__ (instance dict, hash string built in __init__)"""
+    def __init__(self, source_ID, t, x, y, z, rrt, noise, snr=None):
+        self.source_ID = source_ID
+        self.t = t
+        self.x = x
+        self.y = y
+        self.z = z
+        self.rrt = rrt
+        self.noise = noise
+        self.snr = snr
+        self._hash = hash(f'{self.source_ID} {self.t} {self.x} {self.y} {self.z} {self.rrt} {self.noise} {self.snr}')
+
+
+def bytes_per_detection(make, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = make()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / n
+
+
+def main(num_points=10000):
+    xyz = np.random.default_rng(0).uniform([1, -5, -1], [10, 5, 1], size=(num_points, 3))
+    rows = xyz.tolist()
+    noise = [1e-3] * 3
+    dets = [RadarDetection3D_XYZ(0, 0.0, x, y, z, 0.1, noise, 20.0) for x, y, z in rows]
+    batch = DetectionBatch(0, 0.0, xyz, 0.1, 20.0, noise)
+
+    print('memory per detection:')
+    print('  legacy object  {:6.0f} B'.format(bytes_per_detection(
+        lambda: [LegacyDetection(0, 0.0, x, y, z, 0.1, noise, 20.0) for x, y, z in rows], num_points)))
+    print('  slots object   {:6.0f} B'.format(bytes_per_detection(
+        lambda: [RadarDetection3D_XYZ(0, 0.0, x, y, z, 0.1, noise, 20.0) for x, y, z in rows], num_points)))
+    print('  DetectionBatch {:6.0f} B'.format(bytes_per_detection(
+        lambda: DetectionBatch(0, 0.0, xyz, 0.1, 20.0, noise), num_points)))
+
+    timings = {
+        'convert_to per object': lambda: [d.convert_to('razel') for d in dets],
+        'convert_detections': lambda: convert_detections(dets, 'razel'),
+        'DetectionBatch.convert_to': lambda: batch.convert_to('razel'),
+        'cartesian_to_spherical (N x 3)': lambda: cartesian_to_spherical(xyz),
+    }
+    print('cartesian -> razel, {} points:'.format(num_points))
+    for name, func in timings.items():
+        t = min(timeit.repeat(func, number=1, repeat=3))
+        print('  {:32s} {:8.2f} ms'.format(name, 1e3 * t))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
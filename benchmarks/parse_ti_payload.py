@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Benchmark parse_ti_payload against the previous per-object struct parser
+
+    python benchmarks/parse_ti_payload.py [num_points]
+"""
+
+import os
+import struct
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rad.urad import parse_ti_header, parse_ti_payload
+
+
+def make_packet(num_points, frame_number=1):
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(num_points, 4)).astype('<f4').tobytes()
+    side_info = rng.integers(0, 1000, size=(num_points, 2)).astype('<u2').tobytes()
+    tlvs = struct.pack('2I', 1, len(points)) + points + struct.pack('2I', 7, len(side_info)) + side_info
+    header = struct.pack('Q8I', 0x708050603040102, 0x03050004, 40 + len(tlvs), 0xa1843,
+        frame_number, 0, num_points, 2, 0)
+    return bytearray(header + tlvs)
+
+
+def legacy_parse_ti_payload(packet, header, tlv_header_len):
+    """The parser before the TLV walker (struct per object, re-slicing the packet)"""
+    objects = np.zeros((header['num_detected_objs'], 6))
+    for i in range(header['num_tlvs']):
+        tlv_type, tlv_length = struct.unpack('2I', packet[:tlv_header_len])
+        if tlv_type > 20 or tlv_length > 10000:
+            packet = bytearray([])
+            break
+        packet = packet[tlv_header_len:]
+        if tlv_type == 1:
+            for j in range(header['num_detected_objs']):
+                x, y, z, v = struct.unpack('4f', packet[:16])
+                objects[j, 0:4] = x, y, z, v
+                packet = packet[16:]
+        elif tlv_type == 7:
+            for j in range(header['num_detected_objs']):
+                snr, noise = struct.unpack('2H', packet[:4])
+                objects[j, 4:6] = snr, noise
+                packet = packet[4:]
+    return {'objects': objects}
+
+
+def main(num_points=500, number=200):
+    packet = make_packet(num_points)
+    header = parse_ti_header(packet, 40)
+    payload = packet[40:]
+    assert np.array_equal(parse_ti_payload(payload, header, 8)['objects'],
+        legacy_parse_ti_payload(payload, header, 8)['objects'])
+    t_new = min(timeit.repeat(lambda: parse_ti_payload(payload, header, 8), number=number, repeat=5)) / number
+    t_old = min(timeit.repeat(lambda: legacy_parse_ti_payload(payload, header, 8), number=number, repeat=5)) / number
+    print('{} points: legacy {:.1f} us, walker {:.1f} us ({:.0f}x)'.format(
+        num_points, 1e6 * t_old, 1e6 * t_new, t_old / t_new))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
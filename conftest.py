@@ -7,3 +7,61 @@
 """
 
 """
+
+import os
+import struct
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def sample_data_file():
+    """Processed-stream capture from an IWR1443 (1443config.cfg), 44 packets"""
+    return os.path.join(os.path.dirname(__file__), 'raw_data_samples', 'raw_data_sample.dat')
+
+
+def _make_urad_packet(frame_number, points, snr=None, noise=None, extra_tlvs=()):
+    """Build an SDK 3.x (xWR18xx) packet with point cloud and side info TLVs
+
+    extra_tlvs are (type, body) pairs appended after those
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 4)
+    n = len(points)
+    snr = np.full(n, 200, dtype=np.uint16) if snr is None else np.asarray(snr, dtype=np.uint16)
+    noise = np.full(n, 50, dtype=np.uint16) if noise is None else np.asarray(noise, dtype=np.uint16)
+    tlvs = b''
+    num_tlvs = 0
+    if n > 0:
+        body = points.tobytes()
+        tlvs += struct.pack('2I', 1, len(body)) + body
+        body = np.column_stack((snr, noise)).astype('<u2').tobytes()
+        tlvs += struct.pack('2I', 7, len(body)) + body
+        num_tlvs = 2
+    for tlv_type, body in extra_tlvs:
+        tlvs += struct.pack('2I', tlv_type, len(body)) + body
+        num_tlvs += 1
+    total = 40 + len(tlvs)
+    total += (32 - total % 32) % 32
+    header = struct.pack('Q8I', 0x708050603040102, 0x03050004, total, 0xa1843,
+        frame_number, 1000 * frame_number, n, num_tlvs, 0)
+    return (header + tlvs).ljust(total, b'\x00')
+
+
+@pytest.fixture
+def urad_packet():
+    """Builder for synthetic uRad (xWR18xx, SDK 3.x) packets"""
+    return _make_urad_packet
+
+
+@pytest.fixture
+def urad_data_file(tmp_path):
+    """Synthetic uRad recording of 20 frames (chirp_config.cfg) with leading garbage"""
+    rng = np.random.default_rng(1)
+    filename = str(tmp_path / 'urad_stream.dat')
+    with open(filename, 'wb') as f:
+        f.write(bytes(37))
+        for frame in range(20):
+            points = rng.normal(size=(frame % 5 + 1, 4))
+            snr = rng.integers(0, 400, len(points))
+            f.write(_make_urad_packet(100 + frame, points, snr=snr))
+    return filename
@@ -2,14 +2,40 @@
 # @Author: Spencer H
 # @Date:   2022-09-01
 # @Last Modified by:   Spencer H
-# @Last Modified date: 2022-11-04
+# @Last Modified date: 2026-10-18
 # @Description:
 """
-
+The public classes are imported on first use, so `import rad` stays cheap
+on headless machines: a playback/decode process only ever loads numpy, and
+pyserial, matplotlib and IPython come in only when a serial port is opened
+or plotting is enabled.
 """
 
-from rad.urad import uRadRadarLive, uRadRadarPlayback
-from rad.radar import Radar
-from rad.config import Config
-from rad.processor import Processor
-from rad.streamer import Streamer
\ No newline at end of file
+import importlib
+import importlib.util
+
+
+_LAZY = {
+    'uRadRadarLive': 'rad.urad',
+    'uRadRadarPlayback': 'rad.urad',
+    'Radar': 'rad.radar',
+    'Config': 'rad.config',
+    'Processor': 'rad.processor',
+    'Streamer': 'rad.streamer',
+}
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    if importlib.util.find_spec('{}.{}'.format(__name__, name)) is not None:
+        # -- submodules, e.g. rad.detections
+        return importlib.import_module('{}.{}'.format(__name__, name))
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Raw ADC cube processing: batched range and Doppler FFTs
+
+Raw captures (e.g. from a DCA1000) are int16 samples, frame after frame,
+chirp after chirp, one block of samples per receive channel. adc_cube turns
+them into (frames, chirps, rx, samples) cubes with the sizes from the
+profileCfg, chirpCfg, frameCfg, channelCfg and adcCfg lines of a config
+file, and RangeDopplerEngine runs the windowed range and Doppler FFTs on
+many frames at once.
+
+The windows and the (zero padded) input buffers of the transforms are made
+once per batch size and reused. scipy.fft is used when it is installed:
+single precision transforms on several threads, run in place in those
+buffers (overwrite_x), so a batch allocates no spectrum. numpy.fft is the
+fallback. It has no in-place transform, so each call allocates its result
+and returns it without copying it into a buffer. Its plans are cached per
+size, but it transforms in double precision (cast to complex64 once for
+float32).
+"""
+
+import numpy as np
+
+
+def _find_config_file(config_file):
+    from .urad import _find_config_file
+    return _find_config_file(config_file)
+
+
+def parse_adc_config(config_file):
+    """Raw data layout and radar parameters from the lines of a config file
+
+    Args:
+        config_file (str): path, or name of a file in rad/config
+
+    Returns:
+        dict: num_rx, num_tx, num_adc_samples, num_range_bins, num_loops,
+            num_chirps (per frame), complex, frame_periodicity_ms,
+            range_resolution_m (per range bin), doppler_resolution_mps
+    """
+    config = {}
+    chirps = {}
+    with open(_find_config_file(config_file)) as f:
+        for line in f:
+            words = line.split()
+            if not words or words[0].startswith('%'):
+                continue
+            if words[0] == 'channelCfg':
+                rx_mask, tx_mask = int(words[1]), int(words[2])
+                config['rx_channels'] = [i for i in range(4) if rx_mask & (1 << i)]
+                config['tx_channels'] = [i for i in range(3) if tx_mask & (1 << i)]
+            elif words[0] == 'adcCfg':
+                config['complex'] = int(words[2]) != 0
+            elif words[0] == 'profileCfg':
+                start_freq, idle_time, ramp_end_time = float(words[2]), float(words[3]), float(words[5])
+                freq_slope, num_adc_samples, sample_rate = float(words[8]), int(words[10]), float(words[11])
+            elif words[0] == 'chirpCfg':
+                for idx in range(int(words[1]), int(words[2]) + 1):
+                    chirps[idx] = int(words[8])
+            elif words[0] == 'frameCfg':
+                chirp_start, chirp_end, num_loops = int(words[1]), int(words[2]), int(words[3])
+                config['frame_periodicity_ms'] = float(words[5])
+    num_range_bins = 1 << (num_adc_samples - 1).bit_length()
+    chirp_tx = [chirps[idx] for idx in range(chirp_start, chirp_end + 1)]
+    num_tx = len(chirp_tx)
+    config.update({
+        'num_rx': len(config['rx_channels']),
+        'num_tx': num_tx,
+        'chirp_tx_masks': chirp_tx,
+        'num_adc_samples': num_adc_samples,
+        'num_range_bins': num_range_bins,
+        'num_loops': num_loops,
+        'num_chirps': num_tx * num_loops,
+        'range_resolution_m': (3e8 * sample_rate * 1e3) / (2 * freq_slope * 1e12 * num_range_bins),
+        'doppler_resolution_mps': 3e8 / (2 * start_freq * 1e9 * (idle_time + ramp_end_time) * 1e-6 * num_loops * num_tx),
+    })
+    return config
+
+
+def frame_size(config):
+    """int16 values in one frame of raw data"""
+    return config['num_chirps'] * config['num_rx'] * config['num_adc_samples'] * (2 if config['complex'] else 1)
+
+
+def adc_cube(raw, config, layout='dca1000', dtype=np.complex64):
+    """Reshape raw int16 ADC samples into a (frames, chirps, rx, samples) cube
+
+    A trailing partial frame is left out.
+
+    Args:
+        raw (bytes-like or np.array): int16 samples (e.g. np.fromfile or a memmap)
+        config (dict): see parse_adc_config
+        layout (str, optional): interleaving of complex samples, "dca1000"
+            (LVDS capture of the xWR14xx/16xx/18xx: I0 I1 Q0 Q1) or "iq"
+            (I0 Q0 I1 Q1). Defaults to "dca1000".
+        dtype (optional): complex64 (default) or complex128, float32 or
+            float64 for real sampling
+    """
+    raw = np.frombuffer(raw, dtype='<i2') if not isinstance(raw, np.ndarray) else raw.view('<i2').reshape(-1)
+    n_frames = len(raw) // frame_size(config)
+    shape = (n_frames, config['num_chirps'], config['num_rx'], config['num_adc_samples'])
+    raw = raw[:n_frames * frame_size(config)]
+    if not config['complex']:
+        return raw.reshape(shape).astype(dtype)
+    cube = np.empty(shape, dtype=dtype)
+    if layout == 'dca1000':
+        groups = raw.reshape(shape[:-1] + (shape[-1] // 2, 4))
+        real, imag = groups[..., :2], groups[..., 2:]
+    elif layout == 'iq':
+        pairs = raw.reshape(shape + (2,))
+        real, imag = pairs[..., 0], pairs[..., 1]
+    else:
+        raise ValueError('Unknown raw data layout {}'.format(layout))
+    cube.real = real.reshape(shape)
+    cube.imag = imag.reshape(shape)
+    return cube
+
+
+def _fft_module():
+    try:
+        import scipy.fft
+        return scipy.fft, True
+    except ImportError:
+        return np.fft, False
+
+
+WINDOWS = {
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+    'rect': np.ones,
+    None: np.ones,
+}
+
+
+class RangeDopplerEngine():
+    """Windowed range and Doppler FFTs over batches of ADC cubes
+
+    Outputs can be views into buffers that are reused by the next call with
+    the same number of frames, copy them to keep them.
+
+    Args:
+        config (dict or str): see parse_adc_config, or a config file
+        dtype (optional): float32 (default) or float64 precision
+        range_window, doppler_window (str, optional): "hann" (default),
+            "hamming", "blackman" or "rect"
+        shift (bool, optional): put zero Doppler in the middle of the
+            Doppler axis. Defaults to True.
+        workers (int, optional): FFT threads (scipy.fft only)
+    """
+
+    def __init__(self, config, dtype=np.float32, range_window='hann', doppler_window='hann', shift=True,
+            workers=None):
+        self.config = parse_adc_config(config) if isinstance(config, str) else config
+        self.real_dtype = np.dtype(dtype)
+        self.complex_dtype = np.result_type(self.real_dtype, np.complex64)
+        self.shift = shift
+        self.workers = workers
+        self._fft, self._native = _fft_module()
+        c = self.config
+        self.num_range_bins = c['num_range_bins'] if c['complex'] else c['num_range_bins'] // 2
+        self.range_window = WINDOWS[range_window](c['num_adc_samples']).astype(self.real_dtype)
+        doppler = WINDOWS[doppler_window](c['num_loops'])
+        if shift and (c['num_loops'] % 2 == 0):
+            # -- (-1)^n modulation moves zero Doppler to the middle, no fftshift copy needed
+            doppler = doppler * (-1.0) ** np.arange(c['num_loops'])
+        self.doppler_window = doppler.astype(self.real_dtype)[:, None, None, None]
+        self._buffers = {}
+
+    def _buffer(self, name, shape, dtype):
+        key = (name, shape)
+        if key not in self._buffers:
+            self._buffers[key] = np.zeros(shape, dtype=dtype)
+        return self._buffers[key]
+
+    def _transform(self, x, axis):
+        if self._native:
+            # -- complex input of the output dtype: the result is written over x
+            return self._fft.fft(x, axis=axis, overwrite_x=True, workers=self.workers)
+        return self._fft.fft(x, axis=axis).astype(self.complex_dtype, copy=False)
+
+    def range_fft(self, cube):
+        """(frames, chirps, rx, samples) -> (frames, chirps, rx, range bins)"""
+        c = self.config
+        samples = c['num_adc_samples']
+        padded = self._buffer('range', cube.shape[:-1] + (c['num_range_bins'],), self.complex_dtype)
+        np.multiply(cube, self.range_window, out=padded[..., :samples])
+        # -- the in-place transform of the previous call wrote over the zero padding
+        padded[..., samples:] = 0
+        return self._transform(padded, axis=-1)[..., :self.num_range_bins]
+
+    def doppler_fft(self, range_cube):
+        """(frames, chirps, rx, range bins) -> (frames, doppler bins, tx, rx, range bins)
+
+        Chirps are taken as loops of one chirp per transmitter (TDM-MIMO), the
+        Doppler FFT runs over the loops
+        """
+        c = self.config
+        n_frames = len(range_cube)
+        shape = (n_frames, c['num_loops'], c['num_tx'], c['num_rx'], range_cube.shape[-1])
+        windowed = self._buffer('doppler', shape, self.complex_dtype)
+        np.multiply(range_cube.reshape(shape), self.doppler_window, out=windowed)
+        spectrum = self._transform(windowed, axis=1)
+        if self.shift and (c['num_loops'] % 2 == 1):
+            spectrum = np.fft.fftshift(spectrum, axes=1)
+        return spectrum
+
+    def process(self, cube):
+        """Range and Doppler FFT of a (frames, chirps, rx, samples) cube
+
+        Returns:
+            np.array: (frames, doppler bins, tx, rx, range bins)
+        """
+        return self.doppler_fft(self.range_fft(cube))
+
+    def power(self, range_doppler):
+        """Range-Doppler power maps, summed over the virtual antennas
+
+        Returns:
+            np.array: (frames, doppler bins, range bins) linear power
+        """
+        n_frames, n_doppler = range_doppler.shape[:2]
+        out = self._buffer('power', (n_frames, n_doppler, range_doppler.shape[-1]), self.real_dtype)
+        magnitude = self._buffer('magnitude', range_doppler.shape, self.real_dtype)
+        np.abs(range_doppler, out=magnitude)
+        np.square(magnitude, out=magnitude)
+        np.sum(magnitude, axis=(2, 3), out=out)
+        return out
+
+    def heatmaps(self, raw, batch_frames=16, layout='dca1000'):
+        """Range-Doppler power maps of a raw capture, batch_frames at a time
+
+        Yields:
+            np.array: (frames, doppler bins, range bins), reused buffers
+        """
+        raw = np.frombuffer(raw, dtype='<i2') if not isinstance(raw, np.ndarray) else raw.view('<i2').reshape(-1)
+        dtype = self.complex_dtype if self.config['complex'] else self.real_dtype
+        step = batch_frames * frame_size(self.config)
+        for start in range(0, len(raw) - frame_size(self.config) + 1, step):
+            cube = adc_cube(raw[start:start + step], self.config, layout, dtype)
+            yield self.power(self.process(cube))
+
+    @property
+    def range_axis(self):
+        """Range of every range bin (m)"""
+        return np.arange(self.num_range_bins) * self.config['range_resolution_m']
+
+    @property
+    def velocity_axis(self):
+        """Radial velocity of every Doppler bin (m/s)"""
+        n = self.config['num_loops']
+        bins = np.arange(n) - n // 2 if self.shift else np.fft.fftfreq(n, 1 / n)
+        return bins * self.config['doppler_resolution_mps']
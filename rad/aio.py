@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+asyncio interface to the radars
+
+The data port is put in non-blocking mode (timeout=0) and read only when the
+event loop reports it readable, so one loop can service several radars.
+Ports without a file descriptor (e.g. on Windows) are polled instead.
+"""
+
+import asyncio
+import concurrent.futures
+from .sync import PacketSync, read_frame_number
+
+
+_END = object()
+
+
+class AsyncFrameStream():
+    """Async iterator over the frames decoded from a serial data port
+
+    Use as `async for frame in stream` (the stream starts on first use) or as
+    `async with stream as frames` to make sure the port reader is removed.
+
+    Args:
+        port (serial.Serial): open data port
+        decode (callable): turns one complete packet into a frame
+        queue_size (int, optional): maximum number of frames waiting for the
+            consumer, the oldest frame is dropped when full. Defaults to 8.
+        poll_interval (float, optional): seconds between reads when the port
+            has no file descriptor to wait on. Defaults to 5 ms.
+        recorder (StreamRecorder, optional): also receives every raw chunk
+    """
+
+    def __init__(self, port, decode, queue_size=8, poll_interval=5e-3, read_size=4096,
+            recorder=None, verbose=False):
+        self.port = port
+        self.decode = decode
+        self.recorder = recorder
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self.verbose = verbose
+        self.sync = PacketSync(buffer_size=2**18, overflow='drop-oldest', verbose=verbose)
+        self.frames = None
+        self.frames_dropped = 0
+        self.error = None
+        self._loop = None
+        self._fd = None
+        self._poller = None
+        self._port_timeout = None
+        self._empty_reads = 0
+        self.closed = False
+
+    def __aiter__(self):
+        if self._loop is None:
+            self.start()
+        return self
+
+    async def __anext__(self):
+        if self._loop is None:
+            self.start()
+        frame = await self.frames.get()
+        if frame is _END:
+            self.frames.put_nowait(_END)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        return frame
+
+    async def __aenter__(self):
+        return self.__aiter__()
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def start(self):
+        """Register the port with the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self.frames = asyncio.Queue()
+        self._port_timeout = self.port.timeout
+        self.port.timeout = 0
+        try:
+            self._fd = self.port.fileno()
+            self._loop.add_reader(self._fd, self._on_readable)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            self._fd = None
+            self._poller = self._loop.create_task(self._poll())
+
+    def discard_buffered(self, then=None):
+        """Drop the raw bytes that are not decoded yet (safe from any thread)
+
+        The reset and then (e.g. a config swap) run in one event loop
+        callback, so nothing is decoded in between. From another thread this
+        waits for that callback.
+        """
+        def discard():
+            self.sync.reset()
+            if then is not None:
+                then()
+
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if (self._loop is None) or in_loop or not self._loop.is_running():
+            discard()
+            return
+        done = concurrent.futures.Future()
+
+        def run():
+            try:
+                discard()
+                done.set_result(None)
+            except BaseException as e:
+                done.set_exception(e)
+
+        self._loop.call_soon_threadsafe(run)
+        done.result()
+
+    def close(self):
+        """Stop reading the port and end the iteration"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if self._loop is not None:
+            if self.port.is_open:
+                self.port.timeout = self._port_timeout
+            self.frames.put_nowait(_END)
+
+    def _on_readable(self):
+        try:
+            data = self.port.read(max(self.port.in_waiting, self.read_size))
+        except Exception as e:
+            self.error = e
+            self.close()
+            return
+        if not data:
+            # -- readable without data: the other end went away, or the input
+            # -- buffer was flushed (see discard_buffered) after the readiness was
+            # -- reported; only the former is reported again
+            self._empty_reads += 1
+            if self._empty_reads > 1:
+                self.close()
+            return
+        self._empty_reads = 0
+        self._feed(data)
+
+    async def _poll(self):
+        while True:
+            try:
+                data = self.port.read(self.port.in_waiting)
+            except Exception as e:
+                self.error = e
+                self.close()
+                return
+            if data:
+                self._feed(data)
+            await asyncio.sleep(self.poll_interval)
+
+    def _feed(self, data):
+        if self.recorder is not None:
+            self.recorder.write(data)
+        self.sync.write(data)
+        while True:
+            packet = self.sync.next_packet()
+            if packet is None:
+                break
+            frame = self.decode(packet)
+            if self.frames.qsize() >= self.queue_size:
+                self.frames.get_nowait()
+                self.frames_dropped += 1
+            self.frames.put_nowait(frame)
+
+
+async def aiter_blocking(frames):
+    """Wrap a (fast, non-serial) frame iterator so the event loop gets a turn between frames"""
+    for frame in frames:
+        yield frame
+        await asyncio.sleep(0)
+
+
+async def aiter_packets(next_packet, decode, pacer=None):
+    """Decode packets of a recording as an async iterator, paced without blocking the loop
+
+    Args:
+        next_packet (callable): returns the next complete packet, None at the end
+        decode (callable): turns one packet into a frame
+        pacer (Pacer, optional): real-time pacing, late frames it drops are
+            not decoded
+    """
+    while True:
+        packet = next_packet()
+        if packet is None:
+            return
+        if (pacer is None) or await pacer.wait_async(read_frame_number(packet)):
+            yield decode(packet)
+        else:
+            await asyncio.sleep(0)
+
+
+async def run_blocking(func, *args):
+    """Run a blocking call (e.g. the CLI config upload) in the default executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
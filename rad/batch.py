@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Multi-process decoding of directories of recordings
+
+Every recording is split into chunks of whole frames with its frame index
+(see rad.index), and the chunks of all recordings are decoded on a process
+pool. The parent allocates one shared memory block per chunk, sized from the
+detection counts of the index, and a worker decodes straight into it: only
+the block name and the number of points go through the pool, the points
+themselves are never pickled. Each recording is written to
+<recording>.decoded.npz once its last chunk is in.
+
+    python -m rad.batch decode <dir> [--config chirp_config.cfg] [--processes N]
+
+Decoding is the same as uRadRadarPlayback(as_batch=True): the points of
+frame i are the data of its DetectionBatch, stamped with the same time.
+"""
+
+import argparse
+import collections
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from .index import load_index
+from .playback import MappedRecording
+from .urad import _uRadRadar
+
+
+FRAMES_DTYPE = np.dtype([
+    ('frame_number', '<u4'),
+    ('timestamp', '<f8'),
+    ('first', '<u8'),
+    ('num_points', '<u4'),
+])
+
+
+def decoded_path(data_file, output_dir=None, root=None):
+    """Output file of a recording, next to it or mirrored under output_dir"""
+    if output_dir is None:
+        return data_file + '.decoded.npz'
+    relative = os.path.relpath(data_file, root) if root is not None else os.path.basename(data_file)
+    return os.path.join(output_dir, relative + '.decoded.npz')
+
+
+# -- per-process state of the workers (also used for in-process decoding)
+_worker = {}
+
+
+def _init_worker(config_file, snr_floor, dtype, detection_filter):
+    _worker['radar'] = _uRadRadar(config_file, snr_floor, as_batch=True, batch_dtype=dtype,
+        detection_filter=detection_filter)
+    _worker['dtype'] = np.dtype(dtype)
+    _worker['recording'] = None
+
+
+def _recording(data_file):
+    recording = _worker['recording']
+    if (recording is None) or (recording.filename != data_file):
+        if recording is not None:
+            recording.close()
+        recording = _worker['recording'] = MappedRecording(data_file)
+    return recording
+
+
+def _chunk_views(buf, n_frames, capacity, dtype):
+    counts = np.ndarray(n_frames, dtype=np.int64, buffer=buf)
+    points = np.ndarray((capacity, 5), dtype=dtype, buffer=buf, offset=counts.nbytes)
+    return counts, points
+
+
+def _decode_chunk(data_file, offsets, lengths, frame0, shm_name, capacity):
+    """Decode the frames at offsets into the shared block, returns the number of points"""
+    radar = _worker['radar']
+    data = _recording(data_file).data
+    radar.frame0 = frame0
+    shm = shared_memory.SharedMemory(name=shm_name)
+    counts, points = _chunk_views(shm.buf, len(offsets), capacity, _worker['dtype'])
+    try:
+        n = 0
+        for i, (offset, length) in enumerate(zip(offsets.tolist(), lengths.tolist())):
+            batch, _ = radar.decode_packet(data[offset:offset+length])
+            k = len(batch.data)
+            points[n:n+k] = batch.data
+            counts[i] = k
+            n += k
+    finally:
+        del counts, points  # -- no views may outlive the block
+        shm.close()
+    return n
+
+
+class _Chunk():
+    def __init__(self, job, start, stop):
+        self.job = job
+        self.start = start
+        self.stop = stop
+        entries = job.index[start:stop]
+        self.offsets = entries['offset'].astype(np.int64)
+        self.lengths = entries['total_packet_len'].astype(np.int64)
+        self.capacity = max(1, int(entries['num_detected_objs'].sum()))
+        self.shm = None
+        self.result = None
+
+    @property
+    def n_frames(self):
+        return self.stop - self.start
+
+    @property
+    def n_bytes(self):
+        return int(self.lengths.sum())
+
+
+class _FileJob():
+    def __init__(self, data_file, output_file, index):
+        self.data_file = data_file
+        self.output_file = output_file
+        self.index = index
+        self.counts = np.zeros(len(index), dtype=np.int64)
+        self.parts = []
+        self.pending = 0
+        self.t0 = time.perf_counter()
+
+
+class BatchDecoder():
+    """Decode many recordings on a process pool
+
+    Args:
+        config_file (str): radar configuration of the recordings
+        processes (int, optional): worker processes, 0 decodes in this
+            process. Defaults to the number of CPUs.
+        chunk_frames (int, optional): frames per task. Defaults to 1024.
+        snr_floor (float, optional): as for uRadRadarPlayback. Defaults to 8.
+        dtype (optional): float64 (default) or float32 for the points
+        detection_filter (DetectionFilter, optional): as for uRadRadarPlayback
+        verbose (bool, optional): print a progress line and a per-file
+            report to stderr
+    """
+
+    def __init__(self, config_file, processes=None, chunk_frames=1024, snr_floor=8, dtype=np.float64,
+            detection_filter=None, verbose=False):
+        self.config_file = config_file
+        self.processes = os.cpu_count() if processes is None else processes
+        self.chunk_frames = chunk_frames
+        self.snr_floor = snr_floor
+        self.dtype = np.dtype(dtype)
+        self.detection_filter = detection_filter
+        self.verbose = verbose
+        self._init_args = (config_file, snr_floor, self.dtype, detection_filter)
+        self.config_data = _uRadRadar(config_file).config_data
+        self.frames_done = 0
+        self.bytes_done = 0
+        self.reports = []
+
+    def decode_directory(self, directory, pattern='*.dat', output_dir=None, recursive=True):
+        """Decode all recordings matching pattern under directory
+
+        Returns:
+            list: one report dict per recording
+        """
+        pattern = os.path.join(directory, '**', pattern) if recursive else os.path.join(directory, pattern)
+        files = sorted(f for f in glob.glob(pattern, recursive=recursive) if os.path.isfile(f))
+        return self.decode_files(files, output_dir=output_dir, root=directory)
+
+    def decode_files(self, files, output_dir=None, root=None):
+        """Decode the recordings, writing one output per file
+
+        Returns:
+            list: one report dict per recording (file, output, frames,
+                points, bytes, seconds)
+        """
+        self.frames_done = 0
+        self.bytes_done = 0
+        self.reports = []
+        self._frames_total = 0
+        self._t0 = time.perf_counter()
+        jobs = (self._job(f, decoded_path(f, output_dir, root)) for f in files)
+        if self.processes == 0:
+            _init_worker(*self._init_args)
+            try:
+                for chunk in self._chunks(jobs):
+                    self._submit(chunk, None)
+                    self._collect(chunk)
+            finally:
+                if _worker['recording'] is not None:
+                    _worker['recording'].close()
+                _worker.clear()
+        else:
+            with multiprocessing.Pool(self.processes, _init_worker, self._init_args) as pool:
+                in_flight = collections.deque()
+                try:
+                    for chunk in self._chunks(jobs):
+                        # -- bounded: at most two blocks per worker are allocated at a time
+                        if len(in_flight) >= 2 * self.processes:
+                            self._collect(in_flight.popleft())
+                        self._submit(chunk, pool)
+                        in_flight.append(chunk)
+                    while in_flight:
+                        self._collect(in_flight.popleft())
+                finally:
+                    for chunk in in_flight:
+                        self._free(chunk)
+        if self.verbose:
+            elapsed = time.perf_counter() - self._t0
+            print('\ndecoded {} files, {} frames, {:.1f} MB in {:.2f} s ({:.1f} MB/s)'.format(
+                len(self.reports), self.frames_done, self.bytes_done / 1e6, elapsed,
+                self.bytes_done / 1e6 / max(elapsed, 1e-9)), file=sys.stderr)
+        return self.reports
+
+    def _job(self, data_file, output_file):
+        index = load_index(data_file, self.config_data['frame_duration_s'], 40)
+        self._frames_total += len(index)
+        return _FileJob(data_file, output_file, index)
+
+    def _chunks(self, jobs):
+        for job in jobs:
+            starts = range(0, len(job.index), self.chunk_frames)
+            job.pending = len(starts)
+            if job.pending == 0:
+                self._write(job)
+            for start in starts:
+                yield _Chunk(job, start, min(start + self.chunk_frames, len(job.index)))
+
+    def _submit(self, chunk, pool):
+        job = chunk.job
+        size = 8 * chunk.n_frames + self.dtype.itemsize * 5 * chunk.capacity
+        chunk.shm = shared_memory.SharedMemory(create=True, size=size)
+        frame0 = int(job.index['frame_number'][0])
+        args = (job.data_file, chunk.offsets, chunk.lengths, frame0, chunk.shm.name, chunk.capacity)
+        if pool is None:
+            chunk.result = _decode_chunk(*args)
+        else:
+            chunk.result = pool.apply_async(_decode_chunk, args)
+
+    def _collect(self, chunk):
+        n = chunk.result if isinstance(chunk.result, int) else chunk.result.get()
+        job = chunk.job
+        counts, points = _chunk_views(chunk.shm.buf, chunk.n_frames, chunk.capacity, self.dtype)
+        job.counts[chunk.start:chunk.stop] = counts
+        job.parts.append(points[:n].copy())
+        del counts, points
+        self._free(chunk)
+        self.frames_done += chunk.n_frames
+        self.bytes_done += chunk.n_bytes
+        job.pending -= 1
+        if job.pending == 0:
+            self._write(job)
+        if self.verbose:
+            elapsed = time.perf_counter() - self._t0
+            print('\r{}/{} frames, {:.1f} MB/s'.format(self.frames_done, self._frames_total,
+                self.bytes_done / 1e6 / max(elapsed, 1e-9)), end='', file=sys.stderr)
+
+    def _free(self, chunk):
+        if chunk.shm is not None:
+            chunk.shm.close()
+            chunk.shm.unlink()
+            chunk.shm = None
+
+    def _write(self, job):
+        frames = np.zeros(len(job.index), dtype=FRAMES_DTYPE)
+        frames['frame_number'] = job.index['frame_number']
+        frames['timestamp'] = job.index['timestamp']
+        frames['num_points'] = job.counts
+        frames['first'][1:] = np.cumsum(job.counts)[:-1]
+        points = np.concatenate(job.parts) if job.parts else np.zeros((0, 5), dtype=self.dtype)
+        job.parts = []
+        directory = os.path.dirname(job.output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = job.output_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, frames=frames, points=points, config_file=os.path.basename(self.config_file),
+                snr_floor=self.snr_floor)
+        os.replace(tmp, job.output_file)
+        report = {'file': job.data_file, 'output': job.output_file, 'frames': len(frames),
+            'points': len(points), 'bytes': int(job.index['total_packet_len'].sum()),
+            'seconds': time.perf_counter() - job.t0}
+        self.reports.append(report)
+        if self.verbose:
+            print('\r{}: {} frames, {} points, {:.1f} MB in {:.2f} s'.format(job.data_file, report['frames'],
+                report['points'], report['bytes'] / 1e6, report['seconds']), file=sys.stderr)
+
+
+def load_decoded(path):
+    """Frames and points of a decoded recording
+
+    Returns:
+        (np.array, np.array): frames (FRAMES_DTYPE) and points (N x 5: x,
+            y, z, rrt, snr), the points of frame i are
+            points[first:first+num_points]
+    """
+    with np.load(path) as decoded:
+        return decoded['frames'], decoded['points']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m rad.batch', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    decode = commands.add_parser('decode', help='decode all recordings in a directory')
+    decode.add_argument('directory')
+    decode.add_argument('--config', default='chirp_config.cfg', help='radar configuration file')
+    decode.add_argument('--pattern', default='*.dat', help='recordings to decode (glob)')
+    decode.add_argument('--output', default=None, help='output directory (default: next to the recordings)')
+    decode.add_argument('--processes', type=int, default=None, help='worker processes (0: in process)')
+    decode.add_argument('--chunk-frames', type=int, default=1024)
+    decode.add_argument('--snr-floor', type=float, default=8)
+    decode.add_argument('--float32', action='store_true', help='store the points as float32')
+    args = parser.parse_args(argv)
+
+    decoder = BatchDecoder(args.config, processes=args.processes, chunk_frames=args.chunk_frames,
+        snr_floor=args.snr_floor, dtype=np.float32 if args.float32 else np.float64, verbose=True)
+    decoder.decode_directory(args.directory, pattern=args.pattern, output_dir=args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
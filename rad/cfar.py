@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+CFAR detection and peak grouping on range profiles and range-Doppler maps
+
+Maps are linear power with the last two axes (Doppler bins, range bins),
+e.g. RangeDopplerEngine.power, with any number of leading (frame) axes.
+The training windows of every cell are summed at once for the whole batch:
+1-D windows from cumulative sums along the axis, 2-D windows from a
+summed-area table, so the cost does not depend on the window size. OS-CFAR
+sorts the training cells of all cells of a frame at once (sliding window
+views), one frame at a time to bound the memory.
+
+Averaging modes follow the cfarCfg line of the TI demos:
+
+    ca: mean of all training cells
+    go: greater of the mean of the lagging and of the leading cells
+    so: smaller of the two
+    os: rank-th fraction of the sorted training cells
+
+Without wrap, cells past the edge of an axis are not counted (edge cells
+average the training cells they have). detect runs one or more CFARs
+(a cell must pass all of them) and the peak grouping, and returns the
+detections as columns.
+"""
+
+import numpy as np
+
+
+METHODS = ('ca', 'go', 'so', 'os')
+# -- averaging modes of cfarCfg
+CONFIG_METHODS = {0: 'ca', 1: 'go', 2: 'so'}
+
+
+def _pad(x, axis, width, wrap, value=0.0):
+    pad = [(0, 0)] * x.ndim
+    pad[axis] = (width, width)
+    if wrap:
+        return np.pad(x, pad, mode='wrap')
+    return np.pad(x, pad, mode='constant', constant_values=value)
+
+
+def _table(x, axes):
+    """Cumulative sums over axes with a leading zero along each (float64 accumulation)"""
+    for axis in axes:
+        pad = [(0, 0)] * x.ndim
+        pad[axis] = (1, 0)
+        x = np.pad(np.cumsum(x, axis=axis, dtype=np.float64), pad)
+    return x
+
+
+def _take(x, axis, start, n):
+    return np.take(x, np.arange(start, start + n), axis=axis) if axis is not None else x
+
+
+def _window_sum_1d(table, axis, start, stop, n):
+    """Sum over [i+start, i+stop) of the padded input for every cell i"""
+    return _take(table, axis, stop, n) - _take(table, axis, start, n)
+
+
+def _window_sum_2d(table, rows, cols, shape):
+    """Sum over rows [i+r0, i+r1) and cols [j+c0, j+c1) of the padded input for every cell (i, j)"""
+    (r0, r1), (c0, c1) = rows, cols
+    n_rows, n_cols = shape
+    return (table[..., r1:r1 + n_rows, c1:c1 + n_cols] - table[..., r0:r0 + n_rows, c1:c1 + n_cols]
+        - table[..., r1:r1 + n_rows, c0:c0 + n_cols] + table[..., r0:r0 + n_rows, c0:c0 + n_cols])
+
+
+def _combine(method, lag, lead, n_lag, n_lead):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'ca':
+            return (lag + lead) / (n_lag + n_lead)
+        lag_mean, lead_mean = lag / n_lag, lead / n_lead
+    # -- at an edge one side can be empty, the other side is used alone
+    lag_mean = np.where(n_lag > 0, lag_mean, lead_mean)
+    lead_mean = np.where(n_lead > 0, lead_mean, lag_mean)
+    return np.maximum(lag_mean, lead_mean) if method == 'go' else np.minimum(lag_mean, lead_mean)
+
+
+def _order_statistic(windows, counts, rank):
+    """rank-th fraction of the sorted valid (finite) training cells, windows (..., cells)"""
+    ordered = np.sort(windows, axis=-1)  # -- padding is +inf and sorts last
+    k = np.floor(rank * (np.maximum(counts, 1) - 1)).astype(np.intp)
+    k = np.broadcast_to(k, ordered.shape[:-1])
+    return np.take_along_axis(ordered, k[..., None], axis=-1)[..., 0]
+
+
+def _check(method, rank):
+    if method not in METHODS:
+        raise ValueError('Unknown CFAR method {}, use one of {}'.format(method, METHODS))
+    if not 0 <= rank <= 1:
+        raise ValueError('rank is a fraction of the training cells, got {}'.format(rank))
+
+
+class _CFAR():
+    def mask(self, power):
+        """Cells above the threshold
+
+        Returns:
+            (np.array, np.array): boolean mask and noise estimate, both
+                shaped like power
+        """
+        power = np.asarray(power)
+        noise = self.noise(power)
+        return power > self.scale * noise, noise
+
+    @property
+    def scale(self):
+        return 10 ** (self.threshold_db / 10)
+
+
+class CFAR(_CFAR):
+    """CFAR along one axis (e.g. range profiles, or the range or Doppler axis of maps)
+
+    Args:
+        method (str, optional): "ca" (default), "go", "so" or "os"
+        guard (int, optional): guard cells on each side. Defaults to 2.
+        train (int, optional): training cells on each side. Defaults to 8.
+        threshold_db (float, optional): detection threshold over the noise
+            estimate. Defaults to 12.
+        rank (float, optional): fraction of the sorted training cells taken
+            as noise by OS-CFAR. Defaults to 0.75.
+        wrap (bool, optional): the axis is cyclic (e.g. Doppler)
+        axis (int, optional): Defaults to -1 (range).
+    """
+
+    def __init__(self, method='ca', guard=2, train=8, threshold_db=12.0, rank=0.75, wrap=False, axis=-1):
+        _check(method, rank)
+        self.method = method
+        self.guard = guard
+        self.train = train
+        self.threshold_db = threshold_db
+        self.rank = rank
+        self.wrap = wrap
+        self.axis = axis
+
+    def noise(self, power):
+        """Noise estimate of every cell (same shape as power)"""
+        power = np.asarray(power)
+        axis = self.axis % power.ndim
+        n = power.shape[axis]
+        width = self.guard + self.train
+        if self.wrap and width >= n:
+            raise ValueError('CFAR window of {} cells does not fit an axis of {}'.format(2 * width + 1, n))
+        # -- the valid-cell indicator is the same for every line, summed once
+        valid = _pad(np.ones(n), 0, width, self.wrap)
+        if self.method == 'os':
+            return self._os_noise(power, axis, width, valid)
+        table = _table(_pad(power, axis, width, self.wrap), [axis])
+        valid_table = _table(valid, [0])
+        sums, counts = [], []
+        for start, stop in ((0, self.train), (width + self.guard + 1, 2 * width + 1)):
+            sums.append(_window_sum_1d(table, axis, start, stop, n))
+            counts.append(_window_sum_1d(valid_table, 0, start, stop, n).reshape((n,) + (1,) * (power.ndim - axis - 1)))
+        return _combine(self.method, sums[0], sums[1], counts[0], counts[1]).astype(power.dtype, copy=False)
+
+    def _os_noise(self, power, axis, width, valid):
+        n = power.shape[axis]
+        cells = np.r_[0:self.train, width + self.guard + 1:2 * width + 1]
+        counts = np.lib.stride_tricks.sliding_window_view(valid, 2 * width + 1)[:, cells].sum(axis=-1)
+        padded = np.moveaxis(_pad(power, axis, width, self.wrap, value=np.inf), axis, -1)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * width + 1, axis=-1)[..., cells]
+        return np.moveaxis(_order_statistic(windows, counts, self.rank), -1, axis).astype(power.dtype, copy=False)
+
+
+class CFAR2D(_CFAR):
+    """CFAR over a rectangular window on the last two axes (Doppler, range)
+
+    The training cells are the window minus the guard rectangle. GO and SO
+    compare the lagging (range bins up to the cell) and leading (range bins
+    from the cell on) halves of the window.
+
+    Args:
+        method (str, optional): "ca" (default), "go", "so" or "os"
+        guard (tuple, optional): guard cells on each side (Doppler,
+            range). Defaults to (1, 2).
+        train (tuple, optional): training cells on each side past the guard
+            (Doppler, range). Defaults to (2, 8).
+        threshold_db (float, optional): Defaults to 12.
+        rank (float, optional): as for CFAR. Defaults to 0.75.
+        wrap (tuple, optional): cyclic axes (Doppler, range). Defaults to
+            (True, False).
+    """
+
+    def __init__(self, method='ca', guard=(1, 2), train=(2, 8), threshold_db=12.0, rank=0.75, wrap=(True, False)):
+        _check(method, rank)
+        self.method = method
+        self.guard = tuple(guard)
+        self.train = tuple(train)
+        self.threshold_db = threshold_db
+        self.rank = rank
+        self.wrap = tuple(wrap)
+
+    def _padded(self, x, widths, value=0.0):
+        for axis, width, wrap in zip((-2, -1), widths, self.wrap):
+            x = _pad(x, x.ndim + axis, width, wrap, value)
+        return x
+
+    def noise(self, power):
+        """Noise estimate of every cell (same shape as power)"""
+        power = np.asarray(power)
+        shape = power.shape[-2:]
+        widths = tuple(g + t for g, t in zip(self.guard, self.train))
+        for n, width, wrap in zip(shape, widths, self.wrap):
+            if wrap and width >= n:
+                raise ValueError('CFAR window of {} cells does not fit an axis of {}'.format(2 * width + 1, n))
+        valid = self._padded(np.ones(shape), widths)
+        if self.method == 'os':
+            return self._os_noise(power, widths, valid)
+        (gd, gr), (wd, wr) = self.guard, widths
+        rows, guard_rows = (0, 2 * wd + 1), (wd - gd, wd + gd + 1)
+        halves = [((0, wr + 1), (wr - gr, wr + 1)), ((wr, 2 * wr + 1), (wr, wr + gr + 1))]
+        if self.method == 'ca':
+            halves = [((0, 2 * wr + 1), (wr - gr, wr + gr + 1))]
+        sums, counts = [], []
+        for x, out in ((self._padded(power, widths), sums), (valid, counts)):
+            table = _table(x, [x.ndim - 2, x.ndim - 1])
+            for cols, guard_cols in halves:
+                out.append(_window_sum_2d(table, rows, cols, shape) - _window_sum_2d(table, guard_rows, guard_cols, shape))
+        if self.method == 'ca':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                noise = sums[0] / counts[0]
+        else:
+            noise = _combine(self.method, sums[0], sums[1], counts[0], counts[1])
+        return noise.astype(power.dtype, copy=False)
+
+    def _os_noise(self, power, widths, valid):
+        (gd, gr), (wd, wr) = self.guard, widths
+        window = (2 * wd + 1, 2 * wr + 1)
+        training = np.ones(window, dtype=bool)
+        training[wd - gd:wd + gd + 1, wr - gr:wr + gr + 1] = False
+        counts = np.lib.stride_tricks.sliding_window_view(valid, window)[..., training].sum(axis=-1)
+        frames = power.reshape((-1,) + power.shape[-2:])
+        noise = np.empty(frames.shape, dtype=power.dtype)
+        for i, frame in enumerate(frames):
+            windows = np.lib.stride_tricks.sliding_window_view(self._padded(frame, widths, np.inf), window)
+            noise[i] = _order_statistic(windows[..., training], counts, self.rank)
+        return noise.reshape(power.shape)
+
+
+class PeakGrouping():
+    """Keep only the detections that are local maxima (the peakGrouping line)
+
+    Args:
+        scheme (str, optional): "matrix" (default) compares with all
+            neighbors, "cfar" only with the neighbors that were detected
+        range_direction, doppler_direction (bool, optional): neighbors along
+            range and along Doppler (cyclic). Both default to True.
+        min_range_index, max_range_index (int, optional): detections
+            outside [min, max] are dropped
+    """
+
+    def __init__(self, scheme='matrix', range_direction=True, doppler_direction=True, min_range_index=0,
+            max_range_index=None):
+        if scheme not in ('matrix', 'cfar'):
+            raise ValueError('Unknown peak grouping scheme {}'.format(scheme))
+        self.scheme = scheme
+        self.range_direction = range_direction
+        self.doppler_direction = doppler_direction
+        self.min_range_index = min_range_index
+        self.max_range_index = max_range_index
+
+    def apply(self, power, mask):
+        """Mask of the detections that survive the grouping (power and mask are (..., Doppler, range))"""
+        power = np.asarray(power)
+        keep = np.array(mask, dtype=bool)
+        candidates = np.where(keep, power, -np.inf) if self.scheme == 'cfar' else power
+        # -- range is padded so that the edges only have one neighbor, Doppler is cyclic
+        padded = np.pad(candidates, [(0, 0)] * (power.ndim - 1) + [(1, 1)], constant_values=-np.inf)
+        n_doppler, n_range = power.shape[-2:]
+        doppler = np.arange(n_doppler)
+        d_steps = (-1, 0, 1) if self.doppler_direction else (0,)
+        r_steps = (-1, 0, 1) if self.range_direction else (0,)
+        # -- with 1 or 2 Doppler bins the cyclic steps land on the cell itself or on the same neighbor
+        offsets = sorted({(dd % n_doppler, dr) for dd in d_steps for dr in r_steps} - {(0, 0)})
+        for dd, dr in offsets:
+            rows = (doppler + dd) % n_doppler
+            neighbor = padded[..., rows, 1 + dr:1 + dr + n_range]
+            # -- ties go to the earlier cell, so that a plateau gives one peak
+            earlier = (rows < doppler)[:, None] if dd else (dr < 0)
+            np.logical_and(keep, np.where(earlier, power > neighbor, power >= neighbor), out=keep)
+        keep[..., :self.min_range_index] = False
+        if self.max_range_index is not None:
+            keep[..., self.max_range_index + 1:] = False
+        return keep
+
+
+def detect(power, cfar, peak_grouping=None, range_axis=None, velocity_axis=None):
+    """Detections of range-Doppler maps as columns
+
+    Args:
+        power (np.array): (..., Doppler, range) linear power, range
+            profiles as (frames, 1, range)
+        cfar (CFAR, CFAR2D or list): detectors, a cell must pass all of
+            them, the noise (and SNR) is the estimate of the first
+        peak_grouping (PeakGrouping, optional)
+        range_axis, velocity_axis (np.array, optional): meters per range
+            bin and m/s per Doppler bin (e.g. RangeDopplerEngine.range_axis)
+
+    Returns:
+        dict: frame (index over the flattened leading axes), doppler_index,
+            range_index, power, noise, snr_db, plus range_m and velocity_mps
+            if the axes are given, all 1-D arrays of the same length
+    """
+    power = np.asarray(power)
+    cfars = list(cfar) if isinstance(cfar, (list, tuple)) else [cfar]
+    mask, noise = cfars[0].mask(power)
+    for other in cfars[1:]:
+        np.logical_and(mask, other.mask(power)[0], out=mask)
+    if peak_grouping is not None:
+        mask = peak_grouping.apply(power, mask)
+    maps = (-1,) + power.shape[-2:]
+    frame, doppler, rng = np.nonzero(mask.reshape(maps))
+    columns = {
+        'frame': frame,
+        'doppler_index': doppler,
+        'range_index': rng,
+        'power': power.reshape(maps)[frame, doppler, rng],
+        'noise': noise.reshape(maps)[frame, doppler, rng],
+    }
+    with np.errstate(divide='ignore'):
+        columns['snr_db'] = 10 * np.log10(columns['power'] / columns['noise'])
+    if range_axis is not None:
+        columns['range_m'] = np.asarray(range_axis)[rng]
+    if velocity_axis is not None:
+        columns['velocity_mps'] = np.asarray(velocity_axis)[doppler]
+    return columns
+
+
+def from_config(config_file):
+    """Detectors and peak grouping of the cfarCfg and peakGrouping lines of a config file
+
+    SDK 3.x lines (cfarCfg <subFrame> <direction> <mode> <window> <guard>
+    <divShift> <cyclic> <threshold dB> <peakGrouping>) give one CFAR per
+    direction with the threshold in dB. The xWR14xx line (cfarCfg
+    <direction> <mode> <window> <guard> <divShift> <cyclic> <threshold>)
+    has the threshold in 1/256 log2 magnitude units of its detection matrix
+    (summed over the virtual antennas), converted to dB here.
+
+    Returns:
+        (list, PeakGrouping): detectors for detect (range direction first)
+            and the grouping, or None if it is disabled
+    """
+    from .adc import _find_config_file, parse_adc_config
+    cfars = []
+    grouping = {}
+    scheme = 'cfar'
+    min_range, max_range = 0, None
+    with open(_find_config_file(config_file)) as f:
+        for line in f:
+            words = line.split()
+            if not words or words[0].startswith('%'):
+                continue
+            if words[0] == 'cfarCfg':
+                if len(words) >= 10:
+                    direction, mode, window, guard, _, cyclic = (int(w) for w in words[2:8])
+                    threshold_db = float(words[8])
+                    grouping[direction] = int(words[9]) == 1
+                else:
+                    direction, mode, window, guard, _, cyclic, threshold = (int(w) for w in words[1:8])
+                    config = parse_adc_config(config_file)
+                    threshold_db = threshold / 256 * 20 * np.log10(2) / (config['num_tx'] * config['num_rx'])
+                cfars.append(CFAR(CONFIG_METHODS[mode], guard=guard, train=window, threshold_db=threshold_db,
+                    wrap=cyclic == 1, axis=-1 if direction == 0 else -2))
+            elif words[0] == 'peakGrouping':
+                values = [int(w) for w in words[1:]][-5:]
+                scheme = 'matrix' if values[0] == 1 else 'cfar'
+                grouping = {0: values[1] == 1, 1: values[2] == 1}
+                min_range, max_range = values[3], values[4]
+    cfars.sort(key=lambda c: c.axis, reverse=True)
+    if not any(grouping.values()):
+        return cfars, None
+    return cfars, PeakGrouping(scheme, grouping.get(0, False), grouping.get(1, False), min_range, max_range)
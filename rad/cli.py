@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Acknowledged command upload over the TI mmWave CLI (config) port
+
+The demo firmware echoes every command, answers "Done" (or an error) and
+prints its prompt. Each command is sent as soon as the previous one is
+acknowledged instead of after a fixed sleep, with a timeout per command.
+Serial reads release the GIL, so several radars are configured at once from
+threads (see start_concurrently). A running sensor is reconfigured over the
+open port by sending only the lines that changed (see reconfigure).
+"""
+
+import concurrent.futures
+import time
+
+
+PROMPT = b'mmwDemo:/>'
+ACK = b'Done'
+ERROR_MARKERS = (b'Error', b'not recognized', b'Invalid usage')
+# -- seconds to wait for an acknowledgement, sensorStart runs the calibrations first
+DEFAULT_TIMEOUTS = {None: 1.0, 'sensorStart': 5.0}
+# -- commands that act on the sensor instead of configuring it
+CONTROL_COMMANDS = ('sensorStop', 'sensorStart', 'flushCfg')
+# -- leading index fields that tell the lines of one command apart (cfarCfg see setting_key)
+INDEX_FIELDS = {'chirpCfg': 2, 'profileCfg': 1}
+
+
+class CommandError(RuntimeError):
+    """A CLI command that the device rejected or did not acknowledge in time
+
+    Attributes:
+        command (str): the command as sent
+        response (str): what the device answered
+    """
+
+    def __init__(self, command, response, timed_out=False):
+        self.command = command
+        self.response = response
+        self.timed_out = timed_out
+        if timed_out:
+            message = "No acknowledgement for '{}' (received {!r})".format(command, response)
+        else:
+            message = "Device rejected '{}': {}".format(command, response.strip())
+        super().__init__(message)
+
+
+def read_commands(lines):
+    """CLI commands of config file lines (comments and blank lines dropped)"""
+    commands = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('%'):
+            commands.append(line)
+    return commands
+
+
+def read_config_commands(config_file):
+    with open(config_file, 'r') as f:
+        return read_commands(f)
+
+
+def _drain(port):
+    n = port.in_waiting
+    return port.read(n) if n > 0 else b''
+
+
+def send_command(port, command, timeout=1.0, clock=time.monotonic):
+    """Send one command and wait for its acknowledgement
+
+    The command is done at "Done", or at the prompt once the echo of the
+    command came back (some commands only answer with the prompt).
+
+    Returns:
+        str: the response of the device
+
+    Raises:
+        CommandError: on an error response or if nothing acknowledged the
+            command within timeout seconds
+    """
+    echo = command.encode()
+    deadline = clock() + timeout
+    port.write(echo + b'\n')
+    response = bytearray()
+    while True:
+        # -- returns as soon as anything arrives (port.timeout bounds the wait)
+        response += port.read(max(1, port.in_waiting))
+        echoed = response.find(echo)
+        after = response[echoed + len(echo):] if echoed >= 0 else response
+        if any(marker in after for marker in ERROR_MARKERS):
+            if PROMPT in after or clock() >= deadline:
+                raise CommandError(command, response.decode(errors='replace'))
+        elif (ACK in after) or ((echoed >= 0) and (PROMPT in after)):
+            return response.decode(errors='replace')
+        if clock() >= deadline:
+            raise CommandError(command, response.decode(errors='replace'), timed_out=True)
+
+
+def send_config(port, commands, timeout=DEFAULT_TIMEOUTS, skip=(), read_timeout=0.01, verbose=False, name=''):
+    """Upload commands one after the other, each as soon as the previous is acknowledged
+
+    Args:
+        port (serial.Serial): the CLI port
+        commands (list): commands (see read_commands)
+        timeout (float or dict, optional): seconds to wait for each
+            acknowledgement, a dict maps commands (first word) to their own
+            timeout with the default under None. Defaults to
+            DEFAULT_TIMEOUTS.
+        skip (tuple, optional): commands (first word) not to send
+        read_timeout (float, optional): longest single blocking read while
+            waiting, the port's own timeout is restored afterwards
+
+    Returns:
+        dict: commands (sent), seconds (total), per_command ((command,
+            seconds) pairs)
+
+    Raises:
+        CommandError: naming the first command that failed, nothing after
+            it is sent
+    """
+    timeouts = timeout if isinstance(timeout, dict) else {None: timeout}
+    t0 = time.perf_counter()
+    per_command = []
+    previous_timeout = port.timeout
+    port.timeout = read_timeout
+    try:
+        leftover = _drain(port)
+        if verbose and leftover:
+            print('{}{}'.format(name, leftover.decode(errors='replace')))
+        for command in commands:
+            word = command.split()[0]
+            if word in skip:
+                if verbose:
+                    print("{}skipping '{}'".format(name, command))
+                continue
+            _drain(port)  # -- e.g. a prompt that came after the previous "Done"
+            t = time.perf_counter()
+            response = send_command(port, command, timeouts.get(word, timeouts[None]))
+            per_command.append((command, time.perf_counter() - t))
+            if verbose:
+                print("{}sent '{}', received '{}'".format(name, command, response.strip()))
+    finally:
+        port.timeout = previous_timeout
+    return {'commands': len(per_command), 'seconds': time.perf_counter() - t0, 'per_command': per_command}
+
+
+def setting_key(line):
+    """What a config line sets: its command and index fields
+
+    chirpCfg is keyed by its start and end chirp, profileCfg by the profile
+    id and cfarCfg by the subframe and direction (SDK 2+, 8 arguments or
+    more) or by the direction alone (legacy 7 argument lines).
+    """
+    command, *args = line.split()
+    if command == 'cfarCfg':
+        n_index = 2 if len(args) > 7 else 1
+    else:
+        n_index = INDEX_FIELDS.get(command, 0)
+    return (command,) + tuple(args[:n_index])
+
+
+def config_changes(active, new):
+    """Configuration commands to send to go from the active to the new config
+
+    Lines are compared as a whole (after normalizing whitespace) and matched
+    by what they set (see setting_key). A changed line replaces the active
+    line of the same key. If a key of the active config is gone, or a key
+    that changed has several lines so that the replaced one is unknown, the
+    device state cannot be patched and the whole new config is needed
+    (full=True, starting with flushCfg).
+
+    Args:
+        active, new (list): config lines (see read_commands)
+
+    Returns:
+        (list, bool): commands to send, full upload
+    """
+    def settings(lines):
+        return [' '.join(line.split()) for line in read_commands(lines) if line.split()[0] not in CONTROL_COMMANDS]
+
+    def by_key(lines):
+        grouped = {}
+        for line in lines:
+            grouped.setdefault(setting_key(line), []).append(line)
+        return grouped
+    active, new = settings(active), settings(new)
+    active_lines, new_lines = by_key(active), by_key(new)
+    changed = []
+    for line in new:
+        before, after = active_lines.get(setting_key(line), []), new_lines[setting_key(line)]
+        if before != after:
+            if len(before) > 1 or len(after) > 1:
+                return ['flushCfg'] + new, True
+            changed.append(line)
+    if any(key not in new_lines for key in active_lines):
+        return ['flushCfg'] + new, True
+    return changed, False
+
+
+def reconfigure(port, active, new, on_stopped=None, timeout=DEFAULT_TIMEOUTS, verbose=False, name=''):
+    """Switch a running sensor to a new config without closing the port
+
+    Sends sensorStop, then only the commands that changed (see
+    config_changes), then sensorStart. on_stopped is called while the
+    sensor is stopped, i.e. between the last frame of the active config and
+    the first frame of the new one.
+
+    Returns:
+        dict: as send_config, plus changed (the commands sent) and full
+    """
+    changed, full = config_changes(active, new)
+    t0 = time.perf_counter()
+    report = send_config(port, ['sensorStop'], timeout, verbose=verbose, name=name)
+    if on_stopped is not None:
+        on_stopped()
+    start = [line for line in read_commands(new) if line.split()[0] == 'sensorStart'][-1:] or ['sensorStart']
+    upload = send_config(port, changed + start, timeout, verbose=verbose, name=name)
+    report['commands'] += upload['commands']
+    report['per_command'] += upload['per_command']
+    report['seconds'] = time.perf_counter() - t0
+    report['changed'] = changed
+    report['full'] = full
+    return report
+
+
+def start_concurrently(radars):
+    """Call start() on all radars at the same time (one thread each)
+
+    Raises the first error after every start has finished
+    """
+    radars = [radar for radar in radars if not getattr(radar, 'started', True)]
+    if len(radars) <= 1:
+        for radar in radars:
+            radar.start()
+        return
+    with concurrent.futures.ThreadPoolExecutor(len(radars)) as pool:
+        futures = [pool.submit(radar.start) for radar in radars]
+    for future in futures:
+        future.result()
@@ -1,5 +1,3 @@
-import serial
-import time
 import os
 
 
@@ -52,14 +50,20 @@ class Config:
         self.serial_enabled = enable_serial
         self.CLIport = None
         self.Dataport = None
+        self.configReport = None
         if enable_serial:
+            import serial
 
             #initialize the serial ports
             self.CLIport = serial.Serial(CLI_port, 115200)
             self.Dataport = serial.Serial(Data_port, 921600)
 
-            #send to the device
-            self.sendConfigSerial()
+            #send to the device, a rejected config leaves no ports open behind
+            try:
+                self.sendConfigSerial()
+            except Exception:
+                self.close_serial()
+                raise
 
         return
     
@@ -74,34 +78,17 @@ class Config:
 
     def sendConfigSerial(self):
         """Send the configuration to the mmWave radar, but do not start sensor operation
-        """
 
+        Each command is sent as soon as the device acknowledges the previous
+        one (see rad.cli), a rejected command raises rad.cli.CommandError.
+        """
+        from . import cli
 
-        #read the configuration and send it to the device
-        for i in self.config:
-            if(i != "sensorStart"):
-                
-                #send the command
-                self.CLIport.write((i+'\n').encode())
-
-                #wait for 0.05 s for the command to be sent
-                time.sleep(0.07)
-
-                #get the response from the sensor to confirm message was received
-                resp = self.CLIport.read(self.CLIport.in_waiting).decode('utf-8')
-                #resp = resp.strip().split('\n').reverse()
-                #resp = " ".join(resp)
-                if self.verbose:
-                    print("Config.sendConfigSerial: sent '{}'".format(i))
-                    print("Config.sendConfigSerial: received '{}'".format(resp))
-            #special behavior for sensorStart command
-            elif (i == "sensorStart"):
-                if self.verbose:
-                    print("Config.sendConfigSerial: 'sensorStart' in config file. Skipping sensorStart command")
-            
-            #sleep before sending next command
-            time.sleep(0.01)       
-        
+        self.configReport = cli.send_config(self.CLIport, cli.read_commands(self.config),
+            skip=("sensorStart",), verbose=self.verbose, name="Config.sendConfigSerial: ")
+        if self.verbose:
+            print("Config.sendConfigSerial: sent {} commands in {:.2f} s".format(
+                self.configReport["commands"], self.configReport["seconds"]))
         return
     
     def parseConfigFile(self): # method to parse and store necessary configuration parameters for future calculations/reference
@@ -149,6 +136,9 @@ class Config:
         self.config_params["dopplerResolutionMps"] = 3e8 / (2 * startFreq * 1e9 * (idleTime + rampEndTime) * 1e-6 * self.config_params["numDopplerBins"] * numTxAnt)
         self.config_params["maxRange"] = (300 * 0.9 * digOutSampleRate)/(2 * freqSlopeConst * 1e3)
         self.config_params["maxVelocity"] = 3e8 / (4 * startFreq * 1e9 * (idleTime + rampEndTime) * 1e-6 * numTxAnt)
+        self.config_params["frameDurationS"] = framePeriodicity / 1000
+        #at most one detected point per range-doppler cell
+        self.config_params["maxNumObj"] = int(self.config_params["numRangeBins"] * self.config_params["numDopplerBins"])
         
         return
     
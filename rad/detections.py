@@ -12,22 +12,37 @@ import numpy as np
 
 
 class _RadarDetection():
+    __slots__ = ('_hash_value',)
+    _fields = ()
+
     def __eq__(self, other):
-        return (self._hash == other._hash) and (isinstance(type(self), type(other)))
+        return (self._hash == other._hash) and isinstance(other, type(self))
+
+    def __hash__(self):
+        return self._hash
+
+    @property
+    def _hash(self):
+        # -- computed on first use only, most detections are never compared
+        try:
+            return self._hash_value
+        except AttributeError:
+            self._hash_value = hash(' '.join(str(getattr(self, k)) for k in self._fields))
+            return self._hash_value
 
     def close_to(self, other):
-        for k, v in self.__dict__.items():
-            if k == '_hash':
-                continue
+        for k in self._fields:
+            v = getattr(self, k)
             if v is not None:
-                if not np.allclose(v, other.__dict__[k]):
+                if not np.allclose(v, getattr(other, k)):
                     return False
-        else:
-            return True
+        return True
 
 
 class RadarDetection3D_XYZ(_RadarDetection):
     """Radar detection class for detections in cartesian coordinates"""
+    __slots__ = ('source_ID', 't', 'x', 'y', 'z', 'rrt', 'noise', 'snr')
+    _fields = __slots__
 
     def __init__(self, source_ID, t, x, y, z, rrt, noise, snr=None):
         """
@@ -46,7 +61,6 @@ class RadarDetection3D_XYZ(_RadarDetection):
         self.rrt = rrt
         self.noise = noise
         self.snr = snr
-        self._hash = hash(f'{self.source_ID} {self.t} {self.x} {self.y} {self.z} {self.rrt} {self.noise} {self.snr}')
 
     def convert_to(self, format_as='razel', noise=None):
         """Converts the format of detections"""
@@ -66,6 +80,9 @@ class RadarDetection3D_XYZ(_RadarDetection):
 
 class RadarDetection3D_RAZEL(_RadarDetection):
     """Radar detection class for detections in spherical coordinates"""
+    __slots__ = ('source_ID', 't', 'rng', 'az', 'el', 'rrt', 'noise', 'snr')
+    _fields = __slots__
+
     def __init__(self, source_ID, t, rng, az, el, rrt, noise, snr=None):
         self.source_ID = source_ID
         self.t = t
@@ -75,7 +92,6 @@ class RadarDetection3D_RAZEL(_RadarDetection):
         self.rrt = rrt
         self.noise = noise
         self.snr = snr
-        self._hash = hash(f'{self.source_ID} {self.t} {self.rng} {self.az} {self.el} {self.rrt} {self.noise} {self.snr}')
 
     def convert_to(self, format_as, noise=None):
         """Convert the format to some other"""
@@ -93,15 +109,248 @@ class RadarDetection3D_RAZEL(_RadarDetection):
         return new_detection
 
 
+class DetectionBatch():
+    """Detections of one or more frames in columns (struct of arrays)
+
+    The x, y, z, rrt and snr columns live in one (N x 5) array, data, so
+    they are zero-copy numpy views. batch.data is the buffer to hand to
+    anything that takes the buffer protocol (memoryview(batch.data)), and
+    np.asarray(batch) is the same array without a copy. Indexing with an
+    int builds the matching RadarDetection3D_XYZ on demand, slices give
+    batches that are views.
+
+    Coordinate frame is:
+        - x: forward
+        - y: left
+        - z: up
+
+    Args:
+        source_ID (int or np.array): sensor ID, one per batch or one per detection
+        t (float or np.array): timestamp, one per batch or one per detection
+        xyz (np.array): (N x 3) positions
+        rrt (np.array): (N,) range rates
+        snr (np.array, optional): (N,) signal to noise ratios
+        noise (list or np.array, optional): (3,) noise shared by the
+            batch or (N x 3) per detection
+        dtype (optional): float32 or float64 (default) for the columns
+    """
+
+    COLUMNS = ('x', 'y', 'z', 'rrt', 'snr')
+
+    def __init__(self, source_ID, t, xyz, rrt, snr=None, noise=None, dtype=np.float64):
+        xyz = np.asarray(xyz).reshape(-1, 3)
+        n = len(xyz)
+        self.data = np.empty((n, 5), dtype=dtype)
+        self.data[:, :3] = xyz
+        self.data[:, 3] = rrt
+        self.data[:, 4] = np.nan if snr is None else snr
+        self.source_ID = np.broadcast_to(np.asarray(source_ID), (n,))
+        self.t = np.broadcast_to(np.asarray(t, dtype=np.float64), (n,))
+        self.noise = None if noise is None else np.asarray(noise, dtype=np.float64)
+
+    @classmethod
+    def _from_data(cls, data, source_ID, t, noise):
+        batch = cls.__new__(cls)
+        batch.data = data
+        batch.source_ID = source_ID
+        batch.t = t
+        batch.noise = noise
+        return batch
+
+    @classmethod
+    def concatenate(cls, batches):
+        """One batch with the detections of all batches (copies)"""
+        batches = list(batches)
+        if len(batches) == 0:
+            return cls(0, 0.0, np.zeros((0, 3)), np.zeros(0))
+        noises = [b.noise for b in batches]
+        if all((n is not None) and (n.ndim == 1) and np.array_equal(n, noises[0]) for n in noises):
+            noise = noises[0]
+        elif any(n is None for n in noises):
+            noise = None
+        else:
+            noise = np.concatenate([np.broadcast_to(n, (len(b), 3)) for n, b in zip(noises, batches)])
+        return cls._from_data(np.concatenate([b.data for b in batches]),
+            np.concatenate([b.source_ID for b in batches]),
+            np.concatenate([b.t for b in batches]), noise)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __array__(self, dtype=None):
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def xyz(self):
+        return self.data[:, :3]
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    @property
+    def z(self):
+        return self.data[:, 2]
+
+    @property
+    def rrt(self):
+        return self.data[:, 3]
+
+    @property
+    def snr(self):
+        return self.data[:, 4]
+
+    def _noise_of(self, key):
+        if (self.noise is None) or (self.noise.ndim == 1):
+            return self.noise
+        return self.noise[key]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            x, y, z, rrt, snr = self.data[key].tolist()
+            noise = self._noise_of(key)
+            return RadarDetection3D_XYZ(self.source_ID[key].item(), self.t[key].item(), x, y, z, rrt,
+                None if noise is None else noise.tolist(), None if np.isnan(snr) else snr)
+        return self._from_data(self.data[key], self.source_ID[key], self.t[key], self._noise_of(key))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def above_snr(self, snr_floor):
+        """Detections with snr > snr_floor (one vectorized mask)"""
+        return self[self.snr > snr_floor]
+
+    def to_list(self):
+        """List of RadarDetection3D_XYZ, as convert_payload_to_objects returns"""
+        return list(self)
+
+    def razel(self):
+        """(N x 3) range, azimuth, elevation of all detections"""
+        return cartesian_to_spherical(self.xyz)
+
+    def convert_to(self, format_as='razel', noise=None):
+        """List of converted detections, from one batched transform"""
+        return convert_detections(self, format_as, noise)
+
+    def astype(self, dtype):
+        return self._from_data(self.data.astype(dtype), self.source_ID, self.t, self.noise)
+
+
 def spherical_to_cartesian(razel):
-    x = razel[0] * np.cos(razel[1]) * np.cos(razel[2])
-    y = razel[0] * np.sin(razel[1]) * np.cos(razel[2])
-    z = razel[0] * np.sin(razel[2])
-    return np.round(np.array([x,y,z]), 6)
+    """(range, azimuth, elevation) to (x, y, z), for one (3,) vector or a (N x 3) array"""
+    razel = np.asarray(razel)
+    rng, az, el = razel[..., 0], razel[..., 1], razel[..., 2]
+    x = rng * np.cos(az) * np.cos(el)
+    y = rng * np.sin(az) * np.cos(el)
+    z = rng * np.sin(el)
+    return np.round(np.stack([x, y, z], axis=-1), 6)
 
 
 def cartesian_to_spherical(v):
-    rng = np.linalg.norm(v)
-    az = np.arctan2(v[1], v[0])
-    el = np.arcsin(v[2]/ rng)
-    return np.round(np.array([rng, az, el]), 6)
\ No newline at end of file
+    """(x, y, z) to (range, azimuth, elevation), for one (3,) vector or a (N x 3) array"""
+    v = np.asarray(v)
+    rng = np.linalg.norm(v, axis=-1)
+    az = np.arctan2(v[..., 1], v[..., 0])
+    el = np.arcsin(v[..., 2] / rng)
+    return np.round(np.stack([rng, az, el], axis=-1), 6)
+
+
+def spherical_to_cartesian_jacobian(razel):
+    """d(x, y, z) / d(range, azimuth, elevation), (3 x 3) or (N x 3 x 3)"""
+    razel = np.asarray(razel)
+    rng, az, el = razel[..., 0], razel[..., 1], razel[..., 2]
+    ca, sa, ce, se = np.cos(az), np.sin(az), np.cos(el), np.sin(el)
+    J = np.empty(razel.shape[:-1] + (3, 3))
+    J[..., 0, :] = np.stack([ca * ce, -rng * sa * ce, -rng * ca * se], axis=-1)
+    J[..., 1, :] = np.stack([sa * ce, rng * ca * ce, -rng * sa * se], axis=-1)
+    J[..., 2, :] = np.stack([se, np.zeros_like(rng), rng * ce], axis=-1)
+    return J
+
+
+def cartesian_to_spherical_jacobian(v):
+    """d(range, azimuth, elevation) / d(x, y, z), (3 x 3) or (N x 3 x 3)"""
+    v = np.asarray(v)
+    x, y, z = v[..., 0], v[..., 1], v[..., 2]
+    rho2 = x**2 + y**2
+    rho = np.sqrt(rho2)
+    rng2 = rho2 + z**2
+    rng = np.sqrt(rng2)
+    J = np.empty(v.shape[:-1] + (3, 3))
+    J[..., 0, :] = np.stack([x / rng, y / rng, z / rng], axis=-1)
+    J[..., 1, :] = np.stack([-y / rho2, x / rho2, np.zeros_like(x)], axis=-1)
+    J[..., 2, :] = np.stack([-x * z / (rng2 * rho), -y * z / (rng2 * rho), rho / rng2], axis=-1)
+    return J
+
+
+def propagate_covariance(jacobian, covariance):
+    """J C J^T for every detection
+
+    Args:
+        jacobian (np.array): (3 x 3) or (N x 3 x 3)
+        covariance (np.array): (3,) diagonal, (3 x 3) or (N x 3 x 3)
+    """
+    covariance = np.asarray(covariance, dtype=float)
+    if covariance.ndim == 1:
+        covariance = np.diag(covariance)
+    return np.einsum('...ij,...jk,...lk->...il', jacobian, covariance, jacobian)
+
+
+def convert_detections(detections, format_as, noise=None):
+    """Convert a whole list of detections with one batched transform
+
+    Same result as [d.convert_to(format_as, noise) for d in detections]
+    """
+    if isinstance(detections, DetectionBatch):
+        if format_as != 'razel':
+            raise NotImplementedError(format_as)
+        snr = [None if np.isnan(v) else v for v in detections.snr.tolist()]
+        return [RadarDetection3D_RAZEL(i, t, a, b, c, rrt, noise, v) for i, t, (a, b, c), rrt, v in zip(
+            detections.source_ID.tolist(), detections.t.tolist(), detections.razel().tolist(),
+            detections.rrt.tolist(), snr)]
+    detections = list(detections)
+    if len(detections) == 0:
+        return []
+    if format_as == 'razel':
+        coords = cartesian_to_spherical(np.array([[d.x, d.y, d.z] for d in detections]))
+        cls = RadarDetection3D_RAZEL
+    elif format_as == 'cartesian':
+        coords = spherical_to_cartesian(np.array([[d.rng, d.az, d.el] for d in detections]))
+        cls = RadarDetection3D_XYZ
+    else:
+        raise NotImplementedError(format_as)
+    return [cls(d.source_ID, d.t, a, b, c, d.rrt, noise, d.snr)
+        for d, (a, b, c) in zip(detections, coords.tolist())]
+
+
+def _field_array(detections):
+    if isinstance(detections, DetectionBatch):
+        return np.column_stack((detections.t, detections.data)).astype(float)
+    detections = list(detections)
+    if len(detections) == 0:
+        return np.zeros((0, 0))
+    fields = [k for k in detections[0]._fields if k not in ('source_ID', 'noise')]
+    return np.array([[np.nan if getattr(d, k) is None else getattr(d, k) for k in fields] for d in detections], dtype=float)
+
+
+def allclose(detections_a, detections_b, rtol=1e-05, atol=1e-08, ordered=True):
+    """Compare two sets of detections (lists or DetectionBatches) in one vectorized call
+
+    Compares t and the coordinates, rrt and snr. With ordered=False the
+    detections may come in any order.
+    """
+    a, b = _field_array(detections_a), _field_array(detections_b)
+    if a.shape != b.shape:
+        return False
+    if not ordered and (len(a) > 0):
+        a = a[np.lexsort(np.round(a, 6).T[::-1])]
+        b = b[np.lexsort(np.round(b, 6).T[::-1])]
+    return bool(np.allclose(a, b, rtol=rtol, atol=atol, equal_nan=True))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Gating and mounting-extrinsics stage for whole frames
+
+The gates are evaluated as one boolean mask over all points of a frame, in
+the sensor frame (x: forward, y: left, z: up), and the points that pass
+are moved into the vehicle frame with the radar's mount pose. Only then
+are detection objects made, so rejected points never become Python objects.
+"""
+
+import numpy as np
+
+
+def _rotation_from_euler(roll, pitch, yaw):
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    Rx = np.array([[1, 0, 0], [0, cr, -sr], [0, sr, cr]])
+    Ry = np.array([[cp, 0, sp], [0, 1, 0], [-sp, 0, cp]])
+    Rz = np.array([[cy, -sy, 0], [sy, cy, 0], [0, 0, 1]])
+    return Rz @ Ry @ Rx
+
+
+class Extrinsics():
+    """6-DoF mount pose of a radar: p_vehicle = R p_sensor + t
+
+    Args:
+        translation (array, optional): sensor position in the vehicle frame (m)
+        rotation (array, optional): (3 x 3) sensor-to-vehicle rotation
+    """
+
+    def __init__(self, translation=(0.0, 0.0, 0.0), rotation=None):
+        self.translation = np.asarray(translation, dtype=float).reshape(3)
+        self.rotation = np.eye(3) if rotation is None else np.asarray(rotation, dtype=float).reshape(3, 3)
+
+    @classmethod
+    def from_euler(cls, roll=0.0, pitch=0.0, yaw=0.0, translation=(0.0, 0.0, 0.0)):
+        """Mount pose from roll, pitch, yaw in radians (applied in that order)"""
+        return cls(translation, _rotation_from_euler(roll, pitch, yaw))
+
+    def apply(self, xyz):
+        """(N x 3) sensor-frame points to the vehicle frame"""
+        return xyz @ self.rotation.T + self.translation
+
+
+class DetectionFilter():
+    """Range, angle, SNR and Doppler gates plus the mount pose, on whole frames
+
+    All limits are inclusive (min, max) pairs, None disables a gate.
+
+    Args:
+        range_limits (tuple, optional): meters
+        azimuth_limits (tuple, optional): radians, positive to the left
+        elevation_limits (tuple, optional): radians, positive up
+        doppler_limits (tuple, optional): range rate in m/s
+        snr_min (float, optional): keep points with snr > snr_min
+        extrinsics (Extrinsics, optional): applied to the points that pass
+    """
+
+    def __init__(self, range_limits=None, azimuth_limits=None, elevation_limits=None,
+            doppler_limits=None, snr_min=None, extrinsics=None):
+        self.range_limits = range_limits
+        self.azimuth_limits = azimuth_limits
+        self.elevation_limits = elevation_limits
+        self.doppler_limits = doppler_limits
+        self.snr_min = snr_min
+        self.extrinsics = extrinsics
+
+    @staticmethod
+    def _gate(mask, values, limits):
+        np.logical_and(mask, values >= limits[0], out=mask)
+        np.logical_and(mask, values <= limits[1], out=mask)
+
+    def mask(self, xyz, doppler=None, snr=None):
+        """Boolean mask of the points that pass all gates
+
+        Args:
+            xyz (np.array): (N x 3) sensor frame, x forward, y left, z up
+            doppler (np.array, optional): (N,) range rates
+            snr (np.array, optional): (N,)
+        """
+        xyz = np.asarray(xyz)
+        mask = np.ones(len(xyz), dtype=bool)
+        if (self.range_limits is not None) or (self.elevation_limits is not None):
+            rng = np.sqrt(np.einsum('ij,ij->i', xyz, xyz))
+            if self.range_limits is not None:
+                self._gate(mask, rng, self.range_limits)
+            if self.elevation_limits is not None:
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    el = np.arcsin(xyz[:, 2] / rng)
+                self._gate(mask, el, self.elevation_limits)
+        if self.azimuth_limits is not None:
+            self._gate(mask, np.arctan2(xyz[:, 1], xyz[:, 0]), self.azimuth_limits)
+        if (self.doppler_limits is not None) and (doppler is not None):
+            self._gate(mask, np.asarray(doppler), self.doppler_limits)
+        if (self.snr_min is not None) and (snr is not None):
+            np.logical_and(mask, np.asarray(snr) > self.snr_min, out=mask)
+        return mask
+
+    def transform(self, xyz):
+        """Sensor frame to vehicle frame (unchanged without extrinsics)"""
+        if self.extrinsics is None:
+            return xyz
+        return self.extrinsics.apply(xyz)
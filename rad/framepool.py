@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Preallocated output buffers for decoded frames
+
+A FramePool hands out DetectionFrames whose arrays are allocated once, sized
+for the largest number of objects the configuration can produce. Decoding
+into a frame only fills (views of) those arrays. Consumers give a frame back
+with release() or by using it as a context manager.
+
+Only Processor.decodeFrame (and decodePacket(out=frame)) decode into pooled
+frames. The default decodePacket and the uRad radars allocate the detections
+they return for every frame, since callers keep them across frames; the uRad
+radars only reuse the buffer the payload is parsed into.
+"""
+
+import threading
+import numpy as np
+
+
+class DetectionFrame():
+    """Detected points of one frame in preallocated arrays
+
+    All fields are views of length num_obj into the buffers, x, y, z and
+    doppler are the columns of xyz_vel. x_vehicle, y_vehicle, z_vehicle hold
+    the mount-pose transformed points when has_vehicle_frame is set.
+
+    Args:
+        max_objects (int): capacity of the buffers
+    """
+
+    INDEX_FIELDS = (('rangeIdx', 'int16'), ('dopplerIdx', 'int16'), ('peakVal', 'int16'))
+    VEHICLE_FIELDS = ('x_vehicle', 'y_vehicle', 'z_vehicle')
+
+    def __init__(self, max_objects, pool=None):
+        self.max_objects = 0
+        self.num_obj = 0
+        self.frame_number = None
+        self.has_vehicle_frame = False
+        self._pool = pool
+        self.reserve(max_objects)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def __len__(self):
+        return self.num_obj
+
+    def reserve(self, n):
+        """Make room for n objects (only allocates if n exceeds the capacity)"""
+        if n <= self.max_objects:
+            return False
+        self.max_objects = n
+        self.buffers = {name: np.zeros(n, dtype=dtype) for name, dtype in self.INDEX_FIELDS}
+        self.buffers['range'] = np.zeros(n)
+        self.xyz_vel_buffer = np.zeros((n, 4))
+        self.vehicle_xyz_buffer = np.zeros((n, 3))
+        return True
+
+    def resize(self, n):
+        """Set the number of objects in this frame"""
+        self.reserve(n)
+        self.num_obj = n
+
+    @property
+    def xyz_vel(self):
+        """(num_obj x 4) [x,y,z,vel] view"""
+        return self.xyz_vel_buffer[:self.num_obj]
+
+    def __getitem__(self, name):
+        if name in ('x', 'y', 'z', 'doppler'):
+            return self.xyz_vel_buffer[:self.num_obj, ('x', 'y', 'z', 'doppler').index(name)]
+        if name in self.VEHICLE_FIELDS:
+            return self.vehicle_xyz_buffer[:self.num_obj, self.VEHICLE_FIELDS.index(name)]
+        return self.buffers[name][:self.num_obj]
+
+    @property
+    def detected_objects(self):
+        """The same dict as Processor.detected_objects, made of views into this frame"""
+        objects = {name: self[name] for name in ('rangeIdx', 'range', 'dopplerIdx', 'doppler', 'peakVal', 'x', 'y', 'z')}
+        if self.has_vehicle_frame:
+            objects.update({name: self[name] for name in self.VEHICLE_FIELDS})
+        objects['numObj'] = self.num_obj
+        return objects
+
+    def release(self):
+        """Give the frame back to its pool (its arrays may be reused right away)"""
+        if self._pool is not None:
+            self._pool.release(self)
+
+
+class FramePool():
+    """Pool of DetectionFrames
+
+    Args:
+        max_objects (int): capacity of every frame, e.g. the config's maxNumObj
+        size (int, optional): frames allocated up front. Defaults to 4.
+        grow (bool, optional): allocate another frame when all are in use,
+            otherwise raise RuntimeError. Defaults to True.
+    """
+
+    def __init__(self, max_objects, size=4, grow=True):
+        self.max_objects = max_objects
+        self.grow = grow
+        self._lock = threading.Lock()
+        self._free = [DetectionFrame(max_objects, self) for _ in range(size)]
+        self.allocated = size
+        self.in_use = 0
+
+    def __len__(self):
+        return self.allocated
+
+    def acquire(self):
+        """Take a frame out of the pool"""
+        with self._lock:
+            if self._free:
+                frame = self._free.pop()
+            elif self.grow:
+                frame = DetectionFrame(self.max_objects, self)
+                self.allocated += 1
+            else:
+                raise RuntimeError('All {} frames of the pool are in use, release frames after use'.format(self.allocated))
+            self.in_use += 1
+        frame.num_obj = 0
+        frame.frame_number = None
+        frame.has_vehicle_frame = False
+        return frame
+
+    def release(self, frame):
+        with self._lock:
+            if any(f is frame for f in self._free):
+                return  # already released
+            self._free.append(frame)
+            self.in_use -= 1
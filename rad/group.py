@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Multi-radar aggregation on a common host clock
+
+A RadarGroup services the data ports of N radars from a single scheduler
+loop, maps each sensor's frame numbers onto the host clock and fuses the
+detections of all sensors per time window.
+"""
+
+import math
+import selectors
+import time
+from .sync import PacketSync, read_frame_number
+from .detections import DetectionBatch
+from .cli import start_concurrently
+
+
+class FusedFrame():
+    """Detections of all sensors in one time window of the host clock
+
+    Attributes:
+        t_start, t_end (float): window bounds (host clock, seconds)
+        detections (list or DetectionBatch): detections of all sensors, each
+            tagged with its source_ID (one DetectionBatch if the radars make batches)
+        sources (dict): source_ID -> number of frames received in the window
+        missing (list): source_IDs that did not report before the window was emitted
+    """
+
+    def __init__(self, t_start, t_end, detections, sources, missing):
+        self.t_start = t_start
+        self.t_end = t_end
+        self.detections = detections
+        self.sources = sources
+        self.missing = missing
+
+    def __repr__(self):
+        return 'FusedFrame([{:.3f}, {:.3f}), {} detections, missing={})'.format(
+            self.t_start, self.t_end, len(self.detections), self.missing)
+
+
+class _SensorState():
+    def __init__(self, radar, relax):
+        self.radar = radar
+        self.sync = PacketSync(buffer_size=2**18, overflow='drop-oldest')
+        self.relax = relax
+        self.offset = None
+        self.watermark = -math.inf
+        self.frames = 0
+        self.late_frames = 0
+        self.lag_s = 0.0
+
+    def host_time(self, frame_number, arrival):
+        """Map a sensor frame number onto the host clock
+
+        The offset follows the smallest observed arrival latency, and is
+        relaxed slowly upwards to follow clock drift between the sensor and
+        the host.
+        """
+        sensor_t = frame_number * self.radar.config_data['frame_duration_s']
+        candidate = arrival - sensor_t
+        if (self.offset is None) or (candidate < self.offset):
+            self.offset = candidate
+        else:
+            self.offset += self.relax * (candidate - self.offset)
+        t = sensor_t + self.offset
+        self.lag_s = arrival - t
+        return t
+
+
+class RadarGroup():
+    """Service several radars from one loop and emit time-aligned fused frames
+
+    Args:
+        radars (list): uRad radars (e.g. uRadRadarLive), each with a distinct ID
+        window_s (float, optional): length of a fusion window on the host
+            clock. Defaults to the longest frame duration of the radars.
+        max_wait_s (float, optional): how long past the end of a window to
+            wait for late sensors before emitting it. Defaults to 50 ms.
+        relax (float, optional): rate at which the clock offsets follow drift
+        poll_interval (float, optional): read interval for ports that have
+            no file descriptor to select on. Defaults to 5 ms.
+
+    Usage:
+        group = RadarGroup([radar_front, radar_left, radar_right, radar_rear])
+        group.start()
+        for fused in group:
+            ...
+    """
+
+    def __init__(self, radars, window_s=None, max_wait_s=0.05, relax=0.01, poll_interval=5e-3,
+            clock=time.monotonic, verbose=False):
+        self.radars = list(radars)
+        if len(set(radar.ID for radar in self.radars)) != len(self.radars):
+            raise ValueError('Radars in a group need distinct IDs')
+        self.window_s = window_s if window_s is not None else max(r.config_data['frame_duration_s'] for r in self.radars)
+        self.max_wait_s = max_wait_s
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.verbose = verbose
+        self.sensors = [_SensorState(radar, relax) for radar in self.radars]
+        self.t_origin = None
+        self.next_window = 0
+        self.windows = {}  # window index -> list of (sensor index, objects)
+        self.frames_emitted = 0
+        self._selector = None
+        self._unselectable = []  # -- sensors whose ports are polled
+        self._stopping = False
+
+    def __iter__(self):
+        """Run the scheduler loop in this thread, yielding fused frames until stop()"""
+        self._stopping = False
+        while not self._stopping:
+            self.service(self._next_timeout())
+            for fused in self.poll():
+                yield fused
+
+    def start(self):
+        """Start (configure) the radars that are not started yet, all at once, and register the data ports"""
+        start_concurrently(self.radars)
+        self._selector = selectors.DefaultSelector()
+        self._unselectable = []
+        for i, radar in enumerate(self.radars):
+            radar.data_port.timeout = 0
+            try:
+                self._selector.register(radar.data_port.fileno(), selectors.EVENT_READ, i)
+            except (AttributeError, OSError, ValueError):
+                self._unselectable.append(i)
+        return self
+
+    def stop(self):
+        self._stopping = True
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for radar in self.radars:
+            radar.stop()
+
+    def service(self, timeout):
+        """Wait up to timeout for data on any port and consume what is ready"""
+        ready = []
+        if (self._selector is not None) and self._selector.get_map():
+            if self._unselectable:
+                timeout = min(timeout, self.poll_interval)
+            ready = [key.data for key, _ in self._selector.select(timeout)]
+        else:
+            time.sleep(min(timeout, self.poll_interval))
+        for i in ready:
+            port = self.radars[i].data_port
+            self.feed(i, self._read(i, max(port.in_waiting, 4096)))
+        for i in self._unselectable:
+            data = self._read(i, self.radars[i].data_port.in_waiting)
+            if data:
+                self.feed(i, data)
+
+    def _read(self, i, n):
+        """Read from the data port of sensor i, teeing the bytes to its recorder"""
+        radar = self.radars[i]
+        data = radar.data_port.read(n)
+        if data and (radar.recorder is not None):
+            radar.recorder.write(data)
+        return data
+
+    def feed(self, i, data, arrival=None):
+        """Add raw bytes from sensor i (arrival time defaults to now)"""
+        arrival = self.clock() if arrival is None else arrival
+        sensor = self.sensors[i]
+        sensor.sync.write(data)
+        while True:
+            packet = sensor.sync.next_packet()
+            if packet is None:
+                break
+            t = sensor.host_time(read_frame_number(packet), arrival)
+            objects, _ = sensor.radar.decode_packet(packet, timestamp=t)
+            sensor.frames += 1
+            sensor.watermark = max(sensor.watermark, t)
+            if self.t_origin is None:
+                # -- center the first frame in its window, other sensors may lead by half a window
+                self.t_origin = t - 0.5 * self.window_s
+            k = math.floor((t - self.t_origin) / self.window_s)
+            if k < self.next_window:
+                sensor.late_frames += 1
+                continue
+            self.windows.setdefault(k, []).append((i, objects))
+
+    def poll(self, now=None):
+        """Emit every window that all sensors have passed, or that waited long enough"""
+        now = self.clock() if now is None else now
+        fused = []
+        if self.t_origin is None:
+            return fused
+        while True:
+            t_start = self.t_origin + self.next_window * self.window_s
+            t_end = t_start + self.window_s
+            complete = all(sensor.watermark >= t_end for sensor in self.sensors)
+            if not complete and (now < t_end + self.max_wait_s):
+                break
+            if not complete and not any(k >= self.next_window for k in self.windows):
+                break
+            entries = self.windows.pop(self.next_window, [])
+            sources = {}
+            detections = []
+            for i, objects in entries:
+                source_ID = self.radars[i].ID
+                sources[source_ID] = sources.get(source_ID, 0) + 1
+                if isinstance(objects, DetectionBatch):
+                    detections.append(objects)
+                else:
+                    detections.extend(objects)
+            if any(isinstance(d, DetectionBatch) for d in detections):
+                detections = DetectionBatch.concatenate(detections)
+            missing = [radar.ID for radar in self.radars if radar.ID not in sources]
+            fused.append(FusedFrame(t_start, t_end, detections, sources, missing))
+            self.next_window += 1
+            self.frames_emitted += 1
+        return fused
+
+    def stats(self):
+        """Per-sensor statistics keyed by source_ID"""
+        return {sensor.radar.ID: {
+            'frames': sensor.frames,
+            'late_frames': sensor.late_frames,
+            'lag_s': sensor.lag_s,
+            'clock_offset_s': sensor.offset,
+            'behind_s': max(s.watermark for s in self.sensors) - sensor.watermark,
+            'bytes_discarded': sensor.sync.bytes_discarded,
+            'resync_count': sensor.sync.resync_count,
+            } for sensor in self.sensors}
+
+    def _next_timeout(self):
+        if self.t_origin is None:
+            return 0.1
+        t_end = self.t_origin + (self.next_window + 1) * self.window_s
+        return min(0.1, max(0.0, t_end + self.max_wait_s - self.clock()))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Frame index sidecar for recorded data streams
+
+One vectorized pass over a recording finds every valid packet and keeps its
+byte offset and header fields. The index is saved next to the recording as
+<data_file>.idx.npz and rebuilt automatically when the recording changes.
+"""
+
+import os
+import numpy as np
+from .sync import MAGIC_WORD_LEN, MIN_HEADER_LEN, as_uint8, find_all_magic_words
+
+
+INDEX_VERSION = 1
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('frame_number', '<u4'),
+    ('sub_frame_number', '<u4'),
+    ('total_packet_len', '<u4'),
+    ('num_detected_objs', '<u4'),
+    ('timestamp', '<f8'),
+])
+
+
+def index_path(data_file):
+    return data_file + '.idx.npz'
+
+
+def build_index(data, frame_duration_s, header_len=40, chunk_size=2**24):
+    """Index every valid packet of a recording
+
+    A packet is valid under the same rules PacketReader applies during
+    playback: its stated length must end exactly at the next sync (or at the
+    end of the file, for the last packet).
+
+    Args:
+        data (bytes-like or np.array): the whole recording, e.g. a mapping
+        frame_duration_s (float): frame period used to derive the timestamps
+        header_len (int, optional): 40 for SDK 3.x (with sub-frame number),
+            36 for older SDKs. Defaults to 40.
+        chunk_size (int, optional): bytes searched at once for the magic word
+
+    Returns:
+        np.array(dtype=INDEX_DTYPE): one entry per frame
+    """
+    data = as_uint8(data)
+    n_bytes = len(data)
+    locs = [find_all_magic_words(data, start, min(n_bytes, start + chunk_size + MAGIC_WORD_LEN - 1))
+        for start in range(0, n_bytes, chunk_size)]
+    locs = np.concatenate(locs) if locs else np.empty(0, dtype=np.intp)
+    locs = locs[locs + header_len <= n_bytes].astype(np.int64)
+
+    # -- gather all headers at once, fields after the magic word are uint32
+    headers = data[locs[:, None] + np.arange(header_len)]
+    fields = np.ascontiguousarray(headers[:, MAGIC_WORD_LEN:MAGIC_WORD_LEN + 4 * ((header_len - MAGIC_WORD_LEN) // 4)]).view('<u4')
+    total_len = fields[:, 1].astype(np.int64)
+    ends = locs + total_len
+    nxt = np.append(locs[1:], n_bytes)
+    last = np.arange(len(locs)) == len(locs) - 1
+    valid = (total_len >= max(MIN_HEADER_LEN, header_len)) & (ends <= n_bytes) \
+        & ((ends == nxt) | (last & (ends + MAGIC_WORD_LEN > n_bytes)))
+
+    index = np.zeros(int(valid.sum()), dtype=INDEX_DTYPE)
+    index['offset'] = locs[valid]
+    index['total_packet_len'] = total_len[valid]
+    index['frame_number'] = fields[valid, 3]
+    index['num_detected_objs'] = fields[valid, 5]
+    if fields.shape[1] > 7:
+        index['sub_frame_number'] = fields[valid, 7]
+    if len(index) > 0:
+        frame_number = index['frame_number'].astype(np.int64)
+        index['timestamp'] = frame_duration_s * (frame_number - frame_number[0])
+    return index
+
+
+def _source_meta(data_file, frame_duration_s, header_len):
+    stat = os.stat(data_file)
+    return {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns,
+        'version': INDEX_VERSION, 'header_len': header_len, 'frame_duration_s': frame_duration_s}
+
+
+def save_index(data_file, index, frame_duration_s, header_len=40):
+    """Write the sidecar atomically next to the recording"""
+    path = index_path(data_file)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, index=index, **_source_meta(data_file, frame_duration_s, header_len))
+    os.replace(tmp, path)
+    return path
+
+
+def load_index(data_file, frame_duration_s, header_len=40, data=None, verbose=False):
+    """Load the sidecar index of a recording, (re)building it if missing or stale
+
+    Args:
+        data_file (str): path to the recording
+        frame_duration_s (float): frame period used for the timestamps
+        header_len (int, optional): packet header length. Defaults to 40.
+        data (bytes-like, optional): already mapped recording to index
+
+    Returns:
+        np.array(dtype=INDEX_DTYPE)
+    """
+    path = index_path(data_file)
+    meta = _source_meta(data_file, frame_duration_s, header_len)
+    if os.path.exists(path):
+        try:
+            with np.load(path) as sidecar:
+                if all(sidecar[k].item() == v for k, v in meta.items()):
+                    return sidecar['index']
+        except (OSError, ValueError, KeyError):
+            pass
+        if verbose:
+            print('Index for {} is stale, rebuilding'.format(data_file))
+    if data is None:
+        data = np.memmap(data_file, dtype=np.uint8, mode='r') if meta['source_size'] > 0 else np.empty(0, dtype=np.uint8)
+    index = build_index(data, frame_duration_s, header_len)
+    try:
+        save_index(data_file, index, frame_duration_s, header_len)
+    except OSError:
+        if verbose:
+            print('Could not write index for {}'.format(data_file))
+    return index
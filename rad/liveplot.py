@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Throttled live plot of the detected points
+
+The decode side only hands over its latest frame (update() never draws).
+Rendering happens at most refresh_rate times per second and always shows the
+newest frame, frames that arrive in between are skipped. The scatter artist
+is created once and moved with set_offsets, with blitting where the canvas
+supports it.
+"""
+
+import threading
+import time
+import numpy as np
+
+
+class PointCloudPlot():
+    """Scatter plot of the (x, y) of the latest detected points
+
+    Args:
+        refresh_rate (float, optional): maximum renders per second.
+            Defaults to 10.
+        jupyter (bool, optional): show the figure through an IPython display
+            handle, rendering then runs on a background thread (see start()).
+            Defaults to True.
+        xlim, ylim (tuple, optional): fixed axis limits in meters
+    """
+
+    def __init__(self, refresh_rate=10.0, jupyter=True, xlim=(-10, 10), ylim=(0, 10),
+            clock=time.monotonic):
+        import matplotlib.pyplot as plt
+
+        self.refresh_delay = 1 / refresh_rate
+        self.jupyter = jupyter
+        self.clock = clock
+        self.renders = 0
+        self.frames_skipped = 0
+        self._latest = None
+        self._pending = False
+        self._last_render = None
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self.hdisplay = None
+        if jupyter:
+            from IPython.display import display
+            self.hdisplay = display("", display_id=True)
+        self.fig = plt.figure()
+        self.ax = self.fig.add_subplot(1, 1, 1)
+        self.ax.set_title("Detected Points")
+        self.ax.set_xlabel("X Coordinate (m)")
+        self.ax.set_ylabel("Y Coordinate (m)")
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        self.blit = (not jupyter) and self.fig.canvas.supports_blit
+        self.points = self.ax.scatter([], [], animated=self.blit)
+        self._background = None
+        if self.blit:
+            self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def update(self, xyz_vel):
+        """Hand over the latest frame (N x >=2), does not draw"""
+        with self._lock:
+            if self._pending:
+                self.frames_skipped += 1
+            self._latest = xyz_vel
+            self._pending = True
+
+    def render(self, force=False):
+        """Draw the latest frame if one is pending and the refresh interval has passed
+
+        Returns:
+            bool: True if the figure was redrawn
+        """
+        now = self.clock()
+        with self._lock:
+            due = (self._last_render is None) or (now - self._last_render >= self.refresh_delay)
+            if not (self._pending and (due or force)):
+                return False
+            xyz_vel = self._latest
+            self._pending = False
+            self._last_render = now
+        with self._render_lock:
+            offsets = np.empty((0, 2)) if xyz_vel is None else np.asarray(xyz_vel)[:, :2]
+            self.points.set_offsets(offsets)
+            canvas = self.fig.canvas
+            if self.jupyter:
+                self.hdisplay.update(self.fig)
+            elif self.blit and (self._background is not None):
+                canvas.restore_region(self._background)
+                self.ax.draw_artist(self.points)
+                canvas.blit(self.ax.bbox)
+                canvas.flush_events()
+            else:
+                canvas.draw_idle()
+                canvas.flush_events()
+            self.renders += 1
+        return True
+
+    def start(self):
+        """Render from a background thread (for Jupyter/Agg figures, GUI
+        backends must call render() from their own main loop instead)"""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._render_loop, name="rad-plot", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the render thread and draw whatever frame is still pending"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.render(force=True)
+
+    def _render_loop(self):
+        while not self._stopping.wait(self.refresh_delay):
+            self.render()
+
+    def _on_draw(self, event):
+        # -- a full redraw (first show, resize): cache the static parts for blitting
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.points)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Threaded acquisition pipeline
+
+    serial reader thread --> PacketSync --> decode thread --> bounded frame queue --> consumer
+
+The reader thread does nothing but drain the data port, so a slow consumer
+can never stall the UART. The decode thread applies backpressure through the
+bounded queue instead.
+"""
+
+import queue
+import threading
+from .sync import PacketSync
+
+
+def serial_chunk_reader(port, timeout=0.1, recorder=None):
+    """Make a callable that reads whatever is waiting on a serial port
+
+    The port timeout bounds how long a read can block, which is also how
+    long a pipeline shutdown can take. Chunks are also handed to the
+    recorder (StreamRecorder), if any.
+    """
+    if port.timeout is None:
+        port.timeout = timeout
+    def read_chunk():
+        chunk = port.read(max(1, port.in_waiting))
+        if recorder is not None:
+            recorder.write(chunk)
+        return chunk
+    return read_chunk
+
+
+class RadarPipeline():
+    """Multi-threaded reader/decoder for a radar data stream
+
+    Args:
+        read_chunk (callable): returns the next chunk of raw bytes. It may
+            block for a bounded time and return an empty chunk, and returns
+            None at the end of the stream
+        decode (callable): turns one complete packet into a frame
+        on_stop (callable, optional): called after the threads have exited,
+            e.g. to send sensorStop and close the ports
+        queue_size (int, optional): maximum number of decoded frames waiting
+            for the consumer. Defaults to 8.
+        overflow (str, optional): what the decoder does when the frame queue
+            is full: "block" (backpressure onto the byte buffer) or
+            "drop-oldest". Defaults to "block".
+        buffer_size (int, optional): capacity of the raw byte buffer
+        buffer_overflow (str, optional): overflow policy of the raw byte
+            buffer, see RingBuffer. Defaults to "drop-oldest".
+    """
+
+    def __init__(self, read_chunk, decode, on_stop=None, queue_size=8, overflow='block',
+            buffer_size=2**18, buffer_overflow='drop-oldest', verbose=False):
+        if overflow not in ('block', 'drop-oldest'):
+            raise ValueError('Frame queue overflow must be "block" or "drop-oldest", got {}'.format(overflow))
+        self.read_chunk = read_chunk
+        self.decode = decode
+        self.on_stop = on_stop
+        self.overflow = overflow
+        self.verbose = verbose
+        self.sync = PacketSync(buffer_size=buffer_size, overflow=buffer_overflow, verbose=verbose)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.bytes_read = 0
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.decode_errors = 0
+        self.error = None
+        self._data_ready = threading.Condition()
+        # -- held from taking a packet until it is decoded, and across discard_buffered
+        self._decoding = threading.Lock()
+        self._discards = 0
+        self._stopping = threading.Event()
+        self._reader_done = threading.Event()
+        self._decoder_done = threading.Event()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __iter__(self):
+        """Yield frames until the pipeline is stopped and drained"""
+        while True:
+            try:
+                yield self.get(timeout=0.1)
+            except queue.Empty:
+                if self._decoder_done.is_set() and self.frames.empty():
+                    break
+
+    @property
+    def running(self):
+        return len(self._threads) > 0 and not self._stopping.is_set()
+
+    def start(self):
+        if self._threads:
+            raise RuntimeError('Pipeline already started')
+        self._threads = [
+            threading.Thread(target=self._read_loop, name='rad-reader', daemon=True),
+            threading.Thread(target=self._decode_loop, name='rad-decoder', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop both threads, then run on_stop (sensorStop, close ports)"""
+        self._stopping.set()
+        with self._data_ready:
+            self._data_ready.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self.on_stop is not None:
+            on_stop, self.on_stop = self.on_stop, None
+            on_stop()
+        if self.verbose:
+            print('RadarPipeline.stop: read {} bytes, decoded {} frames, dropped {} frames'.format(
+                self.bytes_read, self.frames_decoded, self.frames_dropped))
+
+    def discard_buffered(self, then=None):
+        """Drop the raw bytes that are not decoded yet (frames already decoded stay queued)
+
+        then (e.g. a config swap) runs before the next packet is taken, and
+        no packet is being decoded meanwhile
+        """
+        with self._decoding:
+            with self._data_ready:
+                self.sync.reset()
+                self._discards += 1
+            if then is not None:
+                then()
+
+    def get(self, timeout=None):
+        """Get the next decoded frame
+
+        Raises:
+            queue.Empty: no frame arrived within timeout
+        """
+        if self.error is not None and self.frames.empty():
+            raise self.error
+        return self.frames.get(timeout=timeout)
+
+    def _read_loop(self):
+        try:
+            while not self._stopping.is_set():
+                discards = self._discards
+                chunk = self.read_chunk()
+                if chunk is None:
+                    break
+                if len(chunk) == 0:
+                    continue
+                with self._data_ready:
+                    if discards != self._discards:
+                        continue  # -- read before a discard_buffered, bytes of the old stream
+                    self.sync.write(chunk)
+                    self.bytes_read += len(chunk)
+                    self._data_ready.notify()
+        except Exception as e:
+            if not self._stopping.is_set():
+                self.error = e
+        finally:
+            self._reader_done.set()
+            with self._data_ready:
+                self._data_ready.notify()
+
+    def _decode_loop(self):
+        try:
+            while not self._stopping.is_set():
+                with self._decoding:
+                    with self._data_ready:
+                        packet = self.sync.next_packet()
+                        bytes_read = self.bytes_read
+                    if packet is not None:
+                        try:
+                            frame = self.decode(packet)
+                        except Exception as e:
+                            self.decode_errors += 1
+                            if self.verbose:
+                                print('RadarPipeline: could not decode packet ({})'.format(e))
+                            continue
+                if packet is None:
+                    with self._data_ready:
+                        if self.bytes_read == bytes_read:
+                            if self._reader_done.is_set():
+                                break
+                            self._data_ready.wait(0.1)
+                    continue
+                self.frames_decoded += 1
+                self._put(frame)
+        finally:
+            self._decoder_done.set()
+
+    def _put(self, frame):
+        if self.overflow == 'drop-oldest':
+            while True:
+                try:
+                    self.frames.put_nowait(frame)
+                    return
+                except queue.Full:
+                    try:
+                        self.frames.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+        else:
+            while not self._stopping.is_set():
+                try:
+                    self.frames.put(frame, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
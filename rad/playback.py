@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Memory-mapped playback of recorded data streams
+
+The recording is mapped read-only once and every packet is handed out as a
+numpy view straight into the mapping, so memory use does not depend on the
+size of the capture and any number of readers can share one mapping.
+Pacer replays the frames at (a multiple of) the recorded frame rate.
+"""
+
+import mmap
+import os
+import time
+import numpy as np
+from .sync import MAGIC_WORD_LEN, MIN_HEADER_LEN, find_magic_word, is_magic_word, read_packet_length
+
+
+class MappedRecording():
+    """Read-only memory map of a recorded data stream
+
+    Args:
+        filename (str): path to the raw data stream (e.g. a .dat capture)
+    """
+
+    def __init__(self, filename):
+        if not os.path.exists(filename):
+            raise FileNotFoundError('Cannot find playback file {}'.format(filename))
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        self._mmap = None
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = np.frombuffer(self._mmap, dtype=np.uint8)
+        else:
+            self.data = np.empty(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def reader(self, offset=0):
+        """Make a new, independent packet reader over this mapping"""
+        return PacketReader(self, offset)
+
+    def close(self):
+        """Release the mapping (views handed out before become invalid)"""
+        self.data = np.empty(0, dtype=np.uint8)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # views are still alive, the mapping goes away with them
+            self._mmap = None
+        self._file.close()
+
+
+class PacketReader():
+    """Cursor over the packets of a MappedRecording
+
+    Packets are validated the same way as PacketSync does for live data (the
+    stated length must not run into another sync and must be followed by the
+    next sync) and are returned as zero-copy views.
+
+    Args:
+        recording (MappedRecording): the shared mapping
+        offset (int, optional): byte offset to start reading at
+        search_window (int, optional): bytes searched per step when looking
+            for the next sync, bounds the work done per call on noise
+    """
+
+    def __init__(self, recording, offset=0, search_window=2**16):
+        self.recording = recording
+        self.offset = offset
+        self.search_window = search_window
+        self.bytes_discarded = 0
+        self.resync_count = 0
+        self.packets = 0
+
+    def __iter__(self):
+        while True:
+            packet = self.next_packet()
+            if packet is None:
+                break
+            yield packet
+
+    def seek(self, offset):
+        self.offset = offset
+
+    def _find(self, start):
+        data = self.recording.data
+        while start < len(data):
+            stop = min(len(data), start + self.search_window)
+            loc = find_magic_word(data, start, stop)
+            if loc >= 0:
+                return loc
+            if stop == len(data):
+                break
+            start = stop - MAGIC_WORD_LEN + 1
+        return -1
+
+    def _skip_to(self, loc):
+        if loc > self.offset:
+            self.bytes_discarded += loc - self.offset
+            self.resync_count += 1
+        self.offset = loc
+
+    def next_packet(self):
+        """Next valid packet as a view into the mapping, None at the end of the recording"""
+        data = self.recording.data
+        start = self.offset
+        while True:
+            loc = self._find(start)
+            if (loc < 0) or (loc + MIN_HEADER_LEN > len(data)):
+                self._skip_to(len(data))
+                return None
+            packet_len = read_packet_length(data, loc)
+            if (packet_len < MIN_HEADER_LEN) or (loc + packet_len > len(data)):
+                start = loc + MAGIC_WORD_LEN
+                continue
+
+            # -- torn packet: the next sync shows up inside the stated length
+            inner = find_magic_word(data, loc + MAGIC_WORD_LEN, min(len(data), loc + packet_len + MAGIC_WORD_LEN - 1))
+            if inner >= 0:
+                start = inner
+                continue
+            end = loc + packet_len
+            if (end + MAGIC_WORD_LEN <= len(data)) and not is_magic_word(data, end):
+                start = loc + MAGIC_WORD_LEN
+                continue
+
+            self._skip_to(loc)
+            self.offset = end
+            self.packets += 1
+            return data[loc:end]
+
+
+class Pacer():
+    """Pace replayed frames against the wall clock
+
+    Frame k is due at (frame_number_k - frame_number_0) * frame_duration_s / speed
+    after the first frame. When the consumer falls more than one (scaled)
+    frame period behind, the policy decides what happens:
+        drop: skip late frames so playback stays in real time
+        slip: deliver every frame and shift the clock by the lag
+
+    Args:
+        frame_duration_s (float): frame period of the recording
+        speed (float, optional): playback speed multiplier, 0.1 to 50.
+            Defaults to 1.0.
+        policy (str, optional): "drop" or "slip". Defaults to "drop".
+    """
+
+    def __init__(self, frame_duration_s, speed=1.0, policy='drop', clock=time.monotonic, sleep=time.sleep):
+        if not (0.1 <= speed <= 50):
+            raise ValueError('Playback speed must be between 0.1x and 50x, got {}'.format(speed))
+        if policy not in ('drop', 'slip'):
+            raise ValueError('Catch-up policy must be "drop" or "slip", got {}'.format(policy))
+        self.frame_duration_s = frame_duration_s
+        self.speed = speed
+        self.policy = policy
+        self.clock = clock
+        self.sleep = sleep
+        self.frames_dropped = 0
+        self.slip_s = 0.0
+        self.reset()
+
+    def reset(self):
+        """Restart the clock on the next frame (e.g. after a seek)"""
+        self._t0 = None
+        self._frame0 = None
+
+    def schedule(self, frame_number):
+        """Seconds to wait before delivering this frame, None to drop it"""
+        now = self.clock()
+        if self._t0 is None:
+            self._t0 = now
+            self._frame0 = frame_number
+            return 0.0
+        period = self.frame_duration_s / self.speed
+        lag = now - (self._t0 + (frame_number - self._frame0) * period)
+        if lag <= 0:
+            return -lag
+        if lag > period:
+            if self.policy == 'drop':
+                self.frames_dropped += 1
+                return None
+            self._t0 += lag
+            self.slip_s += lag
+        return 0.0
+
+    def wait(self, frame_number):
+        """Block until the frame is due
+
+        Returns:
+            bool: False if the frame should be dropped
+        """
+        delay = self.schedule(frame_number)
+        if delay is None:
+            return False
+        if delay > 0:
+            self.sleep(delay)
+        return True
+
+    async def wait_async(self, frame_number):
+        """As wait, but awaits the delay so the event loop keeps running"""
+        import asyncio
+        delay = self.schedule(frame_number)
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
@@ -1,17 +1,49 @@
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import style
-from matplotlib.pyplot import plot, show
-from IPython.display import display, clear_output
+from . import tlv
+from .framepool import FramePool
+
+# matplotlib and IPython are only imported when plotting is enabled (see liveplot)
+
+# Little-endian layouts of the packet header, the TLV header and the detected points TLV
+PACKET_HEADER_DTYPE = np.dtype([
+    ("magicNumber", "u1", 8),
+    ("version", "<u4"),
+    ("totalPacketLen", "<u4"),
+    ("platform", "<u4"),
+    ("frameNumber", "<u4"),
+    ("timeCpuCycles", "<u4"),
+    ("numDetectedObj", "<u4"),
+    ("numTLVs", "<u4"),
+])
+TLV_HEADER_DTYPE = np.dtype([("type", "<u4"), ("length", "<u4")])
+DETECTED_POINTS_DESCRIPTOR_DTYPE = np.dtype([("numObj", "<u2"), ("xyzQFormat", "<u2")])
+DETECTED_POINT_DTYPE = np.dtype([
+    ("rangeIdx", "<i2"),
+    ("dopplerIdx", "<i2"),
+    ("peakVal", "<i2"),
+    ("x", "<i2"),
+    ("y", "<i2"),
+    ("z", "<i2"),
+])
 
 # Processing class -> takes in a packet and configuration data, returns detected objects, x y z coordinates
 
 class Processor:
+
+    #per-point arrays of detected_objects
+    POINT_FIELDS = ("rangeIdx", "range", "dopplerIdx", "doppler", "peakVal", "x", "y", "z")
+    #vehicle frame (forward, left, up) coordinates, added when the filter has extrinsics
+    VEHICLE_FIELDS = ("x_vehicle", "y_vehicle", "z_vehicle")
     
     def __init__(self,
                  config_parameters,
                  enable_plotting = False,
                  jupyter = True,
+                 db_output = False,
+                 refresh_rate = 10.0,
+                 frame_pool_size = 4,
+                 detection_filter = None,
                  verbose = False):
         """Initialize the Processor Class
 
@@ -24,6 +56,21 @@ class Processor:
             jupyter (bool, optional): On true, uses several specialized
                 functions to update plots in real time when using a 
                 jupyter notebook. Defaults to True
+            db_output (bool, optional): On true, also converts the range
+                profile and range-doppler heatmap to dB (float32) into
+                buffers reused every frame. Defaults to False.
+            refresh_rate (float, optional): maximum rate in Hz at which
+                the plot is redrawn, always with the latest frame.
+                Defaults to 10.0.
+            frame_pool_size (int, optional): number of preallocated
+                frames for decodeFrame. Defaults to 4.
+            detection_filter (DetectionFilter, optional): range, angle,
+                doppler and peak value (as snr) gates applied to the whole
+                frame, with the gates in the radar frame (forward, left,
+                up). x, y, z always stay in the sensor frame, with
+                extrinsics the points that pass also get x_vehicle,
+                y_vehicle, z_vehicle in the vehicle frame (forward, left,
+                up). Defaults to None.
             verbose (bool, optional): Prints out extra information on 
                 True. Defaults to False.
             
@@ -38,107 +85,201 @@ class Processor:
         self.detected_objects = {}
         self.xyz_vel_coordinates = np.zeros(shape=(50,4))
 
+        #range profile and heatmap are views over the last packet that had them
+        self.range_profile = None
+        self.range_doppler_heatmap = None
+        self.db_output = db_output
+        self.range_profile_db = None
+        self.range_doppler_heatmap_db = None
+        self.allocateOutputBuffers()
+
+        #lookup tables from the raw 16 bit indices to range and doppler
+        self.buildLookupTables()
+
+        #held while decoding a packet, so a frame never mixes two configurations
+        self.configLock = threading.Lock()
+
+        #gates and mount pose applied to every frame
+        self.detection_filter = detection_filter
+
+        #preallocated output frames, allocated on the first decodeFrame
+        self.frame_pool = None
+        self.frame_pool_size = frame_pool_size
+
         #initialize plotting
         self.plotting_enabled = enable_plotting
         self.jupyter = jupyter
-        self.hdisplay = None #display handle for jupyter notebooks
-        self.fig = None
-        self.ax1 = None
+        self.plotter = None
         if enable_plotting:
+            from .liveplot import PointCloudPlot
+            self.plotter = PointCloudPlot(refresh_rate = refresh_rate, jupyter = jupyter)
+
+            #jupyter figures are rendered on a background thread, GUI
+            #backends are rendered (throttled) from performProcessing
             if self.jupyter:
-                self.hdisplay = display("",display_id=True)
-            self.fig = plt.figure()
-            self.ax1 = self.fig.add_subplot(1,1,1)
-            plt.title("Detected Points")
-            plt.xlabel("X Coordinate (m)")
-            plt.ylabel("Y Coordinate (m)")
-            
+                self.plotter.start()
+
+        return
+
+    def allocateOutputBuffers(self):
+        """Allocate the dB output buffers for the configured number of bins"""
+        if self.db_output:
+            numRangeBins = int(self.config_params["numRangeBins"])
+            numDopplerBins = int(self.config_params["numDopplerBins"])
+            self.range_profile_db = np.zeros(numRangeBins, dtype = 'float32')
+            self.range_doppler_heatmap_db = np.zeros((numRangeBins, numDopplerBins), dtype = 'float32')
+        return
+
+    def updateConfig(self,config_parameters):
+        """Switch to new configuration parameters between two frames
+        (e.g. after Radar.reconfigure)
+
+        Args:
+            config_parameters (dict): the new Config.config_params
+        """
+        with self.configLock:
+            self.config_params = config_parameters
+            self.buildLookupTables()
+            self.allocateOutputBuffers()
+            self.range_profile = None
+            self.range_doppler_heatmap = None
         return
 
-    def decodePacket(self,Packet):
+    def buildLookupTables(self):
+        """Precompute the range and doppler conversions for every
+        possible 16 bit index from the configuration parameters
+        """
+        allIdx = np.arange(2**16, dtype = 'uint16').view('int16')
+        self.rangeLUT = allIdx * self.config_params["rangeIdxToMeters"]
+
+        #indices in the upper half of the doppler bins are negative velocities
+        dopplerIdx = allIdx.copy()
+        dopplerIdx[dopplerIdx > (self.config_params["numDopplerBins"]/2 - 1)] = dopplerIdx[dopplerIdx > (self.config_params["numDopplerBins"]/2 - 1)] - 65535
+        self.dopplerIdxLUT = dopplerIdx
+        self.dopplerLUT = dopplerIdx * self.config_params["dopplerResolutionMps"]
+        return
+
+    def decodeFrame(self,Packet):
+        """Decodes the given data packet into a frame from the pool
+
+        Usage:
+            with processor.decodeFrame(packet) as frame:
+                frame.xyz_vel ...
+
+        Args:
+            Packet (np.array(dtype = uint8)): packet containing the
+                data to be processed
+
+        Returns:
+            DetectionFrame: pooled frame, release it (or use it as a
+                context manager) when done with it
+        """
+        if self.frame_pool is None:
+            maxNumObj = self.config_params.get("maxNumObj",
+                int(self.config_params["numRangeBins"] * self.config_params["numDopplerBins"]))
+            self.frame_pool = FramePool(maxNumObj, size = self.frame_pool_size)
+        frame = self.frame_pool.acquire()
+        try:
+            self.decodePacket(Packet, out = frame)
+        except Exception:
+            frame.release()
+            raise
+        return frame
+
+    def decodePacket(self,Packet,out = None):
         """Decodes the given data packet
 
         Args:
             Packet (np.array(dtype = uint8)): packet containing the
                 data to be processed
+            out (DetectionFrame, optional): preallocated frame to decode
+                the detected points into. detected_objects and
+                xyz_vel_coordinates are then views into it. By default
+                new arrays are allocated for every packet.
         """
+        with self.configLock:
+            return self._decodePacket(Packet, out)
 
-        # Constants
-        MMWDEMO_UART_MSG_DETECTED_POINTS = 1
+    def _decodePacket(self,Packet,out):
 
-        #TODO: added these even though we aren't actually using these
-        MMWDEMO_UART_MSG_RANGE_PROFILE   = 2
-        MMWDEMO_UART_MSG_RANGE_DOPPLAR_HEATMAP   = 5
+        # Constants
+        MMWDEMO_UART_MSG_DETECTED_POINTS = tlv.TLV_DETECTED_POINTS
+        MMWDEMO_UART_MSG_RANGE_PROFILE   = tlv.TLV_RANGE_PROFILE
+        MMWDEMO_UART_MSG_RANGE_DOPPLAR_HEATMAP   = tlv.TLV_RANGE_DOPPLER_HEATMAP
     
         header,idX = self.decodePacketHeader(Packet)
         
         # Read the TLV messages
         for tlvIdx in range(header["numTLVs"]):
-            
-            # word array to convert 4 bytes to a 32 bit number
-            word = [1, 2**8, 2**16, 2**24]
 
             # Check the header of the TLV message
-            tlv_type = np.matmul(Packet[idX:idX+4],word)
-            idX += 4
-            tlv_length = np.matmul(Packet[idX:idX+4],word)
-            idX += 4
+            tlv_header = Packet[idX:idX+TLV_HEADER_DTYPE.itemsize].view(TLV_HEADER_DTYPE)[0]
+            tlv_type = np.int64(tlv_header["type"])
+            tlv_length = np.int64(tlv_header["length"])
+            idX += TLV_HEADER_DTYPE.itemsize
+            tlvEnd = idX + tlv_length
 
             if self.verbose:
                 print("Processor.decodePacket: TLV Type: {}".format(tlv_type))
                 print("Processor.decodePacket: TLV Length: {}".format(tlv_length))
             
             # Read the data depending on the TLV message
-            word = [1, 2**8]
             if tlv_type == MMWDEMO_UART_MSG_DETECTED_POINTS:
 
-                # word array to convert 4 bytes to a 16 bit number
-                tlv_numObj = np.matmul(Packet[idX:idX+2],word)
-                idX += 2
-                tlv_xyzQFormat = 2**np.matmul(Packet[idX:idX+2],word)
-                idX += 2
+                descriptor = Packet[idX:idX+DETECTED_POINTS_DESCRIPTOR_DTYPE.itemsize].view(DETECTED_POINTS_DESCRIPTOR_DTYPE)[0]
+                tlv_numObj = np.int64(descriptor["numObj"])
+                tlv_xyzQFormat = 2**np.int64(descriptor["xyzQFormat"])
+                idX += DETECTED_POINTS_DESCRIPTOR_DTYPE.itemsize
                 
-                # Initialize the arrays
-                rangeIdx = np.zeros(tlv_numObj,dtype = 'int16')
-                dopplerIdx = np.zeros(tlv_numObj,dtype = 'int16')
-                peakVal = np.zeros(tlv_numObj,dtype = 'int16')
-                x = np.zeros(tlv_numObj,dtype = 'int16')
-                y = np.zeros(tlv_numObj,dtype = 'int16')
-                z = np.zeros(tlv_numObj,dtype = 'int16')
+                # Read all of the objects at once
+                points = Packet[idX:idX + tlv_numObj*DETECTED_POINT_DTYPE.itemsize].view(DETECTED_POINT_DTYPE)
+                idX += tlv_numObj*DETECTED_POINT_DTYPE.itemsize
+
+                # Fill the preallocated frame instead of new arrays
+                if out is not None:
+                    self.decodePointsInto(points, tlv_xyzQFormat, out)
+                    if self.detection_filter is not None:
+                        filtered, keep = self.filterPoints({k: out[k] for k in self.POINT_FIELDS})
+                        out.num_obj = len(filtered["x"])
+                        out.has_vehicle_frame = "x_vehicle" in filtered
+                        for k in filtered:
+                            out[k][...] = filtered[k]
+                    out.frame_number = header["frameNumber"]
+                    self.detected_objects = out.detected_objects
+                    self.xyz_vel_coordinates = out.xyz_vel
+                    idX = tlvEnd
+                    continue
+
+                rawDopplerIdx = points["dopplerIdx"].view('uint16')
+                rangeIdx = points["rangeIdx"].astype('int16')
+                peakVal = points["peakVal"].astype('int16')
                 
-                for objectNum in range(tlv_numObj):
-                    
-                    # Read the data for each object
-                    rangeIdx[objectNum] =  np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    dopplerIdx[objectNum] = np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    peakVal[objectNum] = np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    x[objectNum] = np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    y[objectNum] = np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    z[objectNum] = np.matmul(Packet[idX:idX+2],word)
-                    idX += 2
-                    
                 # Make the necessary corrections and calculate the rest of the data
-                rangeVal = rangeIdx * self.config_params["rangeIdxToMeters"]
-                dopplerIdx[dopplerIdx > (self.config_params["numDopplerBins"]/2 - 1)] = dopplerIdx[dopplerIdx > (self.config_params["numDopplerBins"]/2 - 1)] - 65535
-                dopplerVal = dopplerIdx * self.config_params["dopplerResolutionMps"]
+                rangeVal = self.rangeLUT[points["rangeIdx"].view('uint16')]
+                dopplerIdx = self.dopplerIdxLUT[rawDopplerIdx]
+                dopplerVal = self.dopplerLUT[rawDopplerIdx]
                 
                 #TODO These were in the original code, but did we need these
                 #x[x > 32767] = x[x > 32767] - 65536
                 #y[y > 32767] = y[y > 32767] - 65536
                 #z[z > 32767] = z[z > 32767] - 65536
                 
-                x = x / tlv_xyzQFormat
-                y = y / tlv_xyzQFormat
-                z = z / tlv_xyzQFormat
+                x = points["x"] / tlv_xyzQFormat
+                y = points["y"] / tlv_xyzQFormat
+                z = points["z"] / tlv_xyzQFormat
+
+                # Gate the whole frame before storing it
+                if self.detection_filter is not None:
+                    filtered, keep = self.filterPoints({"rangeIdx": rangeIdx, "range": rangeVal, "dopplerIdx": dopplerIdx,
+                        "doppler": dopplerVal, "peakVal": peakVal, "x": x, "y": y, "z": z})
+                    rangeIdx, rangeVal, dopplerIdx, dopplerVal, peakVal, x, y, z = (filtered[k] for k in self.POINT_FIELDS)
+                    tlv_numObj = np.int64(len(x))
                 
                 # Store the data in the detObj dictionary
                 self.detected_objects = {"numObj": tlv_numObj, "rangeIdx": rangeIdx, "range": rangeVal, "dopplerIdx": dopplerIdx, \
                         "doppler": dopplerVal, "peakVal": peakVal, "x": x, "y": y, "z": z}
+                if (self.detection_filter is not None) and ("x_vehicle" in filtered):
+                    self.detected_objects.update({k: filtered[k] for k in self.VEHICLE_FIELDS})
                 
                 #generate an array of x,y,z,velocity coordinates for each object
                 self.xyz_vel_coordinates = np.array(
@@ -148,60 +289,81 @@ class Processor:
                      self.detected_objects['doppler']]
                 ).transpose()
 
+            elif tlv_type == MMWDEMO_UART_MSG_RANGE_PROFILE:
+                self.range_profile = tlv.range_profile(Packet, idX, tlv_length,
+                    self.config_params["numRangeBins"])
+                if self.db_output and (self.range_profile is not None):
+                    tlv.to_db(self.range_profile, out = self.range_profile_db)
+
+            elif tlv_type == MMWDEMO_UART_MSG_RANGE_DOPPLAR_HEATMAP:
+                self.range_doppler_heatmap = tlv.range_doppler_heatmap(Packet, idX, tlv_length,
+                    self.config_params["numRangeBins"], self.config_params["numDopplerBins"])
+                if self.db_output and (self.range_doppler_heatmap is not None):
+                    tlv.to_db(self.range_doppler_heatmap, out = self.range_doppler_heatmap_db)
+
+            # Continue with the next TLV whatever this one was
+            idX = tlvEnd
+
             if self.verbose:
                 print("Processor.decodePacket: detected_object {}".format(self.detected_objects))
                 print("Processor.decodePacket: xyz_vel_coordinates {}".format(self.xyz_vel_coordinates))
-            #TODO: was in previous python script
-            """
-            if tlv_type == MMWDEMO_UART_MSG_RANGE_PROFILE: 
-                idX +=2;   
-            count = 0    
-            #print("Doppler bins: ", self.config["numDopplerBins"])
-            #print("Range bins: ", self.config["numRangeBins"])          
-            while tlv_type == MMWDEMO_UART_MSG_RANGE_DOPPLAR_HEATMAP and idX < len(byteBuffer)and (byteBuffer[idX] != 0 or byteBuffer[idX+2] != 0):
-                #print("heatmap working")
-                #print(byteBuffer[idX:idX+2])
-                count +=1
-                idX += 2
-            #print(count)
-            """
         if self.verbose:
             print("Processor.Streamer: Finished Processing Packet\n")
         
         return
 
+    def filterPoints(self,columns):
+        """Apply the detection filter to the points of a frame
+
+        Args:
+            columns (dict): equal length arrays, keyed like detected_objects
+
+        Returns:
+            (dict, np.array): the points that pass (plus VEHICLE_FIELDS
+                with extrinsics), and the boolean mask
+        """
+        #the gates are defined in the radar frame: forward (y), left (-x), up (z)
+        flu = np.column_stack((columns["y"], -columns["x"], columns["z"]))
+        keep = self.detection_filter.mask(flu, columns["doppler"], columns["peakVal"])
+        filtered = {k: v[keep] for k, v in columns.items()}
+        #x, y, z stay in the sensor frame, the mount pose goes into separate columns
+        if self.detection_filter.extrinsics is not None:
+            xyz = self.detection_filter.transform(flu[keep])
+            for i, k in enumerate(self.VEHICLE_FIELDS):
+                filtered[k] = xyz[:,i]
+        return filtered, keep
+
+    def decodePointsInto(self,points,xyzQFormat,frame):
+        """Fill a DetectionFrame from the detected points without
+        allocating (same values as the default decode)
+        """
+        frame.resize(len(points))
+        frame.has_vehicle_frame = False
+        rawDopplerIdx = points["dopplerIdx"].view('uint16')
+        np.copyto(frame["rangeIdx"], points["rangeIdx"])
+        np.copyto(frame["peakVal"], points["peakVal"])
+        np.take(self.rangeLUT, points["rangeIdx"].view('uint16'), out = frame["range"])
+        np.take(self.dopplerIdxLUT, rawDopplerIdx, out = frame["dopplerIdx"])
+        np.take(self.dopplerLUT, rawDopplerIdx, out = frame["doppler"])
+        np.true_divide(points["x"], xyzQFormat, out = frame["x"])
+        np.true_divide(points["y"], xyzQFormat, out = frame["y"])
+        np.true_divide(points["z"], xyzQFormat, out = frame["z"])
+        return frame
+
     def decodePacketHeader(self,Packet):
-        # word array to convert 4 bytes to a 32 bit number
-        word = [1, 2**8, 2**16, 2**24]
-        
-        # Initialize the pointer index
-        idX = 0
+        fields = Packet[:PACKET_HEADER_DTYPE.itemsize].view(PACKET_HEADER_DTYPE)[0]
         
         # Read the header
         header = {}
-        header["magicNumber"] = Packet[idX:idX+8]
-        idX += 8
-
-        header["version"] = format(np.matmul(Packet[idX:idX+4],word),'x')
-        idX += 4
-
-        header["totalPacketLen"] = np.matmul(Packet[idX:idX+4],word)
-        idX += 4
-
-        header["platform"] = format(np.matmul(Packet[idX:idX+4],word),'x')
-        idX += 4
-
-        header["frameNumber"] = np.matmul(Packet[idX:idX+4],word)
-        idX += 4
-
-        header["timeCpuCycles"] = np.matmul(Packet[idX:idX+4],word)
-        idX += 4
-
-        header["numDetectedObj"] = np.matmul(Packet[idX:idX+4],word)
-        idX += 4
-
-        header["numTLVs"] = np.matmul(Packet[idX:idX+4],word)
-        idX += 4
+        header["magicNumber"] = Packet[0:8]
+        header["version"] = format(fields["version"],'x')
+        header["totalPacketLen"] = np.int64(fields["totalPacketLen"])
+        header["platform"] = format(fields["platform"],'x')
+        header["frameNumber"] = np.int64(fields["frameNumber"])
+        header["timeCpuCycles"] = np.int64(fields["timeCpuCycles"])
+        header["numDetectedObj"] = np.int64(fields["numDetectedObj"])
+        header["numTLVs"] = np.int64(fields["numTLVs"])
+        idX = PACKET_HEADER_DTYPE.itemsize
 
         if self.verbose:
             print("Procesor.decodePacketHeader: {}".format(header))
@@ -209,30 +371,19 @@ class Processor:
         return header,idX
 
     def update_plots(self):
-        """Update the plots with the current set of detected points
+        """Redraw the plot now with the current set of detected points
         from self.detected_objects
         """
-        #get x and y coordinates for plotting
-        x = self.detected_objects.get('x')
-        y = self.detected_objects.get('y')
-
-        #plot the data
-        self.ax1.cla()
-        self.ax1.scatter(x,y)
-        plt.title("Detected Points")
-        plt.xlabel("X Coordinate (m)")
-        plt.ylabel("Y Coordinate (m)")
-        plt.xlim((-10,10))
-        plt.ylim((0,10))
-        #plt.show()
-
-        #special code for jupyter notebooks
-        if self.jupyter:
-            self.hdisplay.update(self.fig)
+        self.plotter.update(self.xyz_vel_coordinates)
+        self.plotter.render(force = True)
+        return
+
+    def stopPlotting(self):
+        """Stop the background rendering (draws the last frame)"""
+        if self.plotter is not None:
+            self.plotter.stop()
         return
 
-        
-    
     def performProcessing(self,Packet):
         """Decodes the given data packet
 
@@ -247,8 +398,12 @@ class Processor:
 
         self.decodePacket(Packet)
 
+        #hand the frame to the plot, rendering is throttled and never
+        #waits for frames in between
         if self.plotting_enabled:
-            self.update_plots()
+            self.plotter.update(self.xyz_vel_coordinates)
+            if not self.jupyter:
+                self.plotter.render()
         
         return self.detected_objects
     
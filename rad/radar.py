@@ -1,8 +1,12 @@
+import functools
 import time
 import numpy as np
 from .config import Config
 from .streamer import Streamer
 from .processor import Processor
+from .playback import Pacer
+from .sync import read_frame_number
+from .pipeline import RadarPipeline, serial_chunk_reader
 
 
 class Radar:
@@ -18,6 +22,10 @@ class Radar:
             jupyter = True,
             data_file = "data_stream.dat",
             refresh_rate = 50.0,
+            realtime = False,
+            speed = 1.0,
+            catchup = "drop",
+            detection_filter = None,
             verbose = False):
         """Initialize the radar class
 
@@ -42,8 +50,20 @@ class Radar:
                 jupyter notebook. Defaults to True
             data_file (str, optional): file path to the raw serial data file.
                  Defaults to "data_stream.dat".
-            refresh_rate (float, optional): Refresh rate in Hz at which
-                plots are updated and new data read. Defaults to 50.0.
+            refresh_rate (float, optional): maximum rate in Hz at which
+                plots are redrawn (decoding is never throttled).
+                Defaults to 50.0.
+            realtime (bool, optional): On True, packets from data_file
+                are replayed at the recorded frame rate (frame number x
+                frame periodicity) instead of as fast as possible.
+                Defaults to False.
+            speed (float, optional): playback speed multiplier for
+                realtime replay, between 0.1 and 50. Defaults to 1.0.
+            catchup (str, optional): what realtime replay does when the
+                processing falls behind: "drop" frames to stay in real time
+                or "slip" the clock. Defaults to "drop".
+            detection_filter (DetectionFilter, optional): gates and mount
+                pose applied to every decoded frame. Defaults to None.
             verbose (bool, optional): On True, prints extra information
                 useful when performing debugging. Defaults to False.
         """
@@ -63,6 +83,8 @@ class Radar:
             config_parameters=self.config.config_params,
             enable_plotting=enable_plotting,
             jupyter=jupyter,
+            refresh_rate=refresh_rate,
+            detection_filter=detection_filter,
             verbose=verbose
         )
 
@@ -80,11 +102,101 @@ class Radar:
         self.verbose = verbose
         self.serial_enabled = enable_serial    
         self.started = False
+        self._astream = None
+        self._pipeline = None
+        self.pacer = None
+        if realtime:
+            self.pacer = Pacer(self.config.config_params["frameDurationS"], speed=speed, policy=catchup)
 
     def start(self):
         self.streamer.start_serial_stream()
         self.started = True
 
+    def stop(self):
+        """Stop the serial stream (the serial ports stay open)"""
+        self.streamer.stop_serial_stream()
+        self.started = False
+
+    def reconfigure(self, config_file_name):
+        """Switch the running radar to another config file over the open
+        serial ports (e.g. 1443config.cfg -> 1443config_higher_cfar.cfg)
+
+        Sends 'sensorStop', only the lines that differ from the active config
+        and 'sensorStart' (see rad.cli.reconfigure). While the sensor is
+        stopped, the undecoded bytes of the old config are dropped and the
+        processor switches its parameters between two frames.
+
+        Args:
+            config_file_name (str): config file in rad/config
+
+        Returns:
+            dict: upload report (see rad.cli.reconfigure)
+        """
+        if not self.serial_enabled:
+            raise RuntimeError("Reconfiguring requires enable_serial=True")
+        if not self.started:
+            raise RuntimeError("Need to call radar.start() first")
+        from . import cli
+        newConfig = Config(config_file_name=config_file_name, enable_serial=False, verbose=self.verbose)
+
+        def on_stopped():
+            # -- the swap runs inside the discards, before any decoder takes another packet
+            self.streamer.discardBuffered()
+            step = lambda: self.processor.updateConfig(newConfig.config_params)
+            if self._pipeline is not None:
+                step = functools.partial(self._pipeline.discard_buffered, then=step)
+            if self._astream is not None:
+                step = functools.partial(self._astream.discard_buffered, then=step)
+            step()
+
+        report = cli.reconfigure(self.config.CLIport, self.config.config, newConfig.config, on_stopped,
+            verbose=self.verbose, name="Radar.reconfigure: ")
+        self.config.config = newConfig.config
+        self.config.config_params = newConfig.config_params
+        self.config.configReport = report
+        return report
+
+    async def astart(self):
+        """Awaitable start() that does not block the event loop"""
+        from . import aio
+        await aio.run_blocking(self.start)
+
+    async def astop(self):
+        """Awaitable stop() that also ends any running aiter()"""
+        from . import aio
+        if self._astream is not None:
+            self._astream.close()
+            self._astream = None
+        if self.serial_enabled:
+            await aio.run_blocking(self.stop)
+
+    def aiter(self, queue_size=8):
+        """Asynchronous iterator over the (N x 4) [x,y,z,vel] arrays
+
+        With a serial connection, the data port is read only when the event
+        loop reports it readable (call astart() first). Otherwise the packets
+        in data_file are replayed (paced in real-time mode).
+
+        Usage:
+            async for xyz_vel in radar.aiter():
+                ...
+        """
+        from . import aio
+        if not self.serial_enabled:
+            return aio.aiter_packets(self._next_file_packet, self._decode_packet, self.pacer)
+        if not self.started:
+            raise RuntimeError("Need to call radar.start() or radar.astart() first")
+        self._astream = aio.AsyncFrameStream(self.config.Dataport, self._decode_packet,
+            queue_size=queue_size, recorder=self.streamer.recorder, verbose=self.verbose)
+        return self._astream
+
+    def _decode_packet(self, packet):
+        self.processor.decodePacket(packet)
+        return self.processor.xyz_vel_coordinates
+
+    def _next_file_packet(self):
+        return self.streamer.currentPacket if self.streamer.checkForNewPacket() else None
+
     def read_serial(self):
         """Read from the serial port"""
         if not self.started:
@@ -98,6 +210,42 @@ class Radar:
             xyz_vel_coordinates = None
         return xyz_vel_coordinates
 
+    def pipeline(self, queue_size=8, overflow="block"):
+        """Start a pipelined acquisition: a reader thread drains the data
+        port while a decode thread fills a bounded queue of frames
+
+        Args:
+            queue_size (int, optional): maximum number of decoded frames
+                waiting to be consumed. Defaults to 8.
+            overflow (str, optional): "block" or "drop-oldest" when the
+                frame queue is full. Defaults to "block".
+
+        Returns:
+            RadarPipeline: started pipeline, use get(timeout) or iterate over
+                it to receive (N x 4) [x,y,z,vel] arrays. Stopping it sends
+                'sensorStop' and closes the serial ports
+        """
+        if not self.serial_enabled:
+            raise RuntimeError("Pipeline mode requires enable_serial=True")
+        if not self.started:
+            self.start()
+
+        def on_stop():
+            self._pipeline = None
+            self.stop()
+            self.config.close_serial()
+
+        pipeline = RadarPipeline(
+            read_chunk=serial_chunk_reader(self.config.Dataport, recorder=self.streamer.recorder),
+            decode=self._decode_packet,
+            on_stop=on_stop,
+            queue_size=queue_size,
+            overflow=overflow,
+            verbose=self.verbose
+        )
+        self._pipeline = pipeline
+        return pipeline.start()
+
     def stream_serial(self):
         """Start a serial stream on the radar, stream in data samples,
         and perform processing as needed
@@ -111,6 +259,7 @@ class Radar:
                 # time.sleep(self.refresh_delay)
             except KeyboardInterrupt:
                 self.streamer.stop_serial_stream()
+                self.processor.stopPlotting()
                 if self.verbose:
                     print("Radar.stream_serial: stopping serial stream")
                 break
@@ -126,14 +275,18 @@ class Radar:
             packet_available = self.streamer.checkForNewPacket()
 
             if packet_available:
-                self.processor.performProcessing(self.currentPacket)
+                #in realtime mode, wait until the frame is due (or skip it if late)
+                if (self.pacer is not None) and not self.pacer.wait(read_frame_number(self.streamer.currentPacket)):
+                    continue
+
+                self.processor.performProcessing(self.streamer.currentPacket)
 
                 #TODO add code for tracking here (stored as (4 x N)
                 # array where each row contains the [x,y,z,vel] information
                 # for each detected point)
                 xyz_vel_coordinates = self.processor.xyz_vel_coordinates
             
-            # time.sleep(self.refresh_delay)
+        self.processor.stopPlotting()
         if self.verbose:
             print("Streamer.stream_file: streaming complete")
 
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Background recorder for the raw data port stream
+
+The reading side only copies each chunk into a preallocated ring buffer; a
+writer thread empties it to disk with large sequential writes. Files are
+rotated on a packet boundary so every file can be replayed on its own with
+uRadRadarPlayback.
+"""
+
+import os
+import threading
+import time
+from .ringbuffer import RingBuffer
+from .sync import find_magic_word
+
+
+class StreamRecorder():
+    """Tee raw data port bytes to disk on a background thread
+
+    If the disk cannot keep up and the buffer fills, new data is dropped
+    and counted, the reading side is never blocked.
+
+    Args:
+        prefix (str): path prefix of the recordings, files are named
+            <prefix>_<date>T<time>_<sequence>.dat
+        rotate_bytes (int, optional): start a new file after this many bytes
+        rotate_seconds (float, optional): start a new file after this long
+        buffer_size (int, optional): preallocated buffer in bytes. Defaults
+            to 8 MiB (about 90 s of the 921600 baud data port).
+        write_size (int, optional): the writer waits for this many bytes
+            (or flush_interval) before writing. Defaults to 256 KiB.
+        flush_interval (float, optional): longest time data waits in the
+            buffer. Defaults to 0.5 s.
+    """
+
+    def __init__(self, prefix, rotate_bytes=None, rotate_seconds=None, buffer_size=2**23,
+            write_size=2**18, flush_interval=0.5, verbose=False):
+        self.prefix = prefix
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.write_size = write_size
+        self.flush_interval = flush_interval
+        self.verbose = verbose
+        self.buffer = RingBuffer(buffer_size, overflow='drop-newest')
+        self.files = []
+        self.bytes_written = 0
+        self.error = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_t0 = None
+        self._lock = threading.Lock()
+        self._data_ready = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def bytes_dropped(self):
+        return self.buffer.dropped_bytes
+
+    @property
+    def drop_events(self):
+        return self.buffer.drop_events
+
+    def start(self):
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name='rad-recorder', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """Write out everything that is buffered and close the file"""
+        self._stopping.set()
+        with self._data_ready:
+            self._data_ready.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.verbose:
+            print('StreamRecorder.stop: wrote {} bytes to {} files, dropped {} bytes'.format(
+                self.bytes_written, len(self.files), self.bytes_dropped))
+
+    def write(self, chunk):
+        """Queue a chunk of raw bytes for writing (never blocks on the disk)"""
+        if not chunk:
+            return
+        with self._lock:
+            self.buffer.write(chunk)
+            if len(self.buffer) >= self.write_size:
+                self._data_ready.notify()
+
+    def _open(self):
+        stamp = time.strftime('%Y_%m_%dT%H_%M_%S')
+        filename = '{}_{}_{:04d}.dat'.format(self.prefix, stamp, len(self.files))
+        self._file = open(filename, 'wb')
+        self._file_bytes = 0
+        self._file_t0 = time.monotonic()
+        self.files.append(filename)
+        if self.verbose:
+            print('StreamRecorder: recording to {}'.format(filename))
+
+    def _rotation_due(self):
+        if (self.rotate_bytes is not None) and (self._file_bytes >= self.rotate_bytes):
+            return True
+        if (self.rotate_seconds is not None) and (time.monotonic() - self._file_t0 >= self.rotate_seconds):
+            return True
+        return False
+
+    def _write_loop(self):
+        try:
+            while True:
+                with self._data_ready:
+                    if (len(self.buffer) < self.write_size) and not self._stopping.is_set():
+                        self._data_ready.wait(self.flush_interval)
+                    # -- the contiguous part only: the rest comes on the next pass
+                    n = min(len(self.buffer), self.buffer.capacity - self.buffer.head)
+                    view = self.buffer.peek(n)
+                if n == 0:
+                    if self._stopping.is_set():
+                        break
+                    continue
+                self._write(view)
+                with self._lock:
+                    self.buffer.consume(n)
+        except Exception as e:
+            self.error = e
+            if self.verbose:
+                print('StreamRecorder: stopped writing ({})'.format(e))
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, view):
+        if self._file is None:
+            self._open()
+        while len(view) > 0:
+            if self._rotation_due():
+                # -- rotate on the next packet start so both files stay playable
+                loc = find_magic_word(view)
+                if loc < 0:
+                    self._put(view)
+                    return
+                self._put(view[:loc])
+                self._file.close()
+                self._open()
+                view = view[loc:]
+            n = len(view)
+            if self.rotate_bytes is not None:
+                n = max(1, min(n, self.rotate_bytes - self._file_bytes))
+            self._put(view[:n])
+            view = view[n:]
+
+    def _put(self, view):
+        self._file.write(view)
+        self._file_bytes += len(view)
+        self.bytes_written += len(view)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Circular byte store used to buffer the radar data port
+"""
+
+import numpy as np
+
+
+OVERFLOW_POLICIES = ('drop-oldest', 'drop-newest', 'grow')
+
+
+class RingBuffer():
+    """Fixed-capacity circular byte buffer
+
+    Data is never shifted or zero-filled: reads and writes only move the head
+    and the length. A region that wraps past the end of the storage comes out
+    of `peek`/`read` as a single copy, otherwise `peek` returns a view.
+
+    Overflow policies:
+        drop-oldest: make room by discarding the oldest buffered bytes
+        drop-newest: keep what is buffered and discard what does not fit
+        grow: double the capacity until the data fits
+
+    Statistics:
+        dropped_bytes: total number of bytes lost to overflow
+        drop_events: number of writes that lost data
+        high_water: largest number of bytes ever held
+    """
+
+    def __init__(self, capacity=2**16, overflow='drop-newest', verbose=False):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Overflow policy must be one of {}, got {}'.format(OVERFLOW_POLICIES, overflow))
+        self.overflow = overflow
+        self.verbose = verbose
+        self.data = np.empty(capacity, dtype=np.uint8)
+        self.head = 0
+        self.length = 0
+        self.dropped_bytes = 0
+        self.drop_events = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    @property
+    def free(self):
+        return self.capacity - self.length
+
+    def clear(self):
+        self.head = 0
+        self.length = 0
+
+    def write(self, data):
+        """Append bytes to the end of the buffer, applying the overflow policy
+
+        Returns:
+            int: number of bytes of data that were stored
+        """
+        data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.view(np.uint8)
+        n = len(data)
+        if n > self.free:
+            if self.overflow == 'grow':
+                self._grow(self.length + n)
+            else:
+                if self.overflow == 'drop-oldest':
+                    n_drop = self.length + n - self.capacity
+                    if n > self.capacity:
+                        data = data[n-self.capacity:]
+                    self.consume(self.length + len(data) - self.capacity)
+                else:
+                    n_drop = n - self.free
+                    data = data[:self.free]
+                self._record_drop(n_drop)
+                n = len(data)
+
+        # -- copy in at most two pieces
+        tail = (self.head + self.length) % self.capacity
+        first = min(n, self.capacity - tail)
+        self.data[tail:tail+first] = data[:first]
+        self.data[:n-first] = data[first:]
+        self.length += n
+        self.high_water = max(self.high_water, self.length)
+        return n
+
+    def peek(self, n=None, offset=0):
+        """Look at n bytes starting offset bytes from the head without consuming them
+
+        Returns a view when the region is contiguous, a single copy when it wraps
+        """
+        if n is None:
+            n = self.length - offset
+        if (n < 0) or (offset + n > self.length):
+            raise IndexError('Cannot peek {} bytes at offset {} of {}'.format(n, offset, self.length))
+        start = (self.head + offset) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start+n]
+        return np.concatenate((self.data[start:], self.data[:start+n-self.capacity]))
+
+    def consume(self, n):
+        """Advance the head past n bytes"""
+        n = min(n, self.length)
+        self.head = (self.head + n) % self.capacity
+        self.length -= n
+        if self.length == 0:
+            self.head = 0
+
+    def read(self, n):
+        """Consume n bytes and return them as a new array (exactly one copy)"""
+        out = self.peek(n)
+        if out.base is not None:
+            out = out.copy()
+        self.consume(n)
+        return out
+
+    def _grow(self, min_capacity):
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        data = np.empty(capacity, dtype=np.uint8)
+        data[:self.length] = self.peek()
+        self.data = data
+        self.head = 0
+        if self.verbose:
+            print("RingBuffer: grew to {} bytes".format(capacity))
+
+    def _record_drop(self, n):
+        self.dropped_bytes += n
+        self.drop_events += 1
+        if self.verbose:
+            print("RingBuffer: overflow, dropped {} bytes ({})".format(n, self.overflow))
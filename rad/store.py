@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Columnar on-disk store of decoded detections
+
+A store is a directory with one raw little-endian file per field, appended
+to frame by frame:
+
+    detections: t, frame_number, source_ID, x, y, z, rrt, snr, noise (N x 3)
+    frames:     frame_t, frame_numbers, frame_source_ID, frame_offset
+
+frame_offset[i] is the first detection of frame i (frame i ends where frame
+i+1 starts). meta.json holds the dtypes and the number of rows that are
+complete, and is only rewritten after the column files are flushed, so a
+store that was being written when the process died opens at its last flush.
+
+Reading memory maps every column, opening is independent of the size of the
+store. Range queries binary search the frame table and slice the columns, so
+only the pages of the requested frames are read.
+"""
+
+import json
+import os
+import numpy as np
+from .detections import DetectionBatch
+
+
+STORE_VERSION = 1
+META_FILE = 'meta.json'
+FRAME_COLUMNS = {
+    'frame_t': '<f8',
+    'frame_numbers': '<u4',
+    'frame_source_ID': '<i4',
+    'frame_offset': '<u8',
+}
+
+
+def _detection_columns(dtype):
+    dtype = np.dtype(dtype).newbyteorder('<').str
+    return {'t': '<f8', 'frame_number': '<u4', 'source_ID': '<i4',
+        'x': dtype, 'y': dtype, 'z': dtype, 'rrt': dtype, 'snr': dtype, 'noise': dtype}
+
+
+def _column_path(path, name):
+    return os.path.join(path, name + '.bin')
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+class DetectionWriter():
+    """Append frames of detections to a columnar store
+
+    Args:
+        path (str): directory of the store
+        dtype (optional): float64 (default) or float32 for x, y, z, rrt,
+            snr and noise
+        flush_frames (int, optional): frames between commits of meta.json.
+            Defaults to 100.
+        append (bool, optional): continue an existing store (from its last
+            commit) instead of starting over. Defaults to False.
+
+    Usage:
+        with DetectionWriter('drive.rad') as writer:
+            for objects, _ in radar:
+                writer.write(objects, frame_number=..., t=...)
+    """
+
+    def __init__(self, path, dtype=np.float64, flush_frames=100, append=False):
+        self.path = path
+        self.flush_frames = flush_frames
+        self.num_frames = 0
+        self.num_detections = 0
+        self.monotonic = True
+        self._last_t = -np.inf
+        if append and os.path.exists(os.path.join(path, META_FILE)):
+            meta = _read_meta(path)
+            self.columns = meta['columns']
+            self.num_frames = meta['num_frames']
+            self.num_detections = meta['num_detections']
+            self.monotonic = meta['monotonic']
+            self._last_t = -np.inf if meta['last_t'] is None else meta['last_t']
+        else:
+            self.columns = _detection_columns(dtype)
+            os.makedirs(path, exist_ok=True)
+        self.columns.update(FRAME_COLUMNS)
+        self.dtype = np.dtype(self.columns['x'])
+        self._files = {}
+        for name, column_dtype in self.columns.items():
+            rows = self.num_frames if name in FRAME_COLUMNS else self.num_detections
+            width = 3 if name == 'noise' else 1
+            f = open(_column_path(path, name), 'ab' if append else 'wb')
+            # -- drop anything written after the last commit
+            f.truncate(rows * width * np.dtype(column_dtype).itemsize)
+            f.seek(0, os.SEEK_END)
+            self._files[name] = f
+        self._unflushed = 0
+        self._commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, detections, frame_number=0, t=None, source_ID=None):
+        """Append one frame
+
+        Args:
+            detections (list or DetectionBatch): detections of the frame
+            frame_number (int, optional): sensor frame number
+            t (float, optional): frame time, defaults to the time of the
+                first detection (or of the previous frame if there are none)
+            source_ID (int, optional): sensor of the frame, defaults to the
+                sensor of the detections (-1 if they come from several)
+        """
+        if isinstance(detections, DetectionBatch):
+            n = len(detections)
+            data = detections.data
+            det_t = detections.t
+            det_source = detections.source_ID
+            noise = detections.noise
+            x, y, z, rrt, snr = (data[:, j] for j in range(5))
+        else:
+            detections = list(detections)
+            n = len(detections)
+            det_t = np.array([d.t for d in detections], dtype=float)
+            det_source = np.array([d.source_ID for d in detections], dtype=np.int64)
+            x, y, z, rrt = (np.array([getattr(d, k) for d in detections], dtype=float) for k in ('x', 'y', 'z', 'rrt'))
+            snr = np.array([np.nan if d.snr is None else d.snr for d in detections], dtype=float)
+            noise = np.array([np.full(3, np.nan) if d.noise is None else d.noise for d in detections], dtype=float).reshape(n, 3)
+        if noise is None:
+            noise = np.nan
+        if t is None:
+            t = float(det_t[0]) if n > 0 else (self._last_t if np.isfinite(self._last_t) else 0.0)
+        if source_ID is None:
+            sources = np.unique(det_source) if n > 0 else []
+            source_ID = int(sources[0]) if len(sources) == 1 else -1
+        columns = {'t': det_t, 'frame_number': frame_number, 'source_ID': det_source,
+            'x': x, 'y': y, 'z': z, 'rrt': rrt, 'snr': snr, 'noise': np.broadcast_to(noise, (n, 3))}
+        for name, values in columns.items():
+            shape = (n, 3) if name == 'noise' else (n,)
+            self._files[name].write(np.broadcast_to(np.asarray(values, dtype=self.columns[name]), shape).tobytes())
+        frame = {'frame_t': t, 'frame_numbers': frame_number, 'frame_source_ID': source_ID,
+            'frame_offset': self.num_detections}
+        for name, value in frame.items():
+            self._files[name].write(np.asarray(value, dtype=self.columns[name]).tobytes())
+        if t < self._last_t:
+            self.monotonic = False
+        self._last_t = max(self._last_t, t)
+        self.num_frames += 1
+        self.num_detections += n
+        self._unflushed += 1
+        if self._unflushed >= self.flush_frames:
+            self.flush()
+
+    def flush(self):
+        """Write out the columns and commit the frames written so far"""
+        for f in self._files.values():
+            f.flush()
+        self._commit()
+        self._unflushed = 0
+
+    def close(self):
+        if self._files:
+            self.flush()
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+    def _commit(self):
+        meta = {'version': STORE_VERSION, 'columns': {k: v for k, v in self.columns.items() if k not in FRAME_COLUMNS},
+            'num_frames': self.num_frames, 'num_detections': self.num_detections,
+            'monotonic': self.monotonic, 'last_t': self._last_t if np.isfinite(self._last_t) else None}
+        tmp = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+
+class DetectionStore():
+    """Read-only, memory-mapped view of a columnar store
+
+    The detection columns are attributes (t, frame_number, source_ID, x, y,
+    z, rrt, snr, noise) and so is the frame table (frame_t, frame_offset,
+    frame_numbers, frame_source_ID), all as np.memmap.
+
+    Args:
+        path (str): directory of the store
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.refresh()
+
+    def refresh(self):
+        """Map the frames committed since the store was opened (e.g. by a live writer)"""
+        meta = _read_meta(self.path)
+        if meta['version'] != STORE_VERSION:
+            raise ValueError('Unsupported store version {} in {}'.format(meta['version'], self.path))
+        self.num_frames = meta['num_frames']
+        self.num_detections = meta['num_detections']
+        self.monotonic = meta['monotonic']
+        columns = dict(meta['columns'], **FRAME_COLUMNS)
+        for name, dtype in columns.items():
+            rows = self.num_frames if name in FRAME_COLUMNS else self.num_detections
+            shape = (rows, 3) if name == 'noise' else (rows,)
+            if rows == 0:
+                values = np.zeros(shape, dtype=dtype)
+            else:
+                values = np.memmap(_column_path(self.path, name), dtype=dtype, mode='r', shape=shape)
+            setattr(self, name, values)
+        return self
+
+    def __len__(self):
+        return self.num_frames
+
+    def __iter__(self):
+        for i in range(self.num_frames):
+            yield self.frames(i, i + 1)
+
+    def __getitem__(self, i):
+        """Detections of frame i (an int) or of a slice of frames"""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.num_frames)
+            if step != 1:
+                raise IndexError('Frame slices must be contiguous')
+            return self.frames(start, stop)
+        if i < 0:
+            i += self.num_frames
+        if not 0 <= i < self.num_frames:
+            raise IndexError('Frame {} out of range for a store of {} frames'.format(i, self.num_frames))
+        return self.frames(i, i + 1)
+
+    def detection_range(self, start, stop):
+        """Rows of the detection columns that belong to frames [start, stop)"""
+        first = int(self.frame_offset[start]) if start < self.num_frames else self.num_detections
+        last = int(self.frame_offset[stop]) if stop < self.num_frames else self.num_detections
+        return first, last
+
+    def frames(self, start, stop):
+        """Detections of frames [start, stop) as one DetectionBatch (copies only those rows)"""
+        start, stop = max(0, start), min(self.num_frames, stop)
+        first, last = self.detection_range(start, max(start, stop))
+        rows = slice(first, last)
+        data = np.column_stack([getattr(self, k)[rows] for k in DetectionBatch.COLUMNS])
+        noise = np.array(self.noise[rows])
+        return DetectionBatch._from_data(data.reshape(-1, 5), np.array(self.source_ID[rows]),
+            np.array(self.t[rows]), noise)
+
+    def frame_span(self, t_start, t_end):
+        """Frames [start, stop) with t_start <= frame_t < t_end"""
+        if self.monotonic:
+            start = int(np.searchsorted(self.frame_t, t_start, side='left'))
+            stop = int(np.searchsorted(self.frame_t, t_end, side='left'))
+            return start, stop
+        idx = np.flatnonzero((self.frame_t >= t_start) & (self.frame_t < t_end))
+        return (int(idx[0]), int(idx[-1]) + 1) if len(idx) else (0, 0)
+
+    def time_range(self, t_start, t_end):
+        """Detections of the frames with t_start <= frame_t < t_end"""
+        return self.frames(*self.frame_span(t_start, t_end))
+
+    def frame_number_range(self, first, last):
+        """Detections of the frames with first <= frame number < last
+
+        Frame numbers are assumed to increase through the store (one sensor,
+        one run)
+        """
+        start = int(np.searchsorted(self.frame_numbers, first, side='left'))
+        stop = int(np.searchsorted(self.frame_numbers, last, side='left'))
+        return self.frames(start, stop)
@@ -1,6 +1,8 @@
-import serial
 import time
 import numpy as np
+from .sync import PacketSync
+from .playback import MappedRecording
+from .recorder import StreamRecorder
 
 
 # Streamer class -> use either loadFile + readFromFile (in a loop w/ delays) OR readRealTime (also must be in a loop with delays). Both read methods will return the next packet available, if there is one
@@ -10,8 +12,10 @@ class Streamer:
     def __init__(self,
                  enable_serial=False,
                  data_file = "data_stream.dat",
-                 CLIPort:serial.Serial =None,
-                 DataPort:serial.Serial =None,
+                 CLIPort:'serial.Serial' =None,
+                 DataPort:'serial.Serial' =None,
+                 buffer_size = 2**16,
+                 overflow_policy = "drop-newest",
                  verbose = False):
         """Initialize the streamer class
 
@@ -25,20 +29,31 @@ class Streamer:
                 commands to the radar. Defaults to None.
             DataPort (serial.Serial, optional): serial.Serial object used to read
                 raw data from the radar. Defaults to None.
+            buffer_size (int, optional): capacity in bytes of the circular
+                byte buffer. Defaults to 2**16.
+            overflow_policy (str, optional): what to do when the buffer is
+                full, one of "drop-oldest", "drop-newest" or "grow".
+                Defaults to "drop-newest".
             verbose (bool, optional): On True, prints debugging information. Defaults to False.
         """
 
         #save verbose setting
         self.verbose = verbose
 
-        #initialize the byte buffer
-        maxBufferSize = 2**16
-        self.byteBuffer = np.zeros(maxBufferSize,dtype = 'uint8')
-        self.byteBufferLength = 0
+        #initialize the byte buffer and packet sync engine
+        self.sync = PacketSync(buffer_size=buffer_size, overflow=overflow_policy, verbose=verbose)
 
         #initialize the packet buffer
         self.currentPacket = np.empty(0)
 
+        #packets come from the sync engine (serial) or a mapped file reader (playback)
+        self.recording = None
+        self.fileReader = None
+        self.packetSource = self.sync
+
+        #optional raw stream recorder (see startRecording)
+        self.recorder = None
+
         #configure the serial ports
         self.CLIport = CLIPort
         self.DataPort = DataPort
@@ -54,11 +69,19 @@ class Streamer:
     def loadFile(self,data_file): 
         """Import raw serial data saved in a local file
 
+        The file is memory mapped, so it can be of any size and packets
+        are returned as views into the mapping (no copies)
+
         Args:
-            data_file (str): file path to the raw serial data file
+            data_file (str or MappedRecording): file path to the raw serial
+                data file, or an existing mapping to share with other readers
         """
-        byteVec = np.fromfile(data_file, dtype="byte")
-        self.updateBuffer(byteVec)
+        if isinstance(data_file, MappedRecording):
+            self.recording = data_file
+        else:
+            self.recording = MappedRecording(data_file)
+        self.fileReader = self.recording.reader()
+        self.packetSource = self.fileReader
 
         if self.verbose:
             print("Streamer.loadFile: Loaded data from {}".format(data_file))
@@ -71,6 +94,8 @@ class Streamer:
             _type_: _description_
         """
         readBuffer = self.DataPort.read(self.DataPort.in_waiting)
+        if self.recorder is not None:
+            self.recorder.write(readBuffer)
         byteVec = np.frombuffer(readBuffer, dtype = 'uint8')
         self.updateBuffer(byteVec)
         return
@@ -82,16 +107,16 @@ class Streamer:
             byteVec (np.array(dtype='uint8')): buffer with data 
                 read from the data serial port
         """
-        maxBufferSize = 2**16
-        byteCount = len(byteVec)
-        
-        # add the data to the end of the buffer, update buffer length
-        if (self.byteBufferLength + byteCount) < maxBufferSize:
-            self.byteBuffer[self.byteBufferLength:self.byteBufferLength + byteCount] = byteVec[:byteCount]
-            self.byteBufferLength = self.byteBufferLength + byteCount
-        else:
-            print("Streamer.updateBuffer: Buffer is full")
-        
+        self.sync.write(byteVec)
+        return
+
+    def discardBuffered(self):
+        """Drop the bytes read (and waiting on the data port) that are not
+        decoded yet, e.g. the rest of the stream of a previous configuration
+        """
+        if self.DataPort is not None:
+            self.DataPort.reset_input_buffer()
+        self.sync.reset()
         return
 
     def checkForNewPacket(self): 
@@ -99,82 +124,79 @@ class Streamer:
              update self.currentPacket and return True to note 
              that a new packet was detected
 
+        Only the bytes that arrived since the last call are searched for
+        the magic word, and packets whose stated length does not line up
+        with the next sync are dropped (see PacketSync)
+
         Returns:
             bool: True if new packet was detected
         """
-        #magic word for detecting packet start
-        magicWord = [2, 1, 4, 3, 6, 5, 8, 7]
-
-        # word array to convert 4 bytes to a 32 bit number
-        word = [1, 2**8, 2**16, 2**24]
-
-        # Check that the buffer has some data
-        if self.byteBufferLength > 16:
-            
-            # Check for all possible locations of the magic word
-            possibleLocs = np.where(self.byteBuffer == magicWord[0])[0]
-
-            # Identify all possible packet start locations (all of the places that the magic word occurs in)
-            startIdx = []
-            for loc in possibleLocs:
-
-                #get the possible magic word
-                check = self.byteBuffer[loc:loc+8]
-
-                #check to make sure that the magic word matches
-                if np.all(check == magicWord):
-                    startIdx.append(loc)
-                
-            # Check that startIdx is not empty
-            if startIdx:
-                
-                #check to make sure that the packet is a valid packet
-                packet_start_i = 0
-                for i in range(len(startIdx)-1): 
-                    #TODO: added code to check for the case of only partially received packets or corrupt packets
-                    packet_start_i = i
-                    stated_packetLen = np.matmul(self.byteBuffer[startIdx[i] + 12:startIdx[i] + 12+4],word)
-
-                    actual_packetLen = startIdx[i + 1] - startIdx[i]
-
-                    if stated_packetLen == actual_packetLen:
-                        break
-
-
-                    #check that the total packet length matches the 
-                # Remove the data before the first start index
-                if startIdx[packet_start_i] > 0 and startIdx[packet_start_i] < self.byteBufferLength:
-                    self.byteBuffer[:self.byteBufferLength-startIdx[packet_start_i]] = self.byteBuffer[startIdx[packet_start_i]:self.byteBufferLength]
-
-                    self.byteBuffer[self.byteBufferLength-startIdx[packet_start_i]:] = np.zeros(len(self.byteBuffer[self.byteBufferLength-startIdx[packet_start_i]:]),dtype = 'uint8')
-
-                    self.byteBufferLength = self.byteBufferLength - startIdx[packet_start_i]
-                
-                
-                # Read the total packet length
-                totalPacketLen = np.matmul(self.byteBuffer[12:12+4],word)
-                
-                # Check that all the packet has been read
-                if (self.byteBufferLength >= totalPacketLen) and (self.byteBufferLength != 0):
-
-                    #extract the current packet (hard copy so that data not over-written in next steps)
-                    self.currentPacket = self.byteBuffer[:totalPacketLen].copy()
-
-                    #remove the current packet from the buffer
-                    self.byteBuffer[:self.byteBufferLength - totalPacketLen] = self.byteBuffer[totalPacketLen:self.byteBufferLength] 
-
-                    #add zeros where the packet previously was
-                    self.byteBuffer[self.byteBufferLength - totalPacketLen:] = np.zeros(len(self.byteBuffer[self.byteBufferLength - totalPacketLen:]),dtype = 'uint8') 
-
-                    #update current buffer length
-                    self.byteBufferLength = self.byteBufferLength - totalPacketLen
-
-                    #return True to note that a new packet was detected
-                    return True
-        else:
+        packet = self.packetSource.next_packet()
+        if packet is None:
             #return False to note that no new packet was detected
             return False
 
+        #from serial, the packet is a hard copy so that data is not over-written
+        #in next steps. From a file, it is a read-only view into the mapping
+        self.currentPacket = packet
+        return True
+
+    @property
+    def byteBuffer(self):
+        """Contents of the byte buffer (a view unless the data wraps)"""
+        return self.sync.ring.peek()
+
+    @property
+    def byteBufferLength(self):
+        return self.sync.length
+
+    @property
+    def bytesDiscarded(self):
+        """Number of bytes thrown away while (re)acquiring packet sync"""
+        return self.packetSource.bytes_discarded
+
+    @property
+    def resyncCount(self):
+        """Number of times the stream had to be re-synchronized"""
+        return self.packetSource.resync_count
+
+    @property
+    def bytesDropped(self):
+        """Number of bytes lost because the byte buffer was full"""
+        return self.sync.ring.dropped_bytes
+
+    @property
+    def dropEvents(self):
+        """Number of reads that lost data because the byte buffer was full"""
+        return self.sync.ring.drop_events
+
+    @property
+    def highWaterMark(self):
+        """Largest number of bytes ever waiting in the byte buffer"""
+        return self.sync.ring.high_water
+
+    def startRecording(self, prefix, rotate_bytes=None, rotate_seconds=None):
+        """Tee every chunk read from the data port to disk on a background thread
+
+        Args:
+            prefix (str): path prefix of the recorded .dat files
+            rotate_bytes (int, optional): start a new file after this many bytes
+            rotate_seconds (float, optional): start a new file after this long
+
+        Returns:
+            StreamRecorder: the running recorder (drop counts, file names)
+        """
+        self.stopRecording()
+        self.recorder = StreamRecorder(prefix, rotate_bytes=rotate_bytes,
+            rotate_seconds=rotate_seconds, verbose=self.verbose).start()
+        return self.recorder
+
+    def stopRecording(self):
+        """Flush and close the raw stream recording, if any"""
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+
     def start_serial_stream(self):
         """Start a serial stream
         """
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Packet synchronization for the TI mmWave UART stream
+
+Every packet starts with the magic word [2, 1, 4, 3, 6, 5, 8, 7] followed
+by the version and the total packet length (little-endian uint32 at byte 12).
+"""
+
+import numpy as np
+from .ringbuffer import RingBuffer
+
+
+MAGIC_WORD = np.array([2, 1, 4, 3, 6, 5, 8, 7], dtype=np.uint8)
+MAGIC_WORD_LEN = len(MAGIC_WORD)
+PACKET_LEN_OFFSET = 12
+FRAME_NUMBER_OFFSET = 20
+MIN_HEADER_LEN = 16
+
+
+def as_uint8(buffer):
+    """View any bytes-like object or numpy array as a flat uint8 array (no copy)"""
+    if isinstance(buffer, np.ndarray):
+        return buffer.view(np.uint8) if buffer.dtype != np.uint8 else buffer
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def find_all_magic_words(buffer, start=0, stop=None):
+    """Find every index in buffer[start:stop] where a full magic word starts
+
+    The search is vectorized: candidates are the locations of the first magic
+    byte and the remaining seven bytes are checked with one array comparison
+    each, so noise never costs a python-level iteration.
+    """
+    buffer = as_uint8(buffer)
+    if stop is None:
+        stop = len(buffer)
+    segment = buffer[start:stop]
+    n_starts = len(segment) - MAGIC_WORD_LEN + 1
+    if n_starts <= 0:
+        return np.empty(0, dtype=np.intp)
+    locs = np.flatnonzero(segment[:n_starts] == MAGIC_WORD[0])
+    for k in range(1, MAGIC_WORD_LEN):
+        if len(locs) == 0:
+            break
+        locs = locs[segment[locs + k] == MAGIC_WORD[k]]
+    return locs + start
+
+
+def find_magic_word(buffer, start=0, stop=None):
+    """Index of the first magic word in buffer[start:stop], or -1 if there is none"""
+    locs = find_all_magic_words(buffer, start, stop)
+    return int(locs[0]) if len(locs) > 0 else -1
+
+
+def is_magic_word(buffer, loc):
+    """True if a full magic word starts at buffer[loc]"""
+    buffer = as_uint8(buffer)
+    return bool(np.array_equal(buffer[loc:loc+MAGIC_WORD_LEN], MAGIC_WORD))
+
+
+def read_packet_length(buffer, loc=0):
+    """Read the stated total packet length of the packet starting at buffer[loc]"""
+    buffer = as_uint8(buffer)
+    return int.from_bytes(buffer[loc+PACKET_LEN_OFFSET:loc+PACKET_LEN_OFFSET+4].tobytes(), 'little')
+
+
+def read_frame_number(buffer, loc=0):
+    """Read the frame number of the packet starting at buffer[loc]"""
+    buffer = as_uint8(buffer)
+    return int.from_bytes(buffer[loc+FRAME_NUMBER_OFFSET:loc+FRAME_NUMBER_OFFSET+4].tobytes(), 'little')
+
+
+class PacketSync():
+    """Reassemble TI packets from an arbitrarily chunked byte stream
+
+    Bytes are appended with `write` into a RingBuffer (see there for the
+    overflow policies) and complete packets are pulled with `next_packet`. Only bytes that arrived since the last call are searched
+    for the magic word, and the stated total packet length is checked against
+    the next sync so torn or corrupt packets are dropped in bounded time.
+
+    Counters:
+        bytes_discarded: bytes thrown away while (re)acquiring sync
+        resync_count: number of gaps in the stream (each contiguous run of
+            discarded bytes counts once)
+        packets: number of packets returned
+    """
+
+    def __init__(self, buffer_size=2**16, overflow='drop-newest', verbose=False):
+        self.verbose = verbose
+        self.ring = RingBuffer(buffer_size, overflow=overflow, verbose=verbose)
+        self.synced = False
+        self.scan_idx = 0  # magic word starts before this index were already searched
+        self.bytes_discarded = 0
+        self.resync_count = 0
+        self.packets = 0
+        self._in_gap = False
+
+    def __len__(self):
+        return len(self.ring)
+
+    @property
+    def length(self):
+        return len(self.ring)
+
+    @property
+    def bytes_needed(self):
+        """Bytes still missing from the packet at the front (1 when not known yet)"""
+        if not self.synced:
+            return 1
+        if self.length < MIN_HEADER_LEN:
+            return MIN_HEADER_LEN - self.length
+        packet_len = read_packet_length(self.ring.peek(MIN_HEADER_LEN))
+        if MIN_HEADER_LEN <= packet_len <= self.ring.capacity:
+            return max(1, packet_len - self.length)
+        return 1
+
+    def write(self, data):
+        """Append data to the end of the buffer
+
+        Returns:
+            int: number of bytes accepted
+        """
+        before = len(self.ring)
+        accepted = self.ring.write(as_uint8(data))
+        lost_front = before + accepted - len(self.ring)
+        if lost_front > 0:
+            # -- drop-oldest overflow ate the start of the buffer
+            self.synced = False
+            self.scan_idx = max(0, self.scan_idx - lost_front)
+        return accepted
+
+    def reset(self):
+        """Forget everything buffered (e.g. the rest of a stream that was stopped)"""
+        self.ring.consume(len(self.ring))
+        self.synced = False
+        self.scan_idx = 0
+        self._in_gap = False
+
+    def _find(self, start, stop):
+        if stop - start < MAGIC_WORD_LEN:
+            return -1
+        loc = find_magic_word(self.ring.peek(stop - start, offset=start))
+        return loc + start if loc >= 0 else -1
+
+    def _discard(self, n):
+        """Remove the first n bytes from the buffer"""
+        if n <= 0:
+            return
+        self.ring.consume(n)
+        self.scan_idx = max(0, self.scan_idx - n)
+
+    def _drop(self, n):
+        """Throw away n bytes that are not part of a valid packet"""
+        if n <= 0:
+            return
+        self._discard(n)
+        self.bytes_discarded += n
+        if not self._in_gap:
+            self.resync_count += 1
+            self._in_gap = True
+        if self.verbose:
+            print("PacketSync: dropped {} bytes".format(n))
+
+    def next_packet(self):
+        """Pull the next complete, validated packet out of the buffer
+
+        Returns:
+            np.array(dtype=uint8) or None: the packet (copied out of the
+                ring exactly once), None if no
+                complete packet is available yet
+        """
+        while True:
+            # -- get a magic word to the front of the buffer
+            if not self.synced:
+                loc = self._find(self.scan_idx, self.length)
+                if loc < 0:
+                    # keep the tail in case it holds the start of a magic word
+                    self.scan_idx = max(self.scan_idx, self.length - MAGIC_WORD_LEN + 1)
+                    self._drop(self.length - min(self.length, MAGIC_WORD_LEN - 1))
+                    return None
+                if loc > 0:
+                    self._drop(loc)
+                self.synced = True
+                self.scan_idx = MAGIC_WORD_LEN
+            if self.length < MIN_HEADER_LEN:
+                return None
+
+            # -- validate the stated packet length
+            packet_len = read_packet_length(self.ring.peek(MIN_HEADER_LEN))
+            if (packet_len < MIN_HEADER_LEN) or (packet_len > self.ring.capacity):
+                self.synced = False
+                self._drop(MAGIC_WORD_LEN)
+                continue
+
+            # -- a magic word inside the stated packet means the packet was torn
+            stop = min(self.length, packet_len + MAGIC_WORD_LEN - 1)
+            loc = self._find(self.scan_idx, stop)
+            if loc >= 0:
+                self._drop(loc)
+                self.scan_idx = MAGIC_WORD_LEN
+                continue
+            self.scan_idx = max(self.scan_idx, stop - MAGIC_WORD_LEN + 1)
+            if self.length < packet_len:
+                return None
+
+            # -- the next packet must start right after this one (check if already received)
+            if (self.length >= packet_len + MAGIC_WORD_LEN) and not is_magic_word(self.ring.peek(MAGIC_WORD_LEN, offset=packet_len), 0):
+                self.synced = False
+                self._drop(MAGIC_WORD_LEN)
+                continue
+
+            packet = self.ring.read(packet_len)
+            self.scan_idx = 0
+            self.synced = False
+            self._in_gap = False
+            self.packets += 1
+            return packet
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+Array-valued TLVs of the TI packets
+
+Range profiles and range-Doppler heatmaps are handed out as numpy views
+straight over the packet buffer, so nothing is copied until the caller asks
+for dB values (which go into a buffer the caller can reuse every frame).
+"""
+
+import numpy as np
+
+
+TLV_DETECTED_POINTS = 1
+TLV_RANGE_PROFILE = 2
+TLV_NOISE_PROFILE = 3
+TLV_RANGE_DOPPLER_HEATMAP = 5
+TLV_STATS = 6
+TLV_SIDE_INFO = 7
+TLV_TEMPERATURE = 9
+
+# -- the demo sends log2 magnitudes in Q9 format
+LOG2_Q9_TO_DB = 20 * np.log10(2) / 2**9
+
+
+def range_profile(buffer, offset, length, num_range_bins):
+    """View of a range profile TLV payload, shape (num_range_bins,)
+
+    Returns None if the TLV length does not match the configured number of bins
+    """
+    num_range_bins = int(num_range_bins)
+    if length != 2 * num_range_bins:
+        return None
+    return np.frombuffer(buffer, dtype='<u2', count=num_range_bins, offset=offset)
+
+
+def range_doppler_heatmap(buffer, offset, length, num_range_bins, num_doppler_bins):
+    """View of a range-Doppler heatmap TLV payload, shape (num_range_bins, num_doppler_bins)
+
+    Returns None if the TLV length does not match the configured number of bins
+    """
+    num_range_bins, num_doppler_bins = int(num_range_bins), int(num_doppler_bins)
+    if length != 2 * num_range_bins * num_doppler_bins:
+        return None
+    return np.frombuffer(buffer, dtype='<u2', count=num_range_bins * num_doppler_bins,
+        offset=offset).reshape(num_range_bins, num_doppler_bins)
+
+
+def to_db(raw, out=None):
+    """Convert log2 magnitudes (Q9) to float32 dB
+
+    Args:
+        raw (np.array): range profile or heatmap view
+        out (np.array(dtype=float32), optional): reusable output buffer of the
+            same shape, allocated if not given
+    """
+    if out is None:
+        out = np.empty(raw.shape, dtype=np.float32)
+    np.multiply(raw, np.float32(LOG2_Q9_TO_DB), out=out)
+    return out
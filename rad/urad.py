@@ -8,37 +8,90 @@
 
 """
 
+import functools
 import itertools
 import os, sys
-import serial
 import struct
+import threading
 import numpy as np
-from time import time, sleep
+from time import time, sleep, perf_counter
 from rad import detections
 from .base import _Radar, _DataStream
+from .pipeline import RadarPipeline, serial_chunk_reader
+from .playback import MappedRecording, Pacer
+from .sync import PacketSync, read_frame_number
+from .recorder import StreamRecorder
+from .index import load_index
+from .store import DetectionWriter
+from . import tlv
+from . import cli
+
+
+def _find_config_file(config_file):
+    if not os.path.exists(config_file):
+        config_file = os.path.join(os.path.dirname(__file__), 'config', config_file)
+        if not os.path.exists(config_file):
+            raise FileNotFoundError('Cannot find config file called {}'.format(config_file))
+    return config_file
 
 
 class _uRadRadar(_Radar):
     id_iter = itertools.count()
 
-    def __init__(self, config_file, snr_floor=8, verbose=False):
-        if not os.path.exists(config_file):
-            config_file = os.path.join(os.path.dirname(__file__), 'config', config_file)
-            if not os.path.exists(config_file):
-                raise FileNotFoundError('Cannot find config file called {}'.format(config_file))
-        self.config_file = config_file
+    def __init__(self, config_file, snr_floor=8, verbose=False, as_batch=False, batch_dtype=np.float64,
+            detection_filter=None):
+        self.config_file = _find_config_file(config_file)
         self.config_data = parse_ti_config(self.config_file)
         self.data_port = None
         self.verbose = verbose
-        self.packet = bytearray([])
+        self.sync = PacketSync(buffer_size=2**18, overflow='drop-oldest', verbose=verbose)
         self.noise_razel = [1e-3, 1*np.pi/180, 1*np.pi/180]
         self.noise_xyz = [1e-3, 1e-3, 1e-3]  # an approximation
         self.snr_floor = snr_floor
+        self.as_batch = as_batch
+        self.batch_dtype = batch_dtype
+        self.detection_filter = detection_filter  # rad.filters.DetectionFilter, gates and mount pose
         self.ID = next(self.id_iter)
         self.tlv_header_len = 8
         self.header_len = 40
         self.sync_pattern = 0x708050603040102
         self.frame0 = None
+        self.t_offset = 0.0  # -- time of frame0, moves on when frame numbers restart (see reconfigure)
+        self._last_t = None
+        self._decode_lock = threading.RLock()  # -- a frame is decoded with one config
+        self.range_profile = None
+        self.range_doppler_heatmap = None
+        self._objects_buffer = np.zeros((0, 6))  # reused by every decode, see decode_packet
+        self.recorder = None
+        self.store = None
+
+    def start_store(self, path, dtype=None, flush_frames=100, append=False):
+        """Append every decoded frame to a columnar store (see rad.store)
+
+        The store holds the detections as they are returned, after the SNR
+        floor and the detection filter. Returns the DetectionWriter
+        """
+        self.stop_store()
+        self.store = DetectionWriter(path, dtype=self.batch_dtype if dtype is None else dtype,
+            flush_frames=flush_frames, append=append)
+        return self.store
+
+    def stop_store(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _switch_config(self, config_file, config_data):
+        """Swap in another config in one step, between two frames"""
+        with self._decode_lock:
+            if self._last_t is not None:
+                # -- frame numbers restart with the sensor, time goes on
+                self.t_offset = self._last_t + self.config_data['frame_duration_s']
+            self.frame0 = None
+            self.config_file = config_file
+            self.config_data = config_data
+            self.range_profile = None
+            self.range_doppler_heatmap = None
 
     def read_data_port(self):
         """
@@ -48,6 +101,9 @@ class _uRadRadar(_Radar):
         2 - sync pattern not aligned
         3 - buffer has header but not object data
 
+        Objects are a list of RadarDetection3D_XYZ, or one DetectionBatch
+        if the radar was made with as_batch=True
+
         Coordinates:
         - the default coordinates are
             - x: right
@@ -61,89 +117,240 @@ class _uRadRadar(_Radar):
         TODO: separate the reading from the processing...
         """
         objects = []
-
-        # -- try to read header
+        discarded = self.sync.bytes_discarded
         while True:
-            # -- read in header
-            self.packet += self.data_port.read(self.header_len - len(self.packet)) 
-            if len(self.packet) >= self.header_len:
-                header = parse_ti_header(self.packet, self.header_len)
-                if header['sync'] == self.sync_pattern:
-                    self.packet = bytearray([])
-                    break
-                else:
-                    self.packet = self.packet[1:]  # increment to try to find sync
-        else:
-            # -- we did not hit the break
-            exit_code = 2
-            return objects, exit_code
+            with self._decode_lock:
+                packet = self.sync.next_packet()
+                if packet is not None:
+                    return self.decode_packet(packet)
+
+            # -- one bulk read: all that is waiting, or at least the rest of the current packet
+            data = self._read(max(self.data_port.in_waiting, self.sync.bytes_needed))
+            if not data:
+                exit_code = 3 if self.sync.synced else 2
+                return objects, exit_code
+            self.sync.write(data)
+            if self.sync.bytes_discarded - discarded > self.sync.ring.capacity:
+                # -- only garbage for a whole buffer, give the caller a turn
+                return objects, 2
+
+    def _read(self, n):
+        data = self.data_port.read(n)
+        if self.recorder is not None:
+            self.recorder.write(data)
+        return data
+
+    def decode_packet(self, packet, timestamp=None):
+        """Decode one complete TI packet (header and payload) into detections
+
+        By default detections are stamped with the time since the first
+        frame, pass timestamp to use another clock (e.g. a RadarGroup's).
+        The payload is parsed into a reused buffer, the returned detections
+        are new for every frame and belong to the caller (no FramePool).
+
+        Returns the same (objects, exit_code) pair as read_data_port
+        """
+        with self._decode_lock:
+            return self._decode_packet(packet, timestamp)
 
-        # -- we did hit the break --> replace the packet buffer with payload (if data is dumped)
+    def _decode_packet(self, packet, timestamp):
+        header = parse_ti_header(packet, self.header_len)
         if self.frame0 is None:
             self.frame0 = header['frame_number']
-        t = self.config_data['frame_duration_s'] * (header['frame_number'] - self.frame0)
-        self.packet += self.data_port.read(header['total_packet_len'] - self.header_len)
-        if len(self.packet) >= header['total_packet_len']-self.header_len:
-            payload = parse_ti_payload(self.packet, header, self.tlv_header_len)
-            objects = convert_payload_to_objects(payload, self.snr_floor, self.ID, self.noise_xyz, timestamp=t)
-            self.packet = bytearray([])
-            exit_code = 1 if len(objects)==0 else 0
+        if timestamp is None:
+            t = self.t_offset + self.config_data['frame_duration_s'] * (header['frame_number'] - self.frame0)
+        else:
+            t = timestamp
+        self._last_t = t
+        if len(self._objects_buffer) < header['num_detected_objs']:
+            self._objects_buffer = np.zeros((max(header['num_detected_objs'], self.config_data['max_num_objs']), 6))
+        payload = parse_ti_payload(memoryview(packet)[self.header_len:], header, self.tlv_header_len,
+            self.config_data, out=self._objects_buffer)
+        if payload['range_profile'] is not None:
+            self.range_profile = payload['range_profile']
+        if payload['range_doppler_heatmap'] is not None:
+            self.range_doppler_heatmap = payload['range_doppler_heatmap']
+        if self.as_batch:
+            objects = convert_payload_to_batch(payload, self.snr_floor, self.ID, self.noise_xyz, t, self.batch_dtype,
+                self.detection_filter)
         else:
-            exit_code = 3
+            objects = convert_payload_to_objects(payload, self.snr_floor, self.ID, self.noise_xyz, timestamp=t,
+                detection_filter=self.detection_filter)
+        if self.store is not None:
+            self.store.write(objects, frame_number=header['frame_number'], t=t, source_ID=self.ID)
+        exit_code = 1 if len(objects)==0 else 0
         return objects, exit_code
 
 
 class uRadRadarLive(_uRadRadar):
     def __init__(self, config_port_name='/dev/ttyUSB0', data_port_name='/dev/ttyUSB1',
-            config_file='chirp_config.cfg', snr_floor=8, verbose=False):
-        super().__init__(config_file, snr_floor, verbose)
+            config_file='chirp_config.cfg', snr_floor=8, verbose=False, as_batch=False, batch_dtype=np.float64,
+            detection_filter=None, command_timeout=cli.DEFAULT_TIMEOUTS):
+        super().__init__(config_file, snr_floor, verbose, as_batch, batch_dtype, detection_filter)
         self.config_port_name = config_port_name
         self.data_port_name = data_port_name
         self.config_port = None
+        self.command_timeout = command_timeout
+        self.config_report = None
+        self.startup_time = None
         self.started = False
+        self._active_commands = []
+        self._astream = None
+        self._pipeline = None
 
     def __call__(self):
         return self.read_data_port()
 
+    def aiter(self, queue_size=8):
+        """Asynchronous iterator over (objects, exit_code) frames
+
+        The data port is read without blocking whenever the event loop
+        reports it readable, so several radars can share one loop.
+        """
+        if not self.started:
+            raise RuntimeError('Need to call radar.start() or radar.astart() first')
+        from . import aio
+        self._astream = aio.AsyncFrameStream(self.data_port, self.decode_packet,
+            queue_size=queue_size, recorder=self.recorder, verbose=self.verbose)
+        return self._astream
+
+    async def astart(self):
+        """Open the ports and upload the config without blocking the event loop"""
+        from . import aio
+        await aio.run_blocking(self.start)
+
+    async def astop(self):
+        if self._astream is not None:
+            self._astream.close()
+            self._astream = None
+        from . import aio
+        await aio.run_blocking(self.stop)
+
     def start(self):
+        """Open the ports and upload the config file
+
+        Each command is sent as soon as the device acknowledges the previous
+        one, a rejected command raises rad.cli.CommandError (and closes the
+        ports). The upload is in config_report, the whole start in startup_time
+        """
         if self.started:
             print('Radar already started')
             return
+        t0 = perf_counter()
         print('Opening ports...', end='', flush=True)
         baud_config = 115200
         baud_data = 921600
+        import serial
         config_port = serial.Serial(self.config_port_name, baud_config, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE, timeout=0.3)
         data_port = serial.Serial(self.data_port_name, baud_data, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE, timeout=0.3)
         data_port.reset_output_buffer()
         print('done')
 
-        response = bytearray([])
-        while config_port.in_waiting > 0:
-            response += config_port.read(1)
-        if self.verbose:
-            print(response.decode())
-            print('Reading configuration file')
-        with open(self.config_file, 'r') as fp:
-            cnt = 0
-            commands = []
-            for line in fp:
-                if (len(line) > 1):
-                    if (line[0] != '%'):
-                        commands.append(line)
-                        cnt += 1
-        for i in range(cnt):
-            config_port.write(bytearray(commands[i].encode()))
-            sleep(20e-3)
-            response = bytearray([])
-            while config_port.in_waiting > 0:
-                response += config_port.read(1)
-            if self.verbose:
-                print(response.decode())
+        commands = cli.read_config_commands(self.config_file)
+        try:
+            self.config_report = cli.send_config(config_port, commands,
+                timeout=self.command_timeout, verbose=self.verbose, name='radar {}: '.format(self.ID))
+        except BaseException:
+            config_port.close()
+            data_port.close()
+            raise
+        self.startup_time = perf_counter() - t0
+        print('Radar {} configured in {:.2f} s ({} commands)'.format(self.ID, self.startup_time,
+            self.config_report['commands']))
         self.config_port = config_port
         self.data_port = data_port
+        self._active_commands = commands
         self.started = True
 
-    def stop(self, sleep_time=3):
+    def reconfigure(self, config_file):
+        """Switch the running sensor to another config file without closing the ports
+
+        Sends sensorStop, only the lines that differ from the active config
+        (see rad.cli.config_changes) and sensorStart. While the sensor is
+        stopped the bytes still buffered from the old config are dropped and
+        the parsed config is swapped in under the decode lock, so every frame
+        is decoded entirely with the config it was made with.
+
+        Returns:
+            dict: upload report (see rad.cli.reconfigure), also in config_report
+        """
+        if not self.started:
+            raise RuntimeError('Need to call radar.start() first')
+        config_file = _find_config_file(config_file)
+        # -- parse first: a broken file must not leave the sensor stopped
+        config_data = parse_ti_config(config_file)
+        commands = cli.read_config_commands(config_file)
+
+        def on_stopped():
+            self._discard_buffered(lambda: self._switch_config(config_file, config_data))
+
+        self.config_report = cli.reconfigure(self.config_port, self._active_commands, commands, on_stopped,
+            timeout=self.command_timeout, verbose=self.verbose, name='radar {}: '.format(self.ID))
+        self._active_commands = commands
+        if self.verbose:
+            print('Radar {} reconfigured in {:.2f} s ({} changed commands)'.format(self.ID,
+                self.config_report['seconds'], len(self.config_report['changed'])))
+        return self.config_report
+
+    def restart(self):
+        """Stop and start the sensor over the open ports, keeping its config"""
+        return self.reconfigure(self.config_file)
+
+    def _discard_buffered(self, switch=None):
+        """Drop the bytes not decoded yet and run switch before any decoder takes another packet"""
+        self.data_port.reset_input_buffer()
+
+        def reset():
+            with self._decode_lock:
+                self.sync.reset()
+                if switch is not None:
+                    switch()
+
+        step = reset
+        if self._pipeline is not None:
+            step = functools.partial(self._pipeline.discard_buffered, then=step)
+        if self._astream is not None:
+            step = functools.partial(self._astream.discard_buffered, then=step)
+        step()
+
+    def pipeline(self, queue_size=8, overflow='block'):
+        """Start a pipelined acquisition with a dedicated serial reader thread
+
+        Returns a started RadarPipeline yielding (objects, exit_code) frames.
+        Stopping the pipeline sends sensorStop and closes the ports.
+        """
+        if not self.started:
+            self.start()
+
+        def on_stop():
+            self.config_port.write('sensorStop\n'.encode())
+            self.stop()
+
+        pipeline = RadarPipeline(serial_chunk_reader(self.data_port, recorder=self.recorder), self.decode_packet,
+            on_stop=on_stop, queue_size=queue_size, overflow=overflow, verbose=self.verbose)
+        self._pipeline = pipeline
+        return pipeline.start()
+
+    def start_recording(self, prefix, rotate_bytes=None, rotate_seconds=None):
+        """Tee the raw data port stream to disk on a background thread
+
+        The files can be replayed with uRadRadarPlayback. Returns the running
+        StreamRecorder (file names, bytes written and dropped)
+        """
+        self.stop_recording()
+        self.recorder = StreamRecorder(prefix, rotate_bytes=rotate_bytes,
+            rotate_seconds=rotate_seconds, verbose=self.verbose).start()
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+
+    def stop(self, sleep_time=0.0):
+        self._pipeline = None
+        self.stop_recording()
+        self.stop_store()
         print('Closing ports...', end='', flush=True)
         if self.config_port is not None:
             self.config_port.close()
@@ -158,16 +365,27 @@ class uRadRadarPlayback(_uRadRadar):
     """Object to manage replay of captured radar data
     
     Inherits from the base ti radar class
-    """
-    def __init__(self, data_file, config_file,  snr_floor=8, verbose=False):
-        super().__init__(config_file, snr_floor, verbose)
 
-        # -- for now, we open the file at class creation. In the future this should
-        # be made something like a generator
-        if not os.path.exists(data_file):
-            raise FileNotFoundError('Cannot find playback file {}'.format(data_file))
-        self.filename = data_file
-        self.data_port = open(data_file, 'rb')
+    With realtime=True, frames are delivered at the recorded frame rate
+    times `speed`, and `catchup` ("drop" or "slip") decides what to do when
+    the consumer falls behind (see rad.playback.Pacer)
+    """
+    def __init__(self, data_file, config_file,  snr_floor=8, verbose=False,
+            realtime=False, speed=1.0, catchup='drop', as_batch=False, batch_dtype=np.float64,
+            detection_filter=None):
+        super().__init__(config_file, snr_floor, verbose, as_batch, batch_dtype, detection_filter)
+        self.pacer = Pacer(self.config_data['frame_duration_s'], speed, catchup) if realtime else None
+
+        # -- the file is memory mapped and each packet is decoded straight from
+        # a view into the mapping. Pass a MappedRecording to share one mapping
+        # between several playback objects
+        if isinstance(data_file, MappedRecording):
+            self.recording = data_file
+        else:
+            self.recording = MappedRecording(data_file)
+        self.filename = self.recording.filename
+        self.reader = self.recording.reader()
+        self._index = None
 
     def __call__(self):
         frame, exit_code = self.read_data_port()
@@ -175,11 +393,54 @@ class uRadRadarPlayback(_uRadRadar):
             raise StopIteration
         return frame, exit_code
 
-    def __iter__(self):
-        """Set up an iterator for playback simulation
+    @property
+    def index(self):
+        """Frame index of the recording (see rad.index), loaded from or written
+        to the sidecar file on first use"""
+        if self._index is None:
+            self._index = load_index(self.filename, self.config_data['frame_duration_s'],
+                self.header_len, data=self.recording.data, verbose=self.verbose)
+            if (self.frame0 is None) and (len(self._index) > 0):
+                self.frame0 = int(self._index['frame_number'][0])
+        return self._index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, key):
+        """Decode frame(s) by position in the recording
 
-        TODO: does this way to create generator work??
+        An integer gives one (objects, exit_code) pair, a slice gives a list
         """
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        entry = self.index[key]
+        offset = int(entry['offset'])
+        return self.decode_packet(self.recording.data[offset:offset+int(entry['total_packet_len'])])
+
+    def seek(self, frame):
+        """Continue playback from the frame at this position in the recording"""
+        if frame < 0:
+            frame += len(self)
+        if frame >= len(self):
+            self.reader.seek(len(self.recording))
+        else:
+            self.reader.seek(int(self.index['offset'][frame]))
+        if self.pacer is not None:
+            self.pacer.reset()
+
+    def seek_time(self, t):
+        """Continue playback from the first frame at or after time t (seconds)
+
+        Returns:
+            int: position of that frame in the recording
+        """
+        frame = int(np.searchsorted(self.index['timestamp'], t, side='left'))
+        self.seek(frame)
+        return frame
+
+    def __iter__(self):
+        """Set up an iterator for playback simulation"""
         while True:
             frame, exit_code = self.read_data_port()
             if exit_code == 3:
@@ -187,15 +448,44 @@ class uRadRadarPlayback(_uRadRadar):
             else:
                 yield frame, exit_code
 
+    def read_data_port(self):
+        """Decode the next packet of the recording
+
+        Same exit codes as the live radar, with 3 meaning the end of the file.
+        In real-time mode this blocks until the frame is due and skips the
+        frames the pacer drops without decoding them
+        """
+        while True:
+            packet = self.reader.next_packet()
+            if packet is None:
+                return [], 3
+            if (self.pacer is None) or self.pacer.wait(read_frame_number(packet)):
+                return self.decode_packet(packet)
+
+    def aiter(self):
+        """Asynchronous iterator over (objects, exit_code) frames of the file
+
+        In real-time mode the wait for each frame is awaited, not slept
+        """
+        from . import aio
+        return aio.aiter_packets(self.reader.next_packet, self.decode_packet, self.pacer)
+
     def start(self):
         pass
 
     def stop(self):
-        pass
+        self.stop_store()
+
+    async def astart(self):
+        self.start()
+
+    async def astop(self):
+        self.stop()
 
 
 def parse_ti_config(config_file_name, numRxAnt=4, numTxAnt=2):
     config = {} 
+    frame_duration_msec = None
     # Read the configuration file and send it to the board
     config_lines = []
     with open(config_file_name, 'r') as f:
@@ -238,10 +528,15 @@ def parse_ti_config(config_file_name, numRxAnt=4, numTxAnt=2):
 
     # Combine the read data to obtain the configuration parameters           
     numChirpsPerFrame = (chirpEndIdx - chirpStartIdx + 1) * numLoops
+    if frame_duration_msec is None:
+        # -- no visualizer comment header, use the frame periodicity
+        frame_duration_msec = float(framePeriodicity)
+        frame_duration_s = frame_duration_msec/1000
     config["frame_duration_msec"] = frame_duration_msec
     config["frame_duration_s"] = frame_duration_s
     config["num_doppler_bins"] = numChirpsPerFrame / numTxAnt
     config["num_range_bins"] = numAdcSamplesRoundTo2
+    config["max_num_objs"] = int(config["num_range_bins"] * config["num_doppler_bins"])  # one per range-doppler cell
     config["range_resolution_meters"] = (3e8 * digOutSampleRate * 1e3) / (2 * freqSlopeConst * 1e12 * numAdcSamples)
     config["range_idx_to_meters"] = (3e8 * digOutSampleRate * 1e3) / (2 * freqSlopeConst * 1e12 * config["num_range_bins"])
     config["dopper_resolution_mps"] = 3e8 / (2 * startFreq * 1e9 * (idleTime + rampEndTime) * 1e-6 * config["num_doppler_bins"] * numTxAnt)
@@ -262,49 +557,105 @@ def parse_ti_header(packet, header_len):
     return header
 
 
-def parse_ti_payload(packet, header, tlv_header_len):
-    """Transform TI payload into objects"""
-    objects = np.zeros((header['num_detected_objs'], 6))
+POINT_CLOUD_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('v', '<f4')])
+SIDE_INFO_DTYPE = np.dtype([('snr', '<u2'), ('noise', '<u2')])
+
+
+def parse_ti_payload(packet, header, tlv_header_len, config=None, out=None):
+    """Transform TI payload into objects
+
+    The TLVs are walked once over a memoryview, point cloud and side info
+    are read with structured dtypes. With the parsed config, the range
+    profile and range-Doppler heatmap are also returned, as views over the
+    packet (they are not copied). With out (an N x 6 array, N >=
+    num_detected_objs) the objects are a view into it.
+
+    A TLV whose length runs past the packet ends the walk, the TLVs before
+    it are kept and the payload is flagged as truncated.
+
+    Returns:
+        dict: objects (N x 6: x, y, z, v, snr, noise), range_profile,
+            range_doppler_heatmap, tlvs (type, offset, length) with offsets
+            relative to the payload, truncated
+    """
+    packet = memoryview(packet).cast('B')
+    n_objects = header['num_detected_objs']
+    if out is None:
+        objects = np.zeros((n_objects, 6))
+    else:
+        objects = out[:n_objects]
+        objects[:] = 0
+    range_profile = None
+    range_doppler_heatmap = None
+    tlvs = []
+    truncated = False
+    offset = 0
     for i in range(header['num_tlvs']):
-        tlv_type, tlv_length = struct.unpack('2I', packet[:tlv_header_len])
-        if tlv_type > 20 or tlv_length > 10000:
-            packet = bytearray([])
+        if offset + tlv_header_len > len(packet):
+            truncated = True
             break
-        packet = packet[tlv_header_len:]
-
-        if tlv_type == 1:
-            for j in range(header['num_detected_objs']):
-                x, y, z, v = struct.unpack('4f', packet[:16])
-                objects[j, 0] = x
-                objects[j, 1] = y
-                objects[j, 2] = z
-                objects[j, 3] = v
-                packet = packet[16:]
-        elif tlv_type == 2:
-            pass  # unknown
-        elif tlv_type == 6:
+        tlv_type, tlv_length = struct.unpack_from('2I', packet, offset)
+        body = offset + tlv_header_len
+        if tlv_length > len(packet) - body:
+            truncated = True
+            break
+        tlvs.append((tlv_type, body, tlv_length))
+        offset = body + tlv_length
+
+        if tlv_type == tlv.TLV_DETECTED_POINTS:
+            n = min(n_objects, tlv_length // POINT_CLOUD_DTYPE.itemsize)
+            points = np.frombuffer(packet, POINT_CLOUD_DTYPE, count=n, offset=body)
+            for j, name in enumerate(POINT_CLOUD_DTYPE.names):
+                objects[:n, j] = points[name]
+        elif tlv_type == tlv.TLV_RANGE_PROFILE:
+            if config is not None:
+                range_profile = tlv.range_profile(packet, body, tlv_length, config['num_range_bins'])
+        elif tlv_type == tlv.TLV_RANGE_DOPPLER_HEATMAP:
+            if config is not None:
+                range_doppler_heatmap = tlv.range_doppler_heatmap(packet, body, tlv_length,
+                    config['num_range_bins'], config['num_doppler_bins'])
+        elif tlv_type == tlv.TLV_STATS:
             pass  # processing time info
-        elif tlv_type == 7:
-            for j in range(header['num_detected_objs']):
-                snr, noise = struct.unpack('2H', packet[:4])
-                objects[j, 4] = snr
-                objects[j, 5] = noise
-                packet = packet[4:]
-        elif tlv_type == 9:
+        elif tlv_type == tlv.TLV_SIDE_INFO:
+            n = min(n_objects, tlv_length // SIDE_INFO_DTYPE.itemsize)
+            side_info = np.frombuffer(packet, SIDE_INFO_DTYPE, count=n, offset=body)
+            objects[:n, 4] = side_info['snr']
+            objects[:n, 5] = side_info['noise']
+        elif tlv_type == tlv.TLV_TEMPERATURE:
             pass  # temperature data
         else:
             print('TLV not recognized: {}'.format(tlv_type))
-    payload = {'objects':objects}
+    payload = {'objects':objects, 'range_profile':range_profile,
+        'range_doppler_heatmap':range_doppler_heatmap, 'tlvs':tlvs, 'truncated':truncated}
     return payload
 
 
-def convert_payload_to_objects(payload, snr_floor, sensor_ID, noise_xyz, timestamp):
-    """Transform payload into objects"""
-    converted_objects = []
+def _filter_payload(payload, snr_floor, detection_filter):
+    """Sensor-frame (x forward, y left, z up) points that pass the gates, in the vehicle frame"""
     objects = payload['objects']
-    for i in range(objects.shape[0]):
-        if objects[i,4] > snr_floor:
-            converted_objects.append(detections.RadarDetection3D_XYZ(
-                sensor_ID, timestamp, objects[i,1], -objects[i,0],
-                objects[i,2], objects[i,3], noise_xyz, objects[i,4]))
-    return converted_objects
\ No newline at end of file
+    keep = objects[:, 4] > snr_floor
+    xyz = np.column_stack((objects[:, 1], -objects[:, 0], objects[:, 2]))
+    if detection_filter is not None:
+        keep &= detection_filter.mask(xyz, objects[:, 3], objects[:, 4])
+    xyz, objects = xyz[keep], objects[keep]
+    if detection_filter is not None:
+        xyz = detection_filter.transform(xyz)
+    return xyz, objects
+
+
+def convert_payload_to_objects(payload, snr_floor, sensor_ID, noise_xyz, timestamp, detection_filter=None):
+    """Transform payload into objects
+
+    The SNR floor and the optional DetectionFilter are applied to the whole
+    frame first, objects are only made for the points that pass
+    """
+    xyz, objects = _filter_payload(payload, snr_floor, detection_filter)
+    return [detections.RadarDetection3D_XYZ(sensor_ID, timestamp, x, y, z, rrt, noise_xyz, snr)
+        for (x, y, z), rrt, snr in zip(xyz.tolist(), objects[:, 3].tolist(), objects[:, 4].tolist())]
+
+
+def convert_payload_to_batch(payload, snr_floor, sensor_ID, noise_xyz, timestamp, dtype=np.float64,
+        detection_filter=None):
+    """Transform payload into a DetectionBatch (same detections and frame as convert_payload_to_objects)"""
+    xyz, objects = _filter_payload(payload, snr_floor, detection_filter)
+    return detections.DetectionBatch(sensor_ID, timestamp, xyz, objects[:, 3], objects[:, 4], noise_xyz, dtype)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+from rad.adc import RangeDopplerEngine, adc_cube, frame_size, parse_adc_config
+
+
+def _synthetic_raw(config, n_frames, range_bin, doppler_bin, layout='dca1000'):
+    """int16 capture with one target at (range_bin, doppler_bin) in every frame"""
+    samples = np.arange(config['num_adc_samples'])
+    loops = np.arange(config['num_loops'])
+    tone = np.exp(2j * np.pi * (range_bin * samples[None, :] / config['num_range_bins']
+        + doppler_bin * loops[:, None] / config['num_loops']))
+    chirps = np.repeat(tone, config['num_tx'], axis=0)  # -- loop-major, one chirp per tx
+    cube = np.broadcast_to(chirps[None, :, None, :],
+        (n_frames, config['num_chirps'], config['num_rx'], config['num_adc_samples']))
+    real = np.round(1000 * cube.real).astype('<i2')
+    imag = np.round(1000 * cube.imag).astype('<i2')
+    if layout == 'iq':
+        raw = np.stack([real, imag], axis=-1)
+    else:
+        shape = real.shape[:-1] + (-1, 2)
+        raw = np.concatenate([real.reshape(shape), imag.reshape(shape)], axis=-1)
+    return raw.reshape(-1), cube
+
+
+def test_parse_adc_config():
+    config = parse_adc_config('chirp_config.cfg')
+    assert (config['num_tx'], config['num_rx'], config['num_loops']) == (3, 4, 128)
+    assert config['num_chirps'] == 384
+    assert config['num_adc_samples'] == config['num_range_bins'] == 128
+    assert config['complex']
+    config = parse_adc_config('1443config.cfg')
+    assert (config['num_tx'], config['num_loops'], config['num_adc_samples']) == (2, 16, 240)
+    assert config['num_range_bins'] == 256
+    assert frame_size(config) == 32 * 4 * 240 * 2
+
+
+def test_adc_cube_layouts():
+    config = parse_adc_config('chirp_config.cfg')
+    for layout in ('dca1000', 'iq'):
+        raw, cube = _synthetic_raw(config, 2, 10, 3, layout)
+        # -- a trailing partial frame is dropped
+        out = adc_cube(np.concatenate([raw, raw[:100]]), config, layout)
+        assert out.shape == (2, 384, 4, 128)
+        assert np.allclose(out, np.round(1000 * cube.real) + 1j * np.round(1000 * cube.imag))
+        assert np.array_equal(adc_cube(raw.tobytes(), config, layout), out)
+
+
+def test_range_doppler_peak():
+    config = parse_adc_config('chirp_config.cfg')
+    raw, _ = _synthetic_raw(config, 3, 20, 5)
+    engine = RangeDopplerEngine(config)
+    power = engine.power(engine.process(adc_cube(raw, config)))
+    assert power.shape == (3, 128, 128)
+    assert power.dtype == np.float32
+    for frame in power:
+        doppler, rng = np.unravel_index(np.argmax(frame), frame.shape)
+        assert rng == 20
+        assert doppler == 5 + 64
+        assert np.isclose(engine.velocity_axis[doppler], 5 * config['doppler_resolution_mps'])
+        assert np.isclose(engine.range_axis[rng], 20 * config['range_resolution_m'])
+
+    # -- the (-1)^n modulation is the same as fftshift
+    unshifted = RangeDopplerEngine(config, shift=False)
+    reference = np.fft.fftshift(unshifted.power(unshifted.process(adc_cube(raw, config))), axes=1)
+    assert np.allclose(power, reference, rtol=1e-4, atol=1e-3 * reference.max())
+
+
+def test_batches_and_precision():
+    config = parse_adc_config('1443config.cfg')
+    raw, _ = _synthetic_raw(config, 5, 40, -3)
+    rng = np.random.default_rng(0)
+    raw = raw + rng.integers(-50, 50, size=raw.shape).astype('<i2')
+    reference = RangeDopplerEngine(config, dtype=np.float64)
+    expected = reference.power(reference.process(adc_cube(raw, config, dtype=np.complex128))).copy()
+    engine = RangeDopplerEngine(config)
+    batched = np.concatenate([maps.copy() for maps in engine.heatmaps(raw, batch_frames=2)])
+    assert batched.shape == (5, 16, 256)
+    single = np.concatenate([maps.copy() for maps in engine.heatmaps(raw, batch_frames=1)])
+    assert np.allclose(batched, single, rtol=1e-5)
+    assert np.allclose(batched, expected, rtol=1e-3, atol=1e-5 * expected.max())
+    assert np.argmax(batched[0].max(axis=1)) == 8 - 3
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import asyncio
+import os
+import time
+import numpy as np
+import rad
+from rad.aio import AsyncFrameStream
+from rad.sync import read_frame_number
+
+
+class _PipePort():
+    """Stands in for a serial.Serial data port"""
+    def __init__(self):
+        self.r, self.w = os.pipe()
+        os.set_blocking(self.r, False)
+        self.timeout = 0.3
+        self.is_open = True
+        self.in_waiting = 0
+
+    def fileno(self):
+        return self.r
+
+    def reset_input_buffer(self):
+        while self.read(4096):
+            pass
+
+    def read(self, n):
+        assert self.timeout == 0
+        try:
+            return os.read(self.r, n)
+        except BlockingIOError:
+            return b''
+
+
+def test_async_stream_from_port(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    processor = rad.Processor(config.config_params)
+    def decode(packet):
+        processor.decodePacket(packet)
+        return processor.xyz_vel_coordinates
+    data = open(sample_data_file, 'rb').read()
+    port = _PipePort()
+
+    async def produce():
+        for i in range(0, len(data), 512):
+            os.write(port.w, data[i:i+512])
+            await asyncio.sleep(0)
+        os.close(port.w)
+
+    async def consume():
+        producer = asyncio.ensure_future(produce())
+        async with AsyncFrameStream(port, decode, queue_size=64) as frames:
+            out = [frame async for frame in frames]
+        await producer
+        return out
+
+    frames = asyncio.run(consume())
+    assert len(frames) == 44
+    assert port.timeout == 0.3
+    os.close(port.r)
+
+
+def test_radar_file_aiter(sample_data_file):
+    radar = rad.Radar('1443config.cfg', enable_plotting=False, data_file=sample_data_file)
+
+    async def consume():
+        return [xyz_vel async for xyz_vel in radar.aiter()]
+
+    frames = asyncio.run(consume())
+    assert len(frames) == 44
+    assert all(isinstance(f, np.ndarray) and f.shape[1] == 4 for f in frames)
+
+
+def _max_stall(frames_aiter, n_frames):
+    """Take n_frames next to a 5 ms ticker, returns (frames, longest gap between ticks)"""
+    async def run():
+        gaps = []
+        done = asyncio.Event()
+
+        async def tick():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.ensure_future(tick())
+        frames = []
+        async for frame in frames_aiter():
+            frames.append(frame)
+            if len(frames) == n_frames:
+                break
+        done.set()
+        await ticker
+        return frames, max(gaps)
+    return asyncio.run(run())
+
+
+def test_paced_aiter_keeps_loop_responsive(urad_data_file, sample_data_file):
+    # -- 50 ms between frames, a blocking sleep would stall the 5 ms ticker that long
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', realtime=True, catchup='slip')
+    t0 = time.perf_counter()
+    frames, stall = _max_stall(radar.aiter, 10)
+    assert len(frames) == 10
+    assert time.perf_counter() - t0 >= 9 * 0.05 * 0.9
+    assert stall < 0.04
+
+    radar = rad.Radar('1443config.cfg', enable_plotting=False, data_file=sample_data_file, realtime=True,
+        speed=2.0, catchup='slip')
+    assert radar.pacer.frame_duration_s / 2 == 0.05
+    t0 = time.perf_counter()
+    frames, stall = _max_stall(radar.aiter, 10)
+    assert len(frames) == 10
+    assert time.perf_counter() - t0 >= 9 * 0.05 * 0.9
+    assert stall < 0.04
+
+
+def test_stream_discard_switches_in_the_loop(urad_packet):
+    config = {'generation': 0}
+    port = _PipePort()
+    old = b''.join(urad_packet(k, np.ones((1, 4))) for k in range(40))
+    new = b''.join(urad_packet(100 + k, np.ones((1, 4))) for k in range(5))
+
+    def decode(packet):
+        return read_frame_number(packet), config['generation']
+
+    def switch():
+        config['generation'] = 1
+
+    async def consume():
+        loop = asyncio.get_running_loop()
+        stream = AsyncFrameStream(port, decode, queue_size=100, read_size=256)
+        frames = []
+        os.write(port.w, old)
+        async with stream as received:
+            async for frame in received:
+                frames.append(frame)
+                if len(frames) == 1:
+                    # -- from another thread, as reconfigure() would while the sensor is stopped
+                    def stopped():
+                        port.reset_input_buffer()
+                        stream.discard_buffered(then=switch)
+                    await loop.run_in_executor(None, stopped)
+                    os.write(port.w, new)
+                    os.close(port.w)
+        return frames
+
+    frames = asyncio.run(consume())
+    os.close(port.r)
+    assert all(generation == (frame_number >= 100) for frame_number, generation in frames)
+    assert [f for f, _ in frames if f >= 100] == list(range(100, 105))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import os
+import shutil
+import numpy as np
+import pytest
+import rad
+from rad.batch import BatchDecoder, load_decoded, main
+
+
+@pytest.fixture
+def recording_dir(tmp_path, urad_data_file, urad_packet):
+    directory = tmp_path / 'captures'
+    (directory / 'day2').mkdir(parents=True)
+    shutil.copy(urad_data_file, directory / 'a.dat')
+    rng = np.random.default_rng(2)
+    with open(directory / 'day2' / 'b.dat', 'wb') as f:
+        for frame in range(7):
+            points = rng.normal(size=(frame, 4))
+            f.write(urad_packet(500 + frame, points, snr=rng.integers(0, 400, frame)))
+    return str(directory)
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_batch_matches_playback(recording_dir, processes):
+    decoder = BatchDecoder('chirp_config.cfg', processes=processes, chunk_frames=3)
+    reports = decoder.decode_directory(recording_dir)
+    assert [os.path.relpath(r['file'], recording_dir) for r in reports] == ['a.dat', os.path.join('day2', 'b.dat')]
+    for report in reports:
+        frames, points = load_decoded(report['output'])
+        playback = list(rad.uRadRadarPlayback(report['file'], 'chirp_config.cfg', as_batch=True))
+        assert len(frames) == len(playback) == report['frames']
+        for frame, (batch, _) in zip(frames, playback):
+            assert frame['num_points'] == len(batch)
+            decoded = points[frame['first']:frame['first'] + frame['num_points']]
+            assert np.array_equal(decoded, batch.data)
+            assert np.all(batch.t == frame['timestamp'])
+    assert decoder.frames_done == 27
+
+
+def test_batch_cli(recording_dir, tmp_path):
+    output = str(tmp_path / 'decoded')
+    assert main(['decode', recording_dir, '--processes', '0', '--output', output, '--float32']) == 0
+    frames, points = load_decoded(os.path.join(output, 'day2', 'b.dat.decoded.npz'))
+    assert len(frames) == 7 and points.dtype == np.float32
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import pytest
+from rad.adc import RangeDopplerEngine, parse_adc_config
+from rad.cfar import CFAR, CFAR2D, METHODS, PeakGrouping, detect, from_config
+
+
+def _reference_1d(power, cfar):
+    """Noise of every cell of the last axis from its own list of training cells"""
+    n = power.shape[-1]
+    width = cfar.guard + cfar.train
+    out = np.empty(power.shape)
+    for i in range(n):
+        lag = [j % n for j in range(i - width, i - cfar.guard) if cfar.wrap or 0 <= j < n]
+        lead = [j % n for j in range(i + cfar.guard + 1, i + width + 1) if cfar.wrap or 0 <= j < n]
+        cells = power[..., lag + lead]
+        if cfar.method == 'ca':
+            out[..., i] = cells.mean(axis=-1)
+        elif cfar.method == 'os':
+            out[..., i] = np.sort(cells, axis=-1)[..., int(cfar.rank * (len(lag + lead) - 1))]
+        else:
+            lag_mean = power[..., lag].mean(axis=-1) if lag else power[..., lead].mean(axis=-1)
+            lead_mean = power[..., lead].mean(axis=-1) if lead else lag_mean
+            out[..., i] = (np.maximum if cfar.method == 'go' else np.minimum)(lag_mean, lead_mean)
+    return out
+
+
+def _reference_2d(power, cfar):
+    (gd, gr), (td, tr) = cfar.guard, cfar.train
+    wd, wr = gd + td, gr + tr
+    n_doppler, n_range = power.shape[-2:]
+    out = np.empty(power.shape)
+    for i in range(n_doppler):
+        for j in range(n_range):
+            cells = [(a % n_doppler, b) for a in range(i - wd, i + wd + 1) for b in range(j - wr, j + wr + 1)
+                if (0 <= b < n_range) and not (abs(a - i) <= gd and abs(b - j) <= gr)]
+            values = lambda cells: power[..., [a for a, _ in cells], [b for _, b in cells]]
+            if cfar.method == 'ca':
+                out[..., i, j] = values(cells).mean(axis=-1)
+            elif cfar.method == 'os':
+                out[..., i, j] = np.sort(values(cells), axis=-1)[..., int(cfar.rank * (len(cells) - 1))]
+            else:
+                lag = values([c for c in cells if c[1] <= j]).mean(axis=-1)
+                lead = values([c for c in cells if c[1] >= j]).mean(axis=-1)
+                out[..., i, j] = (np.maximum if cfar.method == 'go' else np.minimum)(lag, lead)
+    return out
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_cfar_matches_reference(method):
+    power = np.random.default_rng(0).exponential(1.0, (3, 12, 40))
+    for wrap in (False, True):
+        cfar = CFAR(method, guard=2, train=4, wrap=wrap)
+        assert np.allclose(cfar.noise(power), _reference_1d(power, cfar))
+    # -- along the Doppler axis
+    cfar = CFAR(method, guard=1, train=3, wrap=True, axis=-2)
+    expected = np.swapaxes(_reference_1d(np.swapaxes(power, -1, -2), cfar), -1, -2)
+    assert np.allclose(cfar.noise(power), expected)
+    cfar = CFAR2D(method, guard=(1, 1), train=(2, 3))
+    assert np.allclose(cfar.noise(power[:2]), _reference_2d(power[:2], cfar))
+
+
+def test_detect_and_grouping():
+    power = np.random.default_rng(1).exponential(1.0, (2, 32, 64)).astype(np.float32)
+    # -- a target spread over neighboring cells, and one at the Doppler edge
+    power[0, 10, 20], power[0, 10, 21], power[0, 11, 20] = 400, 200, 150
+    power[1, 0, 50], power[1, 31, 50] = 300, 250
+    cfar = CFAR2D('ca', threshold_db=15)
+    mask, _ = cfar.mask(power)
+    assert mask[0, 10, 20] and mask[0, 10, 21] and mask[0, 11, 20]
+    found = detect(power, cfar, PeakGrouping(), range_axis=np.arange(64) * 0.1)
+    assert list(zip(found['frame'], found['doppler_index'], found['range_index'])) == [(0, 10, 20), (1, 0, 50)]
+    assert found['power'].tolist() == [400, 300]
+    assert np.all(found['snr_db'] > 15)
+    assert np.allclose(found['range_m'], [2.0, 5.0])
+    assert set(found) == {'frame', 'doppler_index', 'range_index', 'power', 'noise', 'snr_db', 'range_m'}
+
+    # -- range grouping only keeps the Doppler neighbors
+    found = detect(power, cfar, PeakGrouping(doppler_direction=False))
+    assert (0, 11, 20) in zip(found['frame'], found['doppler_index'], found['range_index'])
+    # -- a plateau gives one peak
+    flat = np.ones((8, 16))
+    flat[3, 5] = flat[3, 6] = 100
+    found = detect(flat, CFAR2D(guard=(0, 0)), PeakGrouping('cfar'))
+    assert list(zip(found['doppler_index'], found['range_index'])) == [(3, 5)]
+    found = detect(flat, CFAR2D(guard=(0, 0)), PeakGrouping(max_range_index=4))
+    assert len(found['frame']) == 0
+
+
+def test_grouping_range_profiles():
+    profiles = np.random.default_rng(3).exponential(1.0, (2, 64))
+    profiles[0, 20], profiles[0, 21], profiles[1, 40] = 300, 100, 200
+    power = profiles[:, None, :]
+    cfar = CFAR(threshold_db=13)
+    found = detect(power, cfar, PeakGrouping())
+    assert list(zip(found['frame'], found['range_index'])) == [(0, 20), (1, 40)]
+    assert set(found['doppler_index']) == {0}
+    # -- two Doppler bins: both cyclic steps reach the same neighbor, ties go to the earlier cell
+    flat = np.ones((2, 16))
+    flat[:, 5] = 100
+    found = detect(flat, CFAR(threshold_db=10), PeakGrouping())
+    assert list(zip(found['doppler_index'], found['range_index'])) == [(0, 5)]
+
+
+def test_from_config():
+    cfars, grouping = from_config('chirp_config.cfg')
+    assert [(c.method, c.axis, c.wrap, c.guard, c.train, c.threshold_db) for c in cfars] == [
+        ('so', -1, False, 4, 8, 15.0), ('ca', -2, True, 4, 8, 15.0)]
+    assert grouping is None
+    cfars, grouping = from_config('1443config_higher_cfar.cfg')
+    assert [c.method for c in cfars] == ['so']
+    assert (grouping.scheme, grouping.min_range_index, grouping.max_range_index) == ('matrix', 1, 229)
+
+
+def test_range_doppler_detection():
+    config = parse_adc_config('chirp_config.cfg')
+    samples, loops = np.arange(config['num_adc_samples']), np.arange(config['num_loops'])
+    tone = np.exp(2j * np.pi * (30 * samples[None, :] / 128 + 7 * loops[:, None] / 128))
+    cube = np.broadcast_to(np.repeat(tone, 3, axis=0)[None, :, None, :], (2, 384, 4, 128))
+    cube = cube + 0.05 * np.random.default_rng(2).standard_normal(cube.shape)
+    engine = RangeDopplerEngine(config)
+    power = engine.power(engine.process(cube.astype(np.complex64)))
+    found = detect(power, CFAR2D('os', threshold_db=20), PeakGrouping(), engine.range_axis, engine.velocity_axis)
+    assert found['frame'].tolist() == [0, 1]
+    assert set(found['range_index']) == {30}
+    assert set(found['doppler_index']) == {7 + 64}
+    assert np.allclose(found['velocity_mps'], 7 * config['doppler_resolution_mps'])
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import threading
+import time
+import pytest
+import rad
+from rad import cli
+
+
+class _FakeCLIPort():
+    """TI demo CLI: echo, 'Done' (or an error) and the prompt after `delay` seconds"""
+
+    def __init__(self, *args, delay=0.005, reject=(), silent=(), **kwargs):
+        self.delay = delay
+        self.reject = reject
+        self.silent = silent
+        self.timeout = 0.3
+        self.is_open = True
+        self.sent = []
+        self._pending = []  # (ready time, bytes)
+        self._lock = threading.Lock()
+        self._pending.append((0.0, b'\r\nmmwDemo:/>'))  # -- banner of a fresh boot
+
+    @property
+    def in_waiting(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(len(data) for t, data in self._pending if t <= now)
+
+    def write(self, data):
+        command = data.decode().strip()
+        self.sent.append(command)
+        if command.split()[0] in self.silent:
+            return
+        answer = 'Error -1' if command.split()[0] in self.reject else 'Done'
+        with self._lock:
+            self._pending.append((time.monotonic() + self.delay,
+                '{}\r\n{}\r\n'.format(command, answer).encode()))
+            self._pending.append((time.monotonic() + 1.5 * self.delay, b'mmwDemo:/>'))
+
+    def read(self, n):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                out = bytearray()
+                while self._pending and (self._pending[0][0] <= now) and (len(out) < n):
+                    out += self._pending.pop(0)[1]
+            if out or now >= deadline:
+                return bytes(out)
+            time.sleep(1e-4)
+
+    def reset_output_buffer(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self._lock:
+            self._pending = []
+
+    def close(self):
+        self.is_open = False
+
+
+def test_send_config_acknowledged():
+    port = _FakeCLIPort()
+    commands = cli.read_commands(['% comment', '', 'sensorStop', 'flushCfg', 'sensorStart'])
+    report = cli.send_config(port, commands, skip=('sensorStart',))
+    assert port.sent == ['sensorStop', 'flushCfg']
+    assert report['commands'] == 2 and report['seconds'] < 0.5
+    assert port.timeout == 0.3
+
+
+def test_send_config_errors():
+    port = _FakeCLIPort(reject=('channelCfg',))
+    with pytest.raises(cli.CommandError, match="rejected 'channelCfg 15 5 0'") as error:
+        cli.send_config(port, ['flushCfg', 'channelCfg 15 5 0', 'adcCfg 2 1'])
+    assert 'Error -1' in error.value.response
+    assert port.sent == ['flushCfg', 'channelCfg 15 5 0']
+    port = _FakeCLIPort(silent=('sensorStart',))
+    with pytest.raises(cli.CommandError, match="No acknowledgement for 'sensorStart'") as error:
+        cli.send_config(port, ['flushCfg', 'sensorStart'], timeout={None: 1.0, 'sensorStart': 0.05})
+    assert error.value.timed_out
+
+
+def test_config_closes_ports_on_error(monkeypatch):
+    import serial
+    ports = []
+    def open_port(*args, **kwargs):
+        ports.append(_FakeCLIPort(reject=('profileCfg',)))
+        return ports[-1]
+    monkeypatch.setattr(serial, 'Serial', open_port)
+    with pytest.raises(cli.CommandError, match="rejected 'profileCfg"):
+        rad.Config('1443config.cfg', enable_serial=True)
+    assert len(ports) == 2
+    assert not any(port.is_open for port in ports)
+
+
+def test_start_concurrently(monkeypatch):
+    import serial
+    monkeypatch.setattr(serial, 'Serial', lambda *args, **kwargs: _FakeCLIPort(delay=0.01))
+    n_commands = len(cli.read_config_commands(rad.uRadRadarLive().config_file))
+    radars = [rad.uRadRadarLive(config_file='chirp_config.cfg') for _ in range(3)]
+    t0 = time.monotonic()
+    cli.start_concurrently(radars)
+    elapsed = time.monotonic() - t0
+    for radar in radars:
+        assert radar.started and radar.config_report['commands'] == n_commands
+        assert radar.config_port.sent == cli.read_config_commands(radar.config_file)
+    # -- the three uploads overlap
+    assert elapsed < 2 * max(radar.startup_time for radar in radars)
+
+
+def test_config_changes():
+    with open(rad.urad._find_config_file('1443config.cfg')) as f:
+        active = f.readlines()
+    with open(rad.urad._find_config_file('1443config_higher_cfar.cfg')) as f:
+        new = f.readlines()
+    assert cli.config_changes(active, new) == (['cfarCfg 0 2 8 4 3 0 2304'], False)
+    assert cli.config_changes(active, active) == ([], False)
+    changed, full = cli.config_changes(active, [line for line in new if not line.startswith('cfarCfg')])
+    assert full and changed[0] == 'flushCfg'
+
+
+def test_config_changes_indexed_lines():
+    with open(rad.urad._find_config_file('chirp_config.cfg')) as f:
+        active = f.readlines()
+    # -- chirps 0/1/2 to 0/1': chirp 2 is gone and cannot be patched away
+    new = [line for line in active if not line.startswith('chirpCfg 2 2')]
+    new = [line.replace('chirpCfg 1 1 0 0 0 0 0 4', 'chirpCfg 1 1 0 0 0 0 0 2') for line in new]
+    changed, full = cli.config_changes(active, new)
+    assert full and changed[0] == 'flushCfg' and 'chirpCfg 1 1 0 0 0 0 0 2' in changed
+    # -- the Doppler CFAR line only replaces the Doppler CFAR line
+    new = [line.replace('cfarCfg -1 1 0 8 4 4 1 15 0', 'cfarCfg -1 1 0 8 4 4 1 12 0') for line in active]
+    assert cli.config_changes(active, new) == (['cfarCfg -1 1 0 8 4 4 1 12 0'], False)
+    # -- a chirp moved to other indices leaves the old ones configured
+    new = [line.replace('chirpCfg 2 2 0 0 0 0 0 2', 'chirpCfg 2 3 0 0 0 0 0 2') for line in active]
+    assert cli.config_changes(active, new)[1]
+
+
+def test_urad_reconfigure(monkeypatch, urad_packet):
+    import serial
+    monkeypatch.setattr(serial, 'Serial', lambda *args, **kwargs: _FakeCLIPort())
+    radar = rad.uRadRadarLive(config_file='chirp_config.cfg')
+    radar.start()
+    radar.config_port.sent.clear()
+    dt = radar.config_data['frame_duration_s']
+    radar.decode_packet(urad_packet(40, [[1.0, 2.0, 0.0, 0.5]]))
+    objects, _ = radar.decode_packet(urad_packet(41, [[1.0, 2.0, 0.0, 0.5]]))
+    radar.sync.write(urad_packet(42, [[1.0, 2.0, 0.0, 0.5]])[:50])  # -- half a frame of the old config
+
+    report = radar.reconfigure('chirp_config_temperature.cfg')
+    assert radar.config_port.sent == ['sensorStop', 'guiMonitor -1 1 0 0 0 0 1', 'sensorStart']
+    assert report['changed'] == ['guiMonitor -1 1 0 0 0 0 1'] and not report['full']
+    assert radar.config_file.endswith('chirp_config_temperature.cfg') and len(radar.sync) == 0
+    # -- frame numbers restart with the sensor, the timestamps go on
+    new_objects, _ = radar.decode_packet(urad_packet(1, [[1.0, 2.0, 0.0, 0.5]]))
+    assert new_objects[0].t == objects[0].t + dt
+
+    radar.config_port.sent.clear()
+    radar.restart()
+    assert radar.config_port.sent == ['sensorStop', 'sensorStart']
+    radar.stop()
+
+
+def test_radar_reconfigure(monkeypatch, sample_data_file):
+    import serial
+    monkeypatch.setattr(serial, 'Serial', lambda *args, **kwargs: _FakeCLIPort())
+    radar = rad.Radar('1443config.cfg', enable_serial=True, enable_plotting=False)
+    assert radar.config.configReport['commands'] == len(cli.read_commands(radar.config.config)) - 1
+    with pytest.raises(RuntimeError):
+        radar.reconfigure('1443config_higher_cfar.cfg')
+    assert not radar.started and radar.config.CLIport.sent[-1] != 'sensorStop'
+    radar.start()
+    radar.config.CLIport.sent.clear()
+    lut = radar.processor.rangeLUT
+    report = radar.reconfigure('1443config_higher_cfar.cfg')
+    assert radar.config.CLIport.sent == ['sensorStop', 'cfarCfg 0 2 8 4 3 0 2304', 'sensorStart']
+    assert report['commands'] == 3 and radar.started
+    assert radar.processor.rangeLUT is not lut
+    assert radar.processor.config_params is radar.config.config_params
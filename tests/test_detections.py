@@ -8,6 +8,7 @@
 
 """
 
+import numpy as np
 import rad
 
 
@@ -16,4 +17,76 @@ def test_xyz_to_razel():
     d_xyz = rad.detections.RadarDetection3D_XYZ(1, 1.0, 2.3, -2.1, 3.0, 2.0, noise_cart, 22)
     d_razel = d_xyz.convert_to('razel', noise=[1, 1e-2, 2e-2])
     d_xyz_2 = d_razel.convert_to('cartesian', noise=noise_cart)
-    assert d_xyz.close_to(d_xyz_2)
\ No newline at end of file
+    assert d_xyz.close_to(d_xyz_2)
+
+
+def test_detection_batch():
+    xyz = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]])
+    batch = rad.detections.DetectionBatch(2, 0.5, xyz, [0.1, 0.2, 0.3], [5, 20, 30], [1e-3] * 3)
+    assert len(batch) == 3 and np.shares_memory(batch.x, batch.data)
+    assert np.array_equal(np.asarray(batch)[:, :3], xyz)
+    assert np.shares_memory(np.asarray(batch), batch.data)
+    assert memoryview(batch.data).shape == (3, 5)
+
+    strong = batch.above_snr(10)
+    assert len(strong) == 2 and np.array_equal(strong.snr, [20, 30])
+    d = strong[0]
+    expected = rad.detections.RadarDetection3D_XYZ(2, 0.5, 4.0, 5.0, 6.0, 0.2, [1e-3] * 3, 20.0)
+    assert d == expected and d.close_to(expected)
+    assert np.shares_memory(batch[1:].data, batch.data)
+
+    single = batch.astype(np.float32)
+    assert single.dtype == np.float32 and np.allclose(single.xyz, xyz)
+    both = rad.detections.DetectionBatch.concatenate([batch, strong])
+    assert len(both) == 5 and both.source_ID.tolist() == [2] * 5
+
+
+def test_urad_batch_output(urad_data_file):
+    as_list = list(rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg'))
+    as_batch = list(rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', as_batch=True))
+    assert len(as_list) == len(as_batch)
+    for (objects, code), (batch, code_batch) in zip(as_list, as_batch):
+        assert code == code_batch
+        assert isinstance(batch, rad.detections.DetectionBatch) and len(batch) == len(objects)
+        # -- same detections, only the source_ID differs between the two radars
+        assert np.allclose(batch.xyz, [[d.x, d.y, d.z] for d in objects])
+        assert np.allclose(batch.rrt, [d.rrt for d in objects])
+        assert np.allclose(batch.snr, [d.snr for d in objects])
+        assert all(d_batch.t == d.t for d, d_batch in zip(objects, batch))
+
+
+def test_batched_transforms_and_jacobians():
+    rng = np.random.default_rng(0)
+    xyz = rng.uniform([1, -5, -1], [10, 5, 1], size=(50, 3))
+    razel = rad.detections.cartesian_to_spherical(xyz)
+    assert np.allclose(razel, [rad.detections.cartesian_to_spherical(v) for v in xyz])
+    assert np.allclose(rad.detections.spherical_to_cartesian(razel), xyz, atol=1e-5)
+
+    # -- jacobians against finite differences, and inverse of each other
+    J = rad.detections.cartesian_to_spherical_jacobian(xyz)
+    eps = 1e-6
+    for k in range(3):
+        dv = np.zeros(3)
+        dv[k] = eps
+        numeric = (np.arctan2(*(xyz + dv)[:, [1, 0]].T) - np.arctan2(*(xyz - dv)[:, [1, 0]].T)) / (2 * eps)
+        assert np.allclose(J[:, 1, k], numeric, atol=1e-5)
+    J_inv = rad.detections.spherical_to_cartesian_jacobian(razel)
+    assert np.allclose(J @ J_inv, np.eye(3), atol=1e-4)
+    cov = rad.detections.propagate_covariance(J, [1e-2, 1e-2, 1e-2])
+    assert cov.shape == (50, 3, 3) and np.allclose(cov, np.swapaxes(cov, 1, 2))
+
+
+def test_convert_detections_and_allclose():
+    xyz = np.array([[1.0, 2.0, 3.0], [4.0, -5.0, 6.0]])
+    dets = [rad.detections.RadarDetection3D_XYZ(1, 0.1, *v, 0.5, [1, 2, 3], 10.0) for v in xyz]
+    one_by_one = [d.convert_to('razel', noise=[1, 1e-2, 1e-2]) for d in dets]
+    batched = rad.detections.convert_detections(dets, 'razel', noise=[1, 1e-2, 1e-2])
+    assert one_by_one == batched
+    assert rad.detections.allclose(one_by_one, batched)
+    back = rad.detections.convert_detections(batched, 'cartesian', noise=[1, 2, 3])
+    assert rad.detections.allclose(back, dets[::-1], ordered=False)
+    assert not rad.detections.allclose(back, dets[::-1])
+    batch = rad.detections.DetectionBatch(1, 0.1, xyz, 0.5, 10.0, [1, 2, 3])
+    assert rad.detections.allclose(batch, dets)
+    assert rad.detections.allclose(batch.convert_to('razel'), batched)
+    assert not hasattr(dets[0], '__dict__') and len({dets[0], dets[0]}) == 1
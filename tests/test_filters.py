@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import rad
+from rad.filters import DetectionFilter, Extrinsics
+
+
+def test_gates_single_mask():
+    xyz = np.array([[1.0, 0.0, 0.0], [5.0, 0.0, 0.0], [1.0, 1.0, 0.0], [1.0, 0.0, 1.0], [2.0, 0.0, 0.0]])
+    doppler = np.array([0.0, 0.0, 0.0, 0.0, 3.0])
+    snr = np.array([10.0, 10.0, 10.0, 10.0, 10.0])
+    assert DetectionFilter().mask(xyz, doppler, snr).all()
+    assert DetectionFilter(range_limits=(0, 3)).mask(xyz).tolist() == [True, False, True, True, True]
+    assert DetectionFilter(azimuth_limits=(-0.5, 0.5)).mask(xyz).tolist() == [True, True, False, True, True]
+    assert DetectionFilter(elevation_limits=(-0.5, 0.5)).mask(xyz).tolist() == [True, True, True, False, True]
+    assert DetectionFilter(doppler_limits=(-1, 1)).mask(xyz, doppler).tolist() == [True, True, True, True, False]
+    assert not DetectionFilter(snr_min=10).mask(xyz, doppler, snr).any()
+
+
+def test_extrinsics():
+    # -- mounted 1 m forward, looking left
+    ext = Extrinsics.from_euler(yaw=np.pi / 2, translation=(1.0, 0.0, 0.5))
+    out = ext.apply(np.array([[2.0, 0.0, 0.0], [0.0, 1.0, 0.0]]))
+    assert np.allclose(out, [[1.0, 2.0, 0.5], [0.0, 0.0, 0.5]])
+    assert np.allclose(DetectionFilter().transform(out), out)
+
+
+def test_urad_filter(urad_data_file):
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', snr_floor=0)
+    gate = DetectionFilter(range_limits=(0, 1.5), extrinsics=Extrinsics(translation=(2.0, 0.0, 0.0)))
+    gated = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', snr_floor=0, detection_filter=gate)
+    n_all = n_gated = 0
+    for (objects, _), (kept, _) in zip(radar, gated):
+        expected = [o for o in objects if np.linalg.norm([o.x, o.y, o.z]) <= 1.5]
+        assert len(kept) == len(expected)
+        for a, b in zip(expected, kept):
+            assert np.allclose([a.x + 2.0, a.y, a.z], [b.x, b.y, b.z])
+        n_all += len(objects)
+        n_gated += len(kept)
+    assert 0 < n_gated < n_all
+
+
+def test_processor_filter(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    gate = DetectionFilter(range_limits=(0, 2.0), extrinsics=Extrinsics(translation=(0.0, 0.0, 1.0)))
+    reference = rad.Processor(config.config_params)
+    processor = rad.Processor(config.config_params, detection_filter=gate, frame_pool_size=1)
+    streamer = rad.Streamer(data_file=sample_data_file)
+    n_all = n_gated = 0
+    while streamer.checkForNewPacket():
+        reference.decodePacket(streamer.currentPacket)
+        keep = reference.detected_objects["range"] <= 2.0
+        ref = {k: np.asarray(v)[keep] for k, v in reference.detected_objects.items() if k != "numObj"}
+        processor.decodePacket(streamer.currentPacket)
+        frame = processor.decodeFrame(streamer.currentPacket)
+        for result in (dict(processor.detected_objects), frame.detected_objects):
+            assert result["numObj"] == keep.sum()
+            # -- x, y, z stay in the sensor frame, the vehicle frame is forward, left, up
+            assert all(np.array_equal(result[k], ref[k]) for k in ("x", "y", "z"))
+            assert np.allclose(result["x_vehicle"], ref["y"]) and np.allclose(result["y_vehicle"], -ref["x"])
+            assert np.allclose(result["z_vehicle"], ref["z"] + 1.0)
+            assert np.array_equal(result["peakVal"], ref["peakVal"])
+            assert np.array_equal(result["doppler"], ref["doppler"])
+        frame.release()
+        n_all += len(keep)
+        n_gated += keep.sum()
+    assert 0 < n_gated < n_all
+
+
+def test_processor_filter_keeps_sensor_frame(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    plain = rad.Processor(config.config_params, detection_filter=DetectionFilter(range_limits=(0, 2.0)))
+    mounted = rad.Processor(config.config_params, detection_filter=DetectionFilter(range_limits=(0, 2.0),
+        extrinsics=Extrinsics()))
+    streamer = rad.Streamer(data_file=sample_data_file)
+    while streamer.checkForNewPacket():
+        plain.decodePacket(streamer.currentPacket)
+        mounted.decodePacket(streamer.currentPacket)
+        # -- an identity mount pose leaves the columns and the plotted points as they are
+        assert np.array_equal(plain.xyz_vel_coordinates, mounted.xyz_vel_coordinates)
+        assert "x_vehicle" not in plain.detected_objects
+        with plain.decodeFrame(streamer.currentPacket) as frame:
+            assert "x_vehicle" not in frame.detected_objects
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import pytest
+import rad
+from rad.framepool import FramePool
+
+
+def test_pool_acquire_release():
+    pool = FramePool(max_objects=16, size=2, grow=False)
+    with pool.acquire() as a, pool.acquire() as b:
+        assert a is not b and pool.in_use == 2
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+    assert pool.in_use == 0
+    a.release()  # releasing twice is harmless
+    assert pool.in_use == 0
+    grow = FramePool(max_objects=16, size=1)
+    frames = [grow.acquire() for _ in range(3)]
+    assert grow.allocated == 3
+    frames[0].resize(40)
+    assert frames[0].max_objects == 40 and len(frames[0].xyz_vel) == 40
+
+
+def test_decode_frame_matches_decode_packet(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    reference = rad.Processor(config.config_params)
+    processor = rad.Processor(config.config_params, frame_pool_size=2)
+    streamer = rad.Streamer(data_file=sample_data_file)
+    buffers = None
+    while streamer.checkForNewPacket():
+        reference.decodePacket(streamer.currentPacket)
+        with processor.decodeFrame(streamer.currentPacket) as frame:
+            for name, values in reference.detected_objects.items():
+                assert np.array_equal(values, frame.detected_objects[name])
+                assert np.asarray(values).dtype == np.asarray(frame.detected_objects[name]).dtype
+            assert np.array_equal(reference.xyz_vel_coordinates, processor.xyz_vel_coordinates)
+            assert np.shares_memory(processor.xyz_vel_coordinates, frame.xyz_vel_buffer)
+        assert processor.frame_pool.in_use == 0
+        if buffers is None:
+            buffers = {id(f.xyz_vel_buffer) for f in processor.frame_pool._free}
+    # -- the same two frames were used throughout
+    assert {id(f.xyz_vel_buffer) for f in processor.frame_pool._free} == buffers
+    assert processor.frame_pool.allocated == 2
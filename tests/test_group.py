@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import rad
+from rad.group import RadarGroup
+
+
+def _radars(urad_data_file, n):
+    return [rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg') for _ in range(n)]
+
+
+def test_group_fuses_time_windows(urad_data_file, urad_packet):
+    radars = _radars(urad_data_file, 3)
+    group = RadarGroup(radars, max_wait_s=0.02)
+    points = np.ones((2, 4))
+    # -- each sensor has its own frame numbering and latency
+    for k in range(5):
+        for i, (frame0, latency) in enumerate([(10, 0.001), (500, 0.004), (7, 0.002)]):
+            group.feed(i, urad_packet(frame0 + k, points), arrival=1.0 + 0.05 * k + latency)
+    fused = group.poll(now=1.24)
+    assert len(fused) == 4
+    for frame in fused:
+        assert frame.missing == []
+        assert sorted(frame.sources) == sorted(r.ID for r in radars)
+        assert len(frame.detections) == 6
+        assert all(frame.t_start <= d.t < frame.t_end for d in frame.detections)
+    assert {d.source_ID for d in fused[0].detections} == {r.ID for r in radars}
+    stats = group.stats()
+    assert all(s['frames'] == 5 and s['late_frames'] == 0 for s in stats.values())
+
+
+def test_group_bounded_wait_for_late_sensor(urad_data_file, urad_packet):
+    radars = _radars(urad_data_file, 2)
+    group = RadarGroup(radars, max_wait_s=0.02)
+    points = np.ones((1, 4))
+    for k in range(4):
+        group.feed(0, urad_packet(k, points), arrival=0.05 * k)
+    group.feed(1, urad_packet(0, points), arrival=0.0)
+    # -- the first window has both sensors, the second waits max_wait_s for sensor 1
+    fused = group.poll(now=0.06)
+    assert len(fused) == 1 and fused[0].missing == []
+    assert len(group.poll(now=0.09)) == 0
+    fused = group.poll(now=0.1)
+    assert len(fused) == 1 and fused[0].missing == [radars[1].ID]
+
+    # -- a frame for a window that was already emitted is counted as late
+    group.feed(1, urad_packet(1, points), arrival=0.09)
+    assert group.stats()[radars[1].ID]['late_frames'] == 1
+    assert group.stats()[radars[1].ID]['behind_s'] > 0
+
+
+class _PolledPort():
+    """Data port without a file descriptor, everything written is waiting"""
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.timeout = 0.3
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def read(self, n):
+        out = bytes(self.data[:n])
+        del self.data[:n]
+        return out
+
+
+class _Recorder():
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+
+def test_group_polls_and_records(urad_data_file, urad_packet):
+    radars = _radars(urad_data_file, 2)
+    data = [urad_packet(3, np.ones((2, 4))) + urad_packet(4, np.ones((2, 4))), urad_packet(9, np.ones((1, 4)))]
+    for radar, chunk in zip(radars, data):
+        radar.data_port = _PolledPort(chunk)
+        radar.recorder = _Recorder()
+    group = RadarGroup(radars)
+    group.service(0.0)  # -- before start: nothing registered, nothing read
+    group.start()
+    assert group._unselectable == [0, 1]
+    group.service(0.01)
+    assert [s['frames'] for s in group.stats().values()] == [2, 1]
+    assert [bytes(radar.recorder.data) for radar in radars] == data
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ['matplotlib', 'IPython', 'serial', 'asyncio', 'pyqtgraph']
+
+
+def _loaded_after(code):
+    """Heavy modules present in a fresh interpreter after running code"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = code + '\nimport sys, json\nprint(json.dumps([m for m in {} if m in sys.modules]))'.format(HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', script], cwd=root, check=True,
+        capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=root))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_headless():
+    assert _loaded_after('import rad') == []
+
+
+def test_playback_and_decode_are_headless(sample_data_file):
+    code = '\n'.join([
+        'import rad',
+        'radar = rad.uRadRadarPlayback({!r}, "chirp_config.cfg")'.format(sample_data_file),
+        'config = rad.Config("1443config.cfg", enable_serial=False)',
+        'streamer = rad.Streamer(data_file={!r})'.format(sample_data_file),
+        'processor = rad.Processor(config.config_params)',
+        'while streamer.checkForNewPacket(): processor.decodePacket(streamer.currentPacket)',
+        'rad.Radar',
+    ])
+    assert _loaded_after(code) == []
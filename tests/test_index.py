@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import os
+import numpy as np
+import rad
+from rad import index
+from rad.playback import MappedRecording
+
+
+def test_index_matches_reader(sample_data_file):
+    with MappedRecording(sample_data_file) as recording:
+        offsets = []
+        reader = recording.reader()
+        while reader.next_packet() is not None:
+            offsets.append(reader.offset)
+        idx = index.build_index(recording.data, 0.1, header_len=36)
+    assert len(idx) == 44
+    assert np.array_equal(idx['offset'] + idx['total_packet_len'], offsets)
+    assert np.all(np.diff(idx['frame_number']) == 1)
+    assert np.allclose(idx['timestamp'], 0.1 * np.arange(44))
+
+
+def test_sidecar_rebuilt_when_stale(urad_data_file, urad_packet):
+    idx = index.load_index(urad_data_file, 0.05)
+    path = index.index_path(urad_data_file)
+    assert len(idx) == 20 and os.path.exists(path)
+    mtime = os.stat(path).st_mtime_ns
+    assert np.array_equal(index.load_index(urad_data_file, 0.05), idx)
+    assert os.stat(path).st_mtime_ns == mtime
+    with open(urad_data_file, 'ab') as f:
+        f.write(urad_packet(120, np.ones((2, 4))))
+    assert len(index.load_index(urad_data_file, 0.05)) == 21
+
+
+def test_playback_random_access(urad_data_file):
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg')
+    frames = list(rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg'))
+    assert len(radar) == 20
+    objects, exit_code = radar[7]
+    assert [(d.x, d.t) for d in objects] == [(d.x, d.t) for d in frames[7][0]]
+    assert len(radar[2:10:3]) == 3
+
+    radar.seek(15)
+    assert len(list(radar)) == 5
+    assert radar.seek_time(0.26) == 6
+    objects, _ = radar()
+    assert [(d.x, d.t) for d in objects] == [(d.x, d.t) for d in frames[6][0]]
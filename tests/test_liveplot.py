@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import rad
+from rad.liveplot import PointCloudPlot
+
+
+class _FakeClock():
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_render_is_throttled_to_latest_frame():
+    clock = _FakeClock()
+    plot = PointCloudPlot(refresh_rate=10.0, jupyter=False, clock=clock)
+    points = plot.points
+    for k in range(30):
+        clock.t = 0.01 * k
+        plot.update(np.full((3, 4), float(k)))
+        plot.render()
+    # -- 0.3 s at 10 Hz: one render every 10 frames, the rest skipped
+    assert plot.renders == 3
+    assert plot.frames_skipped == 27 - 1
+    plot.stop()
+    assert plot.renders == 4
+    assert plot.points is points
+    assert np.array_equal(plot.points.get_offsets(), np.full((3, 2), 29.0))
+    assert not plot.render(force=True)
+
+
+def test_processor_plotting_off_decode_path(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    processor = rad.Processor(config.config_params, enable_plotting=True, jupyter=False, refresh_rate=1.0)
+    streamer = rad.Streamer(data_file=sample_data_file)
+    while streamer.checkForNewPacket():
+        processor.performProcessing(streamer.currentPacket)
+    processor.stopPlotting()
+    assert processor.plotter.renders <= 3
+    assert np.array_equal(processor.plotter.points.get_offsets(), processor.xyz_vel_coordinates[:, :2])
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import threading
+import time
+import numpy as np
+import rad
+from rad.pipeline import RadarPipeline
+from rad.sync import read_frame_number
+
+
+def _chunk_reader(filename, chunk_size=100):
+    data = open(filename, 'rb').read()
+    chunks = iter([data[i:i+chunk_size] for i in range(0, len(data), chunk_size)])
+    return lambda: next(chunks, None)
+
+
+def _decoder():
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    processor = rad.Processor(config.config_params)
+    def decode(packet):
+        processor.decodePacket(packet)
+        return processor.xyz_vel_coordinates
+    return decode
+
+
+def test_pipeline_matches_streamer(sample_data_file):
+    stopped = []
+    pipeline = RadarPipeline(_chunk_reader(sample_data_file), _decoder(), on_stop=lambda: stopped.append(True))
+    with pipeline:
+        frames = list(pipeline)
+    assert stopped == [True]
+
+    streamer = rad.Streamer(data_file=sample_data_file)
+    decode = _decoder()
+    expected = []
+    while streamer.checkForNewPacket():
+        expected.append(decode(streamer.currentPacket))
+    assert len(frames) == len(expected) == 44
+    assert all(np.array_equal(a, b) for a, b in zip(frames, expected))
+    assert pipeline.frames_dropped == 0
+
+
+def test_pipeline_drop_oldest(sample_data_file):
+    pipeline = RadarPipeline(_chunk_reader(sample_data_file), _decoder(), queue_size=4, overflow='drop-oldest')
+    pipeline.start()
+    pipeline._decoder_done.wait(5)
+    frames = list(pipeline)
+    pipeline.stop()
+    assert len(frames) == 4
+    assert pipeline.frames_decoded == 44
+    assert pipeline.frames_dropped == 40
+
+
+def test_discard_switches_between_frames(urad_packet):
+    config = {'generation': 0}
+    switched = threading.Event()
+    old = b''.join(urad_packet(k, np.ones((1, 4))) for k in range(50))
+    new = b''.join(urad_packet(100 + k, np.ones((1, 4))) for k in range(5))
+
+    def chunks():
+        for i in range(0, len(old), 64):
+            if switched.is_set():
+                break
+            yield old[i:i+64]
+        while not switched.is_set():
+            yield b''  # -- a read that timed out
+        # -- the read in progress during the swap times out too, the new stream starts later
+        yield b''
+        yield new
+
+    reader = chunks()
+
+    def decode(packet):
+        frame_number = read_frame_number(packet)
+        time.sleep(2e-3)  # -- a swap during the decode would show in the generation
+        return frame_number, config['generation']
+
+    def switch():
+        config['generation'] = 1
+        switched.set()
+
+    pipeline = RadarPipeline(lambda: next(reader, None), decode, queue_size=100)
+    with pipeline:
+        while pipeline.frames_decoded < 5:
+            time.sleep(1e-3)
+        pipeline.discard_buffered(then=switch)
+        frames = list(pipeline)
+    assert all(generation == (frame_number >= 100) for frame_number, generation in frames)
+    assert [f for f, _ in frames if f >= 100] == list(range(100, 105))
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import os
+import time
+import numpy as np
+import rad
+from rad.playback import MappedRecording
+
+
+def test_mapped_packets_are_views(sample_data_file):
+    with MappedRecording(sample_data_file) as recording:
+        packets = list(recording.reader())
+        assert len(packets) == 44
+        assert all(np.shares_memory(p, recording.data) for p in packets)
+        del packets
+
+
+def test_shared_mapping_independent_readers(sample_data_file):
+    recording = MappedRecording(sample_data_file)
+    reader_1 = recording.reader()
+    reader_2 = recording.reader()
+    first = reader_1.next_packet()
+    for _ in range(10):
+        reader_1.next_packet()
+    assert np.array_equal(reader_2.next_packet(), first)
+    assert reader_1.packets == 11 and reader_2.packets == 1
+    assert reader_1.bytes_discarded == reader_2.bytes_discarded == 280
+
+
+def test_urad_playback(urad_data_file):
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg')
+    frames = list(radar)
+    assert len(frames) == 20
+    assert all(exit_code in (0, 1) for _, exit_code in frames)
+    assert frames[-1][0][0].t == 19 * radar.config_data['frame_duration_s']
+    assert radar.reader.bytes_discarded == 37
+
+
+def test_urad_playback_shared_mapping(urad_data_file):
+    recording = MappedRecording(urad_data_file)
+    radars = [rad.uRadRadarPlayback(recording, 'chirp_config.cfg') for _ in range(2)]
+    n_objects = [[len(objects) for objects, _ in radar] for radar in radars]
+    assert n_objects[0] == n_objects[1]
+    assert sum(n_objects[0]) > 0
+
+
+class _FakeClock():
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, dt):
+        self.now += dt
+
+
+def test_pacer_drop_and_slip():
+    for policy, expected in [('drop', [True, True, False, False, True, True]), ('slip', [True] * 6)]:
+        clock = _FakeClock()
+        pacer = rad.playback.Pacer(0.1, speed=2.0, policy=policy, clock=clock, sleep=clock.sleep)
+        delivered = [pacer.wait(10), pacer.wait(11)]
+        assert clock.now == 0.05
+        clock.now += 0.2  # the consumer took too long
+        delivered += [pacer.wait(k) for k in range(12, 16)]
+        assert delivered == expected
+    assert pacer.slip_s > 0
+
+
+def test_realtime_playback(urad_data_file):
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', realtime=True, speed=20)
+    t0 = time.monotonic()
+    frames = list(radar)
+    assert time.monotonic() - t0 >= 19 * 0.05 / 20
+    assert len(frames) + radar.pacer.frames_dropped == 20
+
+
+def test_realtime_radar_file(sample_data_file):
+    radar = rad.Radar('1443config.cfg', enable_plotting=False, data_file=sample_data_file, realtime=True, speed=50)
+    assert radar.config.config_params['frameDurationS'] == 0.1
+    radar.stream_file()
+    config_file = os.path.join(os.path.dirname(rad.__file__), 'config', '1443config.cfg')
+    assert rad.urad.parse_ti_config(config_file)['frame_duration_s'] == 0.1
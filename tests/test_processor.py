@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import struct
+import numpy as np
+import rad
+
+
+def _make_1443_packet(frame_number, objects, q_format=7):
+    """SDK 2.x packet with one detected points TLV, objects are (rangeIdx, dopplerIdx, peakVal, x, y, z)"""
+    body = struct.pack('<2H', len(objects), q_format) + b''.join(struct.pack('<6H', *obj) for obj in objects)
+    tlv = struct.pack('<2I', 1, len(body)) + body
+    header = struct.pack('<8B7I', 2, 1, 4, 3, 6, 5, 8, 7, 0x02000004, 36 + len(tlv), 0xa1443,
+        frame_number, 12345, len(objects), 1)
+    return np.frombuffer(header + tlv, dtype=np.uint8)
+
+
+def test_decode_packet():
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    processor = rad.Processor(config.config_params)
+    n_doppler = config.config_params['numDopplerBins']
+    objects = [(10, 3, 500, 128, 256, 0), (20, 65534, 900, 65408, 384, 65535)]
+    header, idX = processor.decodePacketHeader(_make_1443_packet(42, objects))
+    assert idX == 36 and header['frameNumber'] == 42 and header['numTLVs'] == 1
+    assert header['platform'] == 'a1443'
+
+    detected = processor.performProcessing(_make_1443_packet(42, objects))
+    assert detected['numObj'] == 2
+    assert np.array_equal(detected['rangeIdx'], [10, 20])
+    assert np.allclose(detected['range'], np.array([10, 20]) * config.config_params['rangeIdxToMeters'])
+    # -- indices in the upper half of the doppler bins wrap to negative velocities
+    assert detected['dopplerIdx'][0] == 3 and detected['dopplerIdx'][1] < 0
+    assert (detected['doppler'][1] < 0) and (abs(detected['dopplerIdx'][1]) < n_doppler)
+    assert np.allclose(detected['x'], [1.0, -1.0])
+    assert np.allclose(detected['y'], [2.0, 3.0])
+    assert processor.xyz_vel_coordinates.shape == (2, 4)
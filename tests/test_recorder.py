@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+from rad import sync
+from rad.playback import MappedRecording
+from rad.recorder import StreamRecorder
+
+
+def test_recorder_rotates_on_packet_boundaries(sample_data_file, tmp_path):
+    data = open(sample_data_file, 'rb').read()
+    with StreamRecorder(str(tmp_path / 'rec' / 'stream'), rotate_bytes=8000, write_size=1024, flush_interval=0.01) as recorder:
+        for i in range(0, len(data), 300):
+            recorder.write(data[i:i+300])
+    assert recorder.bytes_dropped == 0
+    assert recorder.bytes_written == len(data)
+    assert len(recorder.files) > 1
+    assert b''.join(open(f, 'rb').read() for f in recorder.files) == data
+
+    n_packets = 0
+    for i, filename in enumerate(recorder.files):
+        with MappedRecording(filename) as recording:
+            if i > 0:
+                assert sync.is_magic_word(recording.data, 0)
+            reader = recording.reader()
+            n_packets += len(list(reader))
+            assert reader.bytes_discarded == (280 if i == 0 else 0)
+    assert n_packets == 44
+
+
+def test_recorder_counts_drops(tmp_path):
+    recorder = StreamRecorder(str(tmp_path / 'stream'), buffer_size=1024, write_size=2**20, flush_interval=10)
+    recorder.start()
+    for _ in range(4):
+        recorder.write(np.zeros(500, dtype=np.uint8).tobytes())
+    recorder.stop()
+    assert recorder.bytes_dropped == 2000 - 1024
+    assert recorder.drop_events == 2
+    assert recorder.bytes_written == 1024
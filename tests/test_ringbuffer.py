@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import pytest
+from rad.ringbuffer import RingBuffer
+
+
+def test_wrap_read_is_single_copy():
+    ring = RingBuffer(16)
+    ring.write(np.arange(12, dtype=np.uint8))
+    ring.consume(10)
+    ring.write(np.arange(12, 24, dtype=np.uint8))
+    assert len(ring) == 14
+    view = ring.peek(4)
+    assert view.base is not None
+    assert np.array_equal(ring.read(14), np.arange(10, 24))
+    assert ring.dropped_bytes == 0
+    assert ring.high_water == 14
+
+
+def test_drop_newest():
+    ring = RingBuffer(16, overflow='drop-newest')
+    ring.write(np.arange(10, dtype=np.uint8))
+    assert ring.write(np.arange(10, 20, dtype=np.uint8)) == 6
+    assert np.array_equal(ring.peek(), np.arange(16))
+    assert (ring.dropped_bytes, ring.drop_events) == (4, 1)
+
+
+def test_drop_oldest():
+    ring = RingBuffer(16, overflow='drop-oldest')
+    ring.write(np.arange(10, dtype=np.uint8))
+    ring.write(np.arange(10, 20, dtype=np.uint8))
+    assert np.array_equal(ring.peek(), np.arange(4, 20))
+    ring.write(np.arange(20, 40, dtype=np.uint8))
+    assert np.array_equal(ring.peek(), np.arange(24, 40))
+    assert (ring.dropped_bytes, ring.drop_events) == (24, 2)
+
+
+def test_grow():
+    ring = RingBuffer(16, overflow='grow')
+    ring.write(np.arange(10, dtype=np.uint8))
+    ring.consume(8)
+    ring.write(np.arange(10, 50, dtype=np.uint8))
+    assert ring.capacity == 64
+    assert np.array_equal(ring.peek(), np.arange(8, 50))
+    assert ring.dropped_bytes == 0
+
+
+def test_bad_policy():
+    with pytest.raises(ValueError):
+        RingBuffer(16, overflow='drop-all')
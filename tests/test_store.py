@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import os
+import numpy as np
+import rad
+from rad.detections import RadarDetection3D_XYZ
+from rad.store import DetectionStore, DetectionWriter
+
+
+def test_playback_to_store(urad_data_file, tmp_path):
+    path = str(tmp_path / 'drive.rad')
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg', as_batch=True)
+    radar.start_store(path, flush_frames=7)
+    frames = [batch for batch, _ in radar]
+    radar.stop()
+
+    store = DetectionStore(path)
+    assert len(store) == len(frames) == 20
+    assert store.num_detections == sum(len(b) for b in frames)
+    assert isinstance(store.x, np.memmap)
+    for i, batch in enumerate(frames):
+        stored = store[i]
+        assert np.array_equal(stored.data, batch.data)
+        assert np.array_equal(stored.t, batch.t) and np.all(stored.source_ID == radar.ID)
+        assert np.allclose(stored.noise, radar.noise_xyz)
+    assert list(store.frame_numbers) == list(range(100, 120))
+
+    # -- range queries by time and frame number
+    dt = radar.config_data['frame_duration_s']
+    start, stop = store.frame_span(2.5 * dt, 6.5 * dt)
+    assert (start, stop) == (3, 7)
+    assert np.array_equal(store.time_range(2.5 * dt, 6.5 * dt).data,
+        np.concatenate([b.data for b in frames[3:7]]))
+    assert np.array_equal(store.frame_number_range(110, 112).data, store[10:12].data)
+    assert len(store.time_range(100.0, 200.0)) == 0
+
+
+def test_store_lists_append_and_crash(tmp_path):
+    path = str(tmp_path / 'list.rad')
+    frame = [RadarDetection3D_XYZ(3, 0.5, 1.0, 2.0, 3.0, -1.0, [0.1, 0.1, 0.1], 12.0),
+        RadarDetection3D_XYZ(3, 0.5, 4.0, 5.0, 6.0, 1.0, [0.1, 0.1, 0.1], 20.0)]
+    with DetectionWriter(path, dtype=np.float32) as writer:
+        writer.write(frame, frame_number=1)
+        writer.write([], frame_number=2, t=0.6)
+    store = DetectionStore(path)
+    assert len(store) == 2 and store.num_detections == 2
+    assert store.x.dtype == np.float32 and store.frame_source_ID[0] == 3
+    assert len(store[1]) == 0 and list(store[0].x) == [1.0, 4.0]
+
+    # -- frames after the last commit are dropped when the store is continued
+    writer = DetectionWriter(path, append=True, flush_frames=100)
+    writer.write(frame, frame_number=3, t=0.7)
+    writer.flush()
+    assert len(store.refresh()) == 3
+    writer.close()
+    for name in ('x', 'frame_numbers'):
+        with open(os.path.join(path, name + '.bin'), 'ab') as f:
+            f.write(bytes(5))  # -- a partial write of a frame that was never committed
+    writer = DetectionWriter(path, append=True)
+    writer.write(frame, frame_number=5, t=0.9)
+    writer.close()
+    store.refresh()
+    assert list(store.frame_numbers) == [1, 2, 3, 5] and store.num_detections == 6
+    assert np.array_equal(store.time_range(0.85, 1.0).x, [1.0, 4.0])
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import rad
+from rad import sync
+
+
+def _packets_from_file(filename):
+    stream = np.fromfile(filename, dtype=np.uint8)
+    locs = sync.find_all_magic_words(stream)
+    return [stream[i:j] for i, j in zip(locs[:-1], locs[1:])] + [stream[locs[-1]:]]
+
+
+def test_find_all_magic_words(sample_data_file):
+    stream = np.fromfile(sample_data_file, dtype=np.uint8)
+    locs = sync.find_all_magic_words(stream)
+    assert len(locs) == 44
+    assert locs[0] == 280
+    assert sync.find_magic_word(stream, start=281) == locs[1]
+    assert sync.find_magic_word(stream, stop=locs[0] + 7) == -1
+
+
+def test_streamer_file_packets(sample_data_file):
+    streamer = rad.Streamer(data_file=sample_data_file)
+    packets = []
+    while streamer.checkForNewPacket():
+        packets.append(streamer.currentPacket)
+    assert len(packets) == 44
+    assert all(len(p) == sync.read_packet_length(p) for p in packets)
+    assert streamer.bytesDiscarded == 280
+    assert streamer.resyncCount == 1
+
+
+def test_sync_chunked_with_noise_and_torn_packet(sample_data_file):
+    packets = _packets_from_file(sample_data_file)[:6]
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, 1000).astype(np.uint8)
+    noise[noise == 2] = 0
+    torn = packets[2][:100]
+    stream = np.concatenate([noise, packets[0], packets[1], torn, packets[3], noise[:37], packets[4], packets[5]])
+
+    engine = sync.PacketSync()
+    out = []
+    for i in range(0, len(stream), 61):
+        engine.write(stream[i:i+61])
+        while True:
+            packet = engine.next_packet()
+            if packet is None:
+                break
+            out.append(packet)
+    # packet 3 is not followed by a sync, so its stated length cannot be trusted
+    expected = [packets[k] for k in (0, 1, 4, 5)]
+    assert len(out) == len(expected)
+    assert all(np.array_equal(a, b) for a, b in zip(out, expected))
+    assert engine.bytes_discarded == 1000 + 100 + len(packets[3]) + 37
+    # leading noise, then one contiguous run: torn packet, packet 3, noise
+    assert engine.resync_count == 2
+
+
+def test_sync_rejects_bad_length(sample_data_file):
+    packets = _packets_from_file(sample_data_file)[:2]
+    bad = packets[0].copy()
+    bad[sync.PACKET_LEN_OFFSET:sync.PACKET_LEN_OFFSET+4] = [255, 255, 255, 0]
+    engine = sync.PacketSync()
+    engine.write(np.concatenate([bad, packets[1]]))
+    assert np.array_equal(engine.next_packet(), packets[1])
+    assert engine.bytes_discarded == len(bad)
+
+
+def test_streamer_overflow_accounting(sample_data_file):
+    # -- the capture does not fit, keep the newest data
+    streamer = rad.Streamer(enable_serial=True, buffer_size=2**14, overflow_policy='drop-oldest')
+    streamer.updateBuffer(np.fromfile(sample_data_file, dtype=np.uint8))
+    n_packets = 0
+    while streamer.checkForNewPacket():
+        n_packets += 1
+    assert 0 < n_packets < 44
+    assert streamer.bytesDropped == len(np.fromfile(sample_data_file, dtype=np.uint8)) - 2**14
+    assert streamer.dropEvents == 1
+    assert streamer.highWaterMark == 2**14
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import rad
+from rad import tlv
+
+
+def test_processor_range_profile_view(sample_data_file):
+    config = rad.Config('1443config.cfg', enable_serial=False)
+    processor = rad.Processor(config.config_params, db_output=True)
+    streamer = rad.Streamer(data_file=sample_data_file)
+    db_buffer = processor.range_profile_db
+    n_frames = 0
+    while streamer.checkForNewPacket():
+        processor.decodePacket(streamer.currentPacket)
+        n_frames += 1
+        assert processor.range_profile.shape == (config.config_params['numRangeBins'],)
+        assert np.shares_memory(processor.range_profile, streamer.currentPacket)
+        assert processor.range_profile_db is db_buffer
+        assert np.allclose(db_buffer, processor.range_profile * tlv.LOG2_Q9_TO_DB, rtol=1e-6)
+    assert n_frames == 44
+
+
+def test_urad_heatmap_view(urad_data_file, urad_packet):
+    radar = rad.uRadRadarPlayback(urad_data_file, 'chirp_config.cfg')
+    n_range = radar.config_data['num_range_bins']
+    n_doppler = int(radar.config_data['num_doppler_bins'])
+    profile = np.arange(n_range, dtype='<u2')
+    heatmap = np.arange(n_range * n_doppler, dtype='<u2').reshape(n_range, n_doppler)
+    packet = bytearray(urad_packet(5, np.ones((3, 4)), extra_tlvs=[
+        (tlv.TLV_RANGE_PROFILE, profile.tobytes()),
+        (tlv.TLV_RANGE_DOPPLER_HEATMAP, heatmap.tobytes())]))
+    objects, exit_code = radar.decode_packet(packet)
+    assert exit_code == 0 and len(objects) == 3
+    assert np.array_equal(radar.range_profile, profile)
+    assert np.array_equal(radar.range_doppler_heatmap, heatmap)
+    # -- a view over the packet, not a copy
+    packet[radar.header_len + 8 + 3*16 + 8 + 3*4 + 8] = 0xff
+    assert radar.range_profile[0] == 0xff
+    out = np.empty(heatmap.shape, dtype=np.float32)
+    assert tlv.to_db(radar.range_doppler_heatmap, out=out) is out
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# @Author: Spencer H
+# @Date:   2026-10-18
+# @Last Modified by:   Spencer H
+# @Last Modified date: 2026-10-18
+# @Description:
+"""
+
+"""
+
+import numpy as np
+import rad
+
+
+class _BytesPort():
+    """Stands in for a serial.Serial data port delivering a fixed byte string"""
+    def __init__(self, data, burst=700):
+        self.data = data
+        self.pos = 0
+        self.burst = burst
+        self.reads = 0
+
+    @property
+    def in_waiting(self):
+        return min(self.burst, len(self.data) - self.pos)
+
+    def read(self, n):
+        self.reads += 1
+        chunk = self.data[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+
+def test_live_read_resyncs_in_bulk(urad_packet):
+    rng = np.random.default_rng(0)
+    garbage = rng.integers(0, 255, 5000, dtype=np.uint8).tobytes()
+    frames = [urad_packet(k, np.ones((k + 1, 4))) for k in range(4)]
+    radar = rad.uRadRadarLive(config_file='chirp_config.cfg')
+    radar.data_port = _BytesPort(garbage + frames[0] + frames[1] + frames[2][:50], burst=700)
+
+    results = [radar.read_data_port() for _ in range(3)]
+    assert [len(objects) for objects, _ in results[:2]] == [1, 2]
+    assert [exit_code for _, exit_code in results] == [0, 0, 3]
+    # -- the garbage costs a handful of reads, not one per byte
+    assert radar.data_port.reads < 20
+    assert radar.sync.bytes_discarded == len(garbage)
+
+    # -- the partial frame is kept across calls
+    radar.data_port.data += frames[2][50:] + frames[3]
+    objects, exit_code = radar.read_data_port()
+    assert (exit_code == 0) and (len(objects) == 3)
+    objects, exit_code = radar.read_data_port()
+    assert (exit_code == 0) and (len(objects) == 4)
+
+
+def test_parse_ti_payload_tlv_walk(urad_packet):
+    points = np.arange(500 * 4, dtype=np.float32).reshape(500, 4)
+    snr = np.arange(500) % 1000
+    packet = urad_packet(3, points, snr=snr, extra_tlvs=[(15, b'\x01' * 12)])
+    header = rad.urad.parse_ti_header(packet, 40)
+    payload = rad.urad.parse_ti_payload(packet[40:], header, 8)
+    assert np.array_equal(payload['objects'][:, :4], points)
+    assert np.array_equal(payload['objects'][:, 4], snr)
+    assert [t for t, _, _ in payload['tlvs']] == [1, 7, 15]
+    assert payload['tlvs'][0][1:] == (8, 500 * 16)
+    assert not payload['truncated']
+
+    # -- a bad length in the last TLV keeps the TLVs before it
+    bad = bytearray(packet)
+    offset = 40 + payload['tlvs'][2][1] - 4
+    bad[offset:offset + 4] = (10**6).to_bytes(4, 'little')
+    payload = rad.urad.parse_ti_payload(bad[40:], header, 8)
+    assert payload['truncated'] and len(payload['tlvs']) == 2
+    assert np.array_equal(payload['objects'][:, :4], points)